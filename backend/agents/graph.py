@@ -4,7 +4,7 @@ LangGraph workflow for PedalBot agent orchestration.
 Flow:
 1. Router → Classify intent
 2. Specialist agents → Execute based on intent
-3. Quality check → Validate answer
+3. Quality check → Validate answer (skipped for self-checked manual answers)
 4. Synthesizer → Format final response
 
 Hybrid Flow:
@@ -15,15 +15,26 @@ Hybrid Flow:
 """
 
 import asyncio
+import os
+import re
+import time
+import weakref
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
-from typing import Dict, Any, Optional
+from langgraph.config import get_stream_writer
+from langchain_core.runnables import Runnable, RunnableConfig
+from typing import Dict, Any, Optional, List, Tuple
 import logging
 
-from backend.state import AgentState, AgentIntent
-from backend.agents.router_agent import RouterAgent
-from backend.agents.manual_agent import ManualAgent
+from backend.state import AgentState, AgentIntent, FallbackReason
+from backend.agents.router_agent import RouterAgent, ROUTER_LLM_TIMEOUT_S, ROUTER_LLM_MAX_RETRIES
+from backend.agents.manual_agent import ManualAgent, TOKEN_STREAM_CONFIG_KEY
 from backend.agents.pricing_agent import PricingAgent
+from backend.services.pedal_registry import resolve_pedal
+from backend.services.semantic_cache import SemanticCache
 from backend.agents.quality_check import (QualityCheckAgent, should_reject_answer,
                                         get_safe_fallback_response
                                         )
@@ -31,6 +42,132 @@ from backend.agents.quality_check import (QualityCheckAgent, should_reject_answe
 
 logger = logging.getLogger(__name__)
 
+# Phrases in a manual answer meaning the manual isn't indexed
+_UNAVAILABLE_RE = re.compile(
+    r"don't have (?:a|the) manual|no manual|manual not indexed|manual isn't available",
+    re.IGNORECASE
+)
+
+# Per-node latency budgets (seconds). A node that exceeds its budget is
+# cancelled; the router then falls back to keyword routing, the agents to
+# the fallback path.
+# The router budget covers every Groq attempt plus a second for preprocessing
+# and the cache embedding, so the client's own timeout and retry fire first.
+ROUTER_BUDGET_S = ROUTER_LLM_TIMEOUT_S * (ROUTER_LLM_MAX_RETRIES + 1) + 1.0
+MANUAL_BUDGET_S = 8.0
+PRICING_BUDGET_S = 4.0
+HYBRID_BUDGET_S = 10.0
+
+# Quality-check fast pass: manual answers with at least this many chunks and
+# this top retrieval score skip the LLM validator. Fast reject: manual answers
+# with no chunks and a top score below FAST_REJECT_MAX_SCORE skip it too,
+# since there is nothing to validate them against.
+FAST_PASS_MIN_SCORE = 0.80
+FAST_PASS_MIN_CHUNKS = 3
+FAST_REJECT_MAX_SCORE = 0.30
+_UNSURE_RE = re.compile(r"i don't know|not sure|cannot find|can't find", re.IGNORECASE)
+
+
+def _grounding_verdict(state: AgentState) -> Optional[str]:
+    """
+    Judge a single-source manual answer from retrieval alone.
+    
+    Returns:
+        "pass" if it is grounded enough to skip LLM validation, "reject" if
+        it has no grounding at all, None if the LLM validator must decide
+    """
+    if state.intent not in (AgentIntent.MANUAL_QUESTION, AgentIntent.EXPLANATION):
+        return None
+    top = max(state.retrieval_scores, default=0.0)
+    n = len(state.retrieved_chunks)
+    if (top >= FAST_PASS_MIN_SCORE and n >= FAST_PASS_MIN_CHUNKS
+            and state.raw_answer and not _UNSURE_RE.search(state.raw_answer)):
+        return "pass"
+    if top < FAST_REJECT_MAX_SCORE and n == 0:
+        return "reject"
+    return None
+
+
+def _noop_writer(chunk: Any) -> None:
+    pass
+
+
+def _get_stream_writer():
+    """Return LangGraph's custom stream writer, or a no-op outside a graph run."""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return _noop_writer
+
+
+async def _capture(coro) -> Any:
+    """Await coro, returning any Exception instead of raising it."""
+    try:
+        return await coro
+    except Exception as e:
+        return e
+
+
+def _is_terminal_miss(which: str, result: Any) -> bool:
+    """True if a hybrid agent result can't contribute to the answer."""
+    if isinstance(result, Exception) or not isinstance(result, AgentState):
+        return True
+    if which == "manual":
+        return not result.raw_answer or bool(_UNAVAILABLE_RE.search(result.raw_answer))
+    return not result.price_info or bool(result.price_info.get("error"))
+
+
+# Router conditional-edge keys by intent
+# NOTE: EXPLANATION maps to manual_agent in the graph until explainer_agent exists
+_INTENT_ROUTE: Dict[AgentIntent, str] = {
+    AgentIntent.MANUAL_QUESTION: "manual_agent",
+    AgentIntent.EXPLANATION: "explanation",
+    AgentIntent.HYBRID: "hybrid",
+    AgentIntent.PRICING: "pricing_agent",
+    AgentIntent.CASUAL: "casual",  # Final answer already set in router, end here
+}
+
+
+# HYBRID ANSWER TEMPLATES
+# Keyed on (has_manual_text, has_pricing)
+def _format_hybrid_pricing(state: AgentState) -> str:
+    """Format pricing from price_info when the pricing agent gave no answer."""
+    price_info = state.price_info
+    return (
+        f"Based on {price_info['total_listings']} active listings on Reverb, "
+        f"the **{state.pedal_name}** typically sells for **${price_info['avg_price']:.2f}**. "
+        f"Prices range from ${price_info['min_price']:.2f} to ${price_info['max_price']:.2f}, "
+        f"depending on condition."
+    )
+
+
+def _tmpl_both(state: AgentState, manual_text: str, pricing_text: str) -> str:
+    return f"{manual_text}\n\n\n**Current Market Pricing:**\n\n{pricing_text}"
+
+
+def _tmpl_manual(state: AgentState, manual_text: str, pricing_text: None) -> str:
+    return manual_text
+
+
+def _tmpl_pricing(state: AgentState, manual_text: None, pricing_text: str) -> str:
+    return pricing_text
+
+
+def _tmpl_none(state: AgentState, manual_text: None, pricing_text: None) -> str:
+    return (
+        f"I couldn't find complete information about the {state.pedal_name}. "
+        f"The manual search didn't return relevant results, and pricing data was unavailable."
+    )
+
+
+_HYBRID_TEMPLATES = {
+    (True, True): _tmpl_both,
+    (True, False): _tmpl_manual,
+    (False, True): _tmpl_pricing,
+    (False, False): _tmpl_none,
+}
+
+
 class PedalBotGraph:
     """
     LangGraph-based multi-agent orchestrator.
@@ -53,7 +190,10 @@ class PedalBotGraph:
                 router_agent: RouterAgent,
                 manual_agent: ManualAgent,
                 pricing_agent: PricingAgent,
-                quality_check_agent: QualityCheckAgent):
+                quality_check_agent: QualityCheckAgent,
+                hybrid_straggler_timeout: float = 5.0,
+                http_client: Optional[httpx.AsyncClient] = None,
+                response_cache: Optional["ResponseCache"] = None):
         """
         Initialize graph with agents.
         
@@ -61,84 +201,59 @@ class PedalBotGraph:
             router_agent: Intent classification agent
             manual_agent: Manual RAG agent
             quality_check_agent: Answer validation agent
+            hybrid_straggler_timeout: Seconds the slower hybrid agent gets
+                after the faster one returns before it is cancelled
+            http_client: Shared HTTP client used by the agents; closed by aclose()
+            response_cache: Cache of completed results consulted by run() (optional)
         """
 
         self.router = router_agent
         self.manual_agent = manual_agent
         self.pricing_agent = pricing_agent
         self.quality_check = quality_check_agent
+        self.hybrid_straggler_timeout = hybrid_straggler_timeout
+        self.http_client = http_client
+        self.response_cache = response_cache
 
-        # Build Graph
-        self.graph: CompiledStateGraph = self._build_graph()
-
-    def _build_graph(self) -> CompiledStateGraph:
-        """Build the LangGraph workflow."""
-
-        # Create Graph with AgentState
-        workflow = StateGraph(AgentState)
-
-        # Add nodes
-        workflow.add_node("router", self._router_node)
-        workflow.add_node("manual_agent", self._manual_agent_node)
-        workflow.add_node("pricing_agent", self._pricing_agent_node)
-        workflow.add_node("hybrid_agent", self._hybrid_agent_node)  # NEW: Runs both agents
-        workflow.add_node("quality_check", self._quality_check_node)
-        workflow.add_node("synthesizer", self._synthesizer_node)
-        workflow.add_node("fallback", self._fallback_node)
-
-        workflow.set_entry_point("router")
-
-        # Router routing logic
-        # NOTE: explanation_agent not implemented yet, so route to manual_agent as fallback
-        workflow.add_conditional_edges(
-            "router",
-            self._route_after_router,
-            {
-                "manual_agent": "manual_agent",
-                "pricing_agent": "pricing_agent", 
-                "explanation": "manual_agent",  # Fallback: use manual for explanation until explainer is built
-                "hybrid": "hybrid_agent",  # NEW: Route to hybrid node that calls BOTH agents
-                "casual": "synthesizer",  # CASUAL: Skip to synthesizer, answer already set in router
-            }
-        )
-
-        # specialist agents → quality check
-        workflow.add_edge("manual_agent", "quality_check")
-        workflow.add_edge("pricing_agent", "quality_check")
-        workflow.add_edge("hybrid_agent", "quality_check")  
-
-        # Quality check routing
-        workflow.add_conditional_edges(
-            "quality_check",
-            self._route_after_quality_check,
-            {
-                "synthesizer": "synthesizer",
-                "fallback": "fallback",
-            }
+        # Bind this instance's agents to the shared compiled graph
+        self.graph: Runnable = _COMPILED_GRAPH.with_config(
+            configurable={_GRAPH_CONFIG_KEY: self}
         )
 
-        # End nodes
-        workflow.add_edge("synthesizer", END)
-        workflow.add_edge("fallback", END)
-        
-        return workflow.compile()
-    
-    
     # NODE IMPLEMENTATIONS
     async def _router_node(self, state: AgentState) -> AgentState:
         """Router node: Classify intent."""
         logger.info("Node: router")
-        return await self.router.route(state)
+        try:
+            return await asyncio.wait_for(self.router.route(state), timeout=ROUTER_BUDGET_S)
+        except asyncio.TimeoutError:
+            # A slow classifier shouldn't cost the user an answer - route on
+            # keywords and carry on (no error, so the answer isn't rejected)
+            logger.warning("Router exceeded %ss budget - using keyword routing", ROUTER_BUDGET_S)
+            state.agent_path.append("router_timeout")
+            return self.router.keyword_route(state)
     
     async def _manual_agent_node(self, state: AgentState) -> AgentState:
         """Manual agent node: Answer from manuals."""
         logger.info("Node: manual_agent")
-        return await self.manual_agent.answer(state)
+        try:
+            return await asyncio.wait_for(self.manual_agent.answer(state), timeout=MANUAL_BUDGET_S)
+        except asyncio.TimeoutError:
+            logger.warning("Manual agent exceeded %ss budget", MANUAL_BUDGET_S)
+            state.error = "manual_timeout"
+            state.raw_answer = None
+            return state
     
     async def _pricing_agent_node(self, state: AgentState) -> AgentState:
         """Pricing agent node: Fetch market data."""
         logger.info("Node: pricing_agent")
-        return await self.pricing_agent.get_pricing(state)
+        try:
+            return await asyncio.wait_for(self.pricing_agent.get_pricing(state), timeout=PRICING_BUDGET_S)
+        except asyncio.TimeoutError:
+            logger.warning("Pricing agent exceeded %ss budget", PRICING_BUDGET_S)
+            state.error = "pricing_timeout"
+            state.raw_answer = None
+            return state
     
     async def _hybrid_agent_node(self, state: AgentState) -> AgentState:
         """
@@ -155,17 +270,27 @@ class PedalBotGraph:
         """
         logger.info("Node: hybrid_agent - Running both manual and pricing agents")
         
-        # Run both agents concurrently
-        manual_state = state.model_copy(deep=True)
-        pricing_state = state.model_copy(deep=True)
+        # Resolve the pedal once for both agents (the query embedding, if the
+        # router computed one, is already on the state)
+        if state.pedal_info is None:
+            try:
+                state.pedal_info = await resolve_pedal(state.pedal_name)
+            except Exception as e:
+                logger.warning("Hybrid: Could not pre-resolve pedal '%s': %s", state.pedal_name, e)
+        
+        # Run both agents concurrently on cheap snapshots, each with its own
+        # copies of the lists the agents mutate in place
+        manual_state = state._fast_snapshot()
+        pricing_state = state._fast_snapshot()
         
         try:
-            # Use asyncio.gather to run both agents in parallel
-            # return_exceptions=True means failures don't crash the whole thing
-            manual_result, pricing_result = await asyncio.gather(
-                self.manual_agent.answer(manual_state),
-                self.pricing_agent.get_pricing(pricing_state),
-                return_exceptions=True
+            # Failures come back as exceptions so they don't crash the whole thing
+            # The parent budget bounds both agents; on expiry the wait_for
+            # cancellation propagates into _run_hybrid_agents, which cancels
+            # whichever agent tasks are still running
+            manual_result, pricing_result = await asyncio.wait_for(
+                self._run_hybrid_agents(manual_state, pricing_state),
+                timeout=HYBRID_BUDGET_S
             )
             
             # Process manual agent result
@@ -176,9 +301,9 @@ class PedalBotGraph:
                 state.retrieval_scores = manual_result.retrieval_scores
                 state.pinecone_namespace = manual_result.pinecone_namespace
                 manual_success = bool(manual_result.retrieved_chunks)
-                logger.info(f"Hybrid: Manual agent returned answer (chunks: {len(manual_result.retrieved_chunks)})")
+                logger.info("Hybrid: Manual agent returned answer (chunks: %d)", len(manual_result.retrieved_chunks))
             elif isinstance(manual_result, Exception):
-                logger.warning(f"Hybrid: Manual agent failed: {manual_result}")
+                logger.warning("Hybrid: Manual agent failed: %s", manual_result)
                 state.manual_answer = None
             else:
                 logger.warning("Hybrid: Manual agent returned no answer")
@@ -190,9 +315,9 @@ class PedalBotGraph:
                 state.pricing_answer = pricing_result.raw_answer
                 state.price_info = pricing_result.price_info
                 pricing_success = not pricing_result.price_info.get("error")
-                logger.info(f"Hybrid: Pricing agent returned data (listings: {pricing_result.price_info.get('total_listings', 0)})")
+                logger.info("Hybrid: Pricing agent returned data (listings: %s)", pricing_result.price_info.get("total_listings", 0))
             elif isinstance(pricing_result, Exception):
-                logger.warning(f"Hybrid: Pricing agent failed: {pricing_result}")
+                logger.warning("Hybrid: Pricing agent failed: %s", pricing_result)
                 state.pricing_answer = None
             else:
                 logger.warning("Hybrid: Pricing agent returned no data")
@@ -223,15 +348,90 @@ class PedalBotGraph:
             if pricing_success:
                 state.agent_path.append("reverb_agent")
             
-            logger.info(f"Hybrid complete: manual={manual_success}, pricing={pricing_success}")
+            logger.info("Hybrid complete: manual=%s, pricing=%s", manual_success, pricing_success)
             
+        except asyncio.TimeoutError:
+            logger.warning("Hybrid agent exceeded %ss budget", HYBRID_BUDGET_S)
+            state.error = "hybrid_timeout"
+            state.raw_answer = None
+            state.confidence_score = 0.1
         except Exception as e:
-            logger.error(f"Hybrid agent failed: {e}")
+            logger.error("Hybrid agent failed: %s", e)
             state.error = f"Hybrid agent error: {str(e)}"
             state.confidence_score = 0.1
         
         return state
     
+    async def _run_hybrid_agents(self, manual_state: AgentState,
+                                pricing_state: AgentState) -> Tuple[Any, Any]:
+        """
+        Run the manual and pricing agents concurrently in a TaskGroup.
+        
+        Each result is emitted as a "hybrid_agent.partial" custom stream event
+        the moment it lands, so streaming consumers don't wait on the slower
+        agent. Once the first agent finishes, the other gets
+        hybrid_straggler_timeout seconds before it is cancelled. The router
+        already classified the query as needing both agents, so one agent
+        coming back empty (e.g. manual not indexed) never cancels the other -
+        it is then the only source of an answer and runs within the
+        hybrid budget.
+        
+        Returns:
+            (manual_result, pricing_result) - each an AgentState or the
+            exception raised (asyncio.TimeoutError if cancelled)
+        """
+        write_partial = _get_stream_writer()
+        loop = asyncio.get_running_loop()
+        
+        results: Dict[str, Any] = {}
+        cancel_reasons: Dict[str, str] = {}
+        timers: List[asyncio.TimerHandle] = []
+        
+        def cancel(which: str, reason: str) -> None:
+            task = tasks[which]
+            if not task.done():
+                cancel_reasons.setdefault(which, reason)
+                task.cancel()
+        
+        def on_done(which: str, task: asyncio.Task) -> None:
+            if task.cancelled():
+                return
+            result = results[which] = task.result()
+            if isinstance(result, AgentState):
+                write_partial({
+                    "node": "hybrid_agent.partial",
+                    "which": which,
+                    "answer_partial": result.raw_answer,
+                })
+            
+            other = "pricing" if which == "manual" else "manual"
+            if tasks[other].done() or _is_terminal_miss(which, result):
+                return
+            # Faster agent is back - bound the wait on the slower one
+            timers.append(loop.call_later(
+                self.hybrid_straggler_timeout, cancel, other,
+                f"exceeded {self.hybrid_straggler_timeout}s straggler timeout"
+            ))
+        
+        try:
+            async with asyncio.TaskGroup() as tg:
+                # Failures come back as results so one agent can't cancel the group
+                tasks = {
+                    "manual": tg.create_task(_capture(self.manual_agent.answer(manual_state))),
+                    "pricing": tg.create_task(_capture(self.pricing_agent.get_pricing(pricing_state))),
+                }
+                for which, task in tasks.items():
+                    task.add_done_callback(lambda t, which=which: on_done(which, t))
+        finally:
+            for timer in timers:
+                timer.cancel()
+        
+        for which, reason in cancel_reasons.items():
+            logger.warning("Hybrid: %s agent cancelled (%s)", which, reason)
+            results[which] = asyncio.TimeoutError(f"{which} agent cancelled: {reason}")
+        
+        return results["manual"], results["pricing"]
+
     def _synthesize_hybrid_answer(self, state: AgentState) -> str:
         """
         Combine manual and pricing answers into a single response.
@@ -242,91 +442,73 @@ class PedalBotGraph:
         - If only pricing: Acknowledge manual unavailability + return pricing
         - If neither: Return helpful message
         """
-        parts = []
-        
         # Check if manual answer indicates we don't have the manual
-        manual_unavailable = False
-        if state.manual_answer:
-            unavailable_phrases = [
-                "don't have a manual",
-                "don't have the manual",
-                "no manual",
-                "manual not indexed",
-                "manual isn't available"
-            ]
-            manual_unavailable = any(phrase in state.manual_answer.lower() for phrase in unavailable_phrases)
-        
-        # Add manual answer if available AND useful
-        if state.manual_answer and state.retrieved_chunks and not manual_unavailable:
-            parts.append(state.manual_answer)
-        elif manual_unavailable and state.price_info and not state.price_info.get("error"):
-            # Manual unavailable but we have pricing - acknowledge the limitation cleanly
-            # Don't just concatenate "I don't have a manual" with pricing
-            parts.append(
+        manual_unavailable = bool(state.manual_answer and _UNAVAILABLE_RE.search(state.manual_answer))
+        has_pricing = bool(state.price_info and not state.price_info.get("error"))
+        
+        # Manual part: the answer if useful, otherwise a clean note about the
+        # missing manual when pricing can stand in for it
+        if state.manual_answer and not manual_unavailable:
+            manual_text = state.manual_answer
+        elif manual_unavailable and has_pricing:
+            manual_text = (
                 f"I don't currently have the **{state.pedal_name}** manual indexed, "
                 f"so I can't provide details about its features or specifications yet."
             )
-        elif state.manual_answer and not manual_unavailable:
-            # Have answer without chunks - could be explaining why no info found
-            parts.append(state.manual_answer)
+        else:
+            manual_text = None
         
-        # Add pricing answer if available
-        has_pricing = state.price_info and not state.price_info.get("error")
+        # Pricing part: agent answer, or formatted straight from price_info
+        pricing_text = None
         if has_pricing:
-            if parts:
-                parts.append("\n\n**Current Market Pricing:**\n")
-            
-            if state.pricing_answer:
-                parts.append(state.pricing_answer)
-            else:
-                # Format pricing from price_info directly
-                price_info = state.price_info
-                pricing_text = (
-                    f"Based on {price_info['total_listings']} active listings on Reverb, "
-                    f"the **{state.pedal_name}** typically sells for **${price_info['avg_price']:.2f}**. "
-                    f"Prices range from ${price_info['min_price']:.2f} to ${price_info['max_price']:.2f}, "
-                    f"depending on condition."
-                )
-                parts.append(pricing_text)
-            
-            # Add source note for pricing
-            source = state.price_info.get("source", "unknown")
-            if source == "mock":
-                parts.append("\n\n*Note: Using estimated pricing data. Live Reverb API data unavailable.*")
-        
-        # Handle case where we got nothing useful
-        if not parts:
-            return (
-                f"I couldn't find complete information about the {state.pedal_name}. "
-                f"The manual search didn't return relevant results, and pricing data was unavailable."
-            )
+            pricing_text = state.pricing_answer or _format_hybrid_pricing(state)
+        
+        answer = _HYBRID_TEMPLATES[(manual_text is not None, has_pricing)](
+            state, manual_text, pricing_text
+        )
+        
+        # Add source note for pricing
+        if has_pricing and state.price_info.get("source") == "mock":
+            answer += "\n\n\n*Note: Using estimated pricing data. Live Reverb API data unavailable.*"
         
-        return "\n".join(parts)
+        return answer
 
     async def _quality_check_node(self, state: AgentState) -> AgentState:
-        """Quality check node: Validate answer."""
+        """
+        Quality check node: Validate answer.
+        
+        Manual answers backed by several strongly matching chunks are
+        accepted without the LLM validator, and ones with no retrieved chunks
+        are scored as ungrounded without it; only ambiguous cases pay for it.
+        """
         logger.info("Node: quality_check") 
+        
+        verdict = _grounding_verdict(state)
+        if verdict is not None:
+            # Confidence comes straight from retrieval; should_reject_answer
+            # then turns a fast-rejected answer into a retrieval fallback
+            state.confidence_score = max(state.retrieval_scores, default=0.0)
+            state.hallucination_flag = False
+            state.needs_human_review = False
+            state.agent_path.append(f"quality_check_fast_{verdict}")
+            logger.info("[QUALITY_CHECK] Fast %s on retrieval grounding - skipping LLM validation", verdict)
+            return state
+        
         return await self.quality_check.validate(state)
     
-    async def _synthesizer_node(self, state: AgentState) -> AgentState:
+    async def _synthesizer_node(self, state: AgentState) -> Dict[str, Any]:
         """Synthesizer node: Format final response."""
         logger.info("Node: synthesizer")
         
         # For hybrid queries with partial success, the answer is already synthesized
         # For other queries, use raw_answer as final_answer
-        state.final_answer = state.raw_answer
-        state.agent_path.append("synthesizer")
-        
-        return state
+        return {"final_answer": state.raw_answer, "agent_path": ["synthesizer"]}
     
-    async def _fallback_node(self, state: AgentState) -> AgentState:
+    async def _fallback_node(self, state: AgentState) -> Dict[str, Any]:
         """Fallback node: Handle rejected answers."""
         logger.info("Node: fallback")
         
-        state.final_answer = get_safe_fallback_response(state)
-        state.agent_path.append("fallback")
-        
-        return state
+        return {"final_answer": get_safe_fallback_response(state), "agent_path": ["fallback"]}
     
     
     # ROUTING LOGIC
@@ -337,84 +519,107 @@ class PedalBotGraph:
         NOTE: Until explainer_agent is implemented, EXPLANATION queries
         are routed to manual_agent as a fallback.
         """
-        if state.intent == AgentIntent.MANUAL_QUESTION:
+        route = _INTENT_ROUTE.get(state.intent)
+        if route is None:
+            # Default fallback
+            logger.warning("Unknown intent: %s, defaulting to manual_agent", state.intent)
             return "manual_agent"
+        return route
+
+    def _route_after_manual(self, state: AgentState) -> str:
+        """
+        Determine next node after manual agent.
         
-        elif state.intent == AgentIntent.EXPLANATION:
-            # TODO: Implement dedicated explainer_agent
-            # For now, use manual_agent - it can still provide factual info
-            logger.info("EXPLANATION intent routed to manual_agent (explainer not implemented)")
-            return "explanation"
-        
-        elif state.intent == AgentIntent.HYBRID:
-            # Start with manual for hybrid queries
-            return "hybrid"
-            
-        elif state.intent == AgentIntent.PRICING:
-            return "pricing_agent"
-        
-        elif state.intent == AgentIntent.CASUAL:
-            # Casual conversation - answer already set in router, go straight to synthesizer
-            return "casual"
-        
-        else:
-            # Default fallback
-            logger.warning(f"Unknown intent: {state.intent}, defaulting to manual_agent")
-            return "manual_agent"  
+        Answers the manual agent already self-checked (or marked as not
+        needing a check) skip the quality_check LLM call.
+        """
+        if state.skip_quality_check:
+            return self._route_after_quality_check(state)
+        return "quality_check"
 
     def _route_after_quality_check(self, state: AgentState) -> str:
         """Determine next node after quality check."""
-        if should_reject_answer(state):
-            return "fallback"
-        else:
-            return "synthesizer"
+        return "fallback" if should_reject_answer(state) else "synthesizer"
         
 
     # EXECUTION
-    async def run(self, state: AgentState) -> AgentState:
+    async def run(self, state: AgentState, use_cache: bool = True) -> AgentState:
         """
         Run the complete workflow.
         
+        Repeated (query, pedal_name) pairs are served from the response cache
+        without re-running the graph. Follow-ups (with conversation history)
+        bypass it, and error and fallback results are never cached.
+        
         Args:
             state: Initial state with query and pedal_name
+            use_cache: Set False to bypass the response cache
         
         Returns:
             Final state with answer
         """
 
-        logger.info(f"Starting workflow for query: {state.query[:100]}")
-        logger.debug(f"[WORKFLOW] Input pedal_name: '{state.pedal_name}'")
+        logger.info("Starting workflow for query: %.100s", state.query)
+        logger.debug("[WORKFLOW] Input pedal_name: '%s'", state.pedal_name)
+
+        cache = self.response_cache if use_cache and not state.conversation_history else None
+        vector = None
+        if cache is not None:
+            cached, vector = await cache.get(state.query, state.pedal_name)
+            if cached is not None:
+                logger.info("[RESPONSE_CACHE] Hit for query: %.100s", state.query)
+                for name, value in cached.items():
+                    setattr(state, name, list(value) if isinstance(value, list) else value)
+                state.agent_path.append("response_cache")
+                return state
 
         try:
             # Execute graph
             raw_state = await self.graph.ainvoke(state)
-            final_state = AgentState.model_validate(raw_state)
+            # Channel values are already typed (every node writes through an
+            # AgentState), so skip re-validating the whole state
+            final_state = AgentState.model_construct(**raw_state)
 
             # Debug log: Show retrieval status
             logger.debug(
-                f"[WORKFLOW] Retrieval status:\n"
-                f"  - Pedal: '{final_state.pedal_name}'\n"
-                f"  - Namespace: '{final_state.pinecone_namespace}'\n"
-                f"  - Chunks retrieved: {len(final_state.retrieved_chunks)}\n"
-                f"  - Retrieval attempted: {bool(final_state.pinecone_namespace)}"
+                "[WORKFLOW] Retrieval status:\n"
+                "  - Pedal: '%s'\n"
+                "  - Namespace: '%s'\n"
+                "  - Chunks retrieved: %d\n"
+                "  - Retrieval attempted: %s",
+                final_state.pedal_name,
+                final_state.pinecone_namespace,
+                len(final_state.retrieved_chunks),
+                bool(final_state.pinecone_namespace),
             )
             
             # Debug log: Show quality check status 
             logger.debug(
-                f"[WORKFLOW] Quality status:\n"
-                f"  - Hallucination flag: {final_state.hallucination_flag}\n"
-                f"  - Confidence: {final_state.confidence_score:.2f}\n"
-                f"  - Needs review: {final_state.needs_human_review}"
+                "[WORKFLOW] Quality status:\n"
+                "  - Hallucination flag: %s\n"
+                "  - Confidence: %.2f\n"
+                "  - Needs review: %s",
+                final_state.hallucination_flag,
+                final_state.confidence_score,
+                final_state.needs_human_review,
             )
             
-            logger.info(
-                f"Workflow complete: {' → '.join(final_state.agent_path)}"
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Workflow complete: %s", " → ".join(final_state.agent_path))
+
+            # Errors and fallback answers must not be replayed to later callers
+            if (cache is not None and not final_state.error
+                    and final_state.fallback_reason in (None, FallbackReason.NONE)):
+                snapshot = {}
+                for name in _CACHED_FIELDS:
+                    value = getattr(final_state, name)
+                    snapshot[name] = list(value) if isinstance(value, list) else value
+                await cache.set(state.query, state.pedal_name, snapshot, vector)
             
             return final_state
             
         except Exception as e:
-            logger.error(f"Workflow failed: {e}")
+            logger.error("Workflow failed: %s", e)
             
             # Return state with error
             state.error = f"Workflow error: {str(e)}"
@@ -422,8 +627,166 @@ class PedalBotGraph:
             
             return state
 
-        
+
+    async def aclose(self) -> None:
+        """Release the shared HTTP and Pinecone connection pools (call on shutdown)."""
+        await self.manual_agent.pinecone.aclose()
+        if self.pricing_agent is not None:
+            await self.pricing_agent.aclose()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+
+# SHARED COMPILED GRAPH
+_GRAPH_CONFIG_KEY = "pedalbot_graph"
+
+# Pass to graph.astream() to receive manual-agent answer tokens as "custom" events
+TOKEN_STREAM_CONFIG: RunnableConfig = {"configurable": {TOKEN_STREAM_CONFIG_KEY: True}}
+
+
+def _bound_graph(config: RunnableConfig) -> "PedalBotGraph":
+    """Get the PedalBotGraph that owns the current run."""
+    return config["configurable"][_GRAPH_CONFIG_KEY]
+
+
+# AgentState fields with append reducers - nodes emit only new entries
+_APPEND_ONLY_FIELDS = ("agent_path", "context")
+
+
+def _state_delta(before: Dict[str, Any], result: AgentState) -> Dict[str, Any]:
+    """
+    Turn an agent's mutated state into a partial update.
+    
+    Agents mutate the state in place and return it. Only fields they rebound
+    are written back; append-only lists contribute just the entries added
+    since before was taken.
+    """
+    update = {
+        name: value for name, value in result.__dict__.items()
+        if value is not before.get(name) and name not in _APPEND_ONLY_FIELDS
+    }
+    for name in _APPEND_ONLY_FIELDS:
+        added = getattr(result, name)[len(before[name]):]
+        if added:
+            update[name] = added
+    return update
+
+
+def _node(method_name: str):
+    """Module-level node that delegates to the run's PedalBotGraph method."""
+    async def node(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+        # Lists are snapshotted by length, everything else by identity
+        before = dict(state.__dict__)
+        for name in _APPEND_ONLY_FIELDS:
+            before[name] = range(len(before[name]))
+        result = await getattr(_bound_graph(config), method_name)(state)
+        if isinstance(result, dict):
+            return result
+        return _state_delta(before, result)
+    node.__name__ = method_name
+    return node
+
+
+def _edge(method_name: str):
+    """Module-level edge condition that delegates to the run's PedalBotGraph method."""
+    def edge(state: AgentState, config: RunnableConfig) -> str:
+        return getattr(_bound_graph(config), method_name)(state)
+    edge.__name__ = method_name
+    return edge
+
+
+def _build_graph() -> CompiledStateGraph:
+    """
+    Build and compile the LangGraph workflow.
+    
+    Topology is the same for every PedalBotGraph, so this runs once at
+    import. Node and edge functions look up the owning PedalBotGraph from
+    the run config and delegate to its bound methods.
+    """
+
+    # Create Graph with AgentState
+    workflow = StateGraph(AgentState)
+
+    # Add nodes
+    workflow.add_node("router", _node("_router_node"))
+    workflow.add_node("manual_agent", _node("_manual_agent_node"))
+    workflow.add_node("pricing_agent", _node("_pricing_agent_node"))
+    workflow.add_node("hybrid_agent", _node("_hybrid_agent_node"))  # NEW: Runs both agents
+    workflow.add_node("quality_check", _node("_quality_check_node"))
+    workflow.add_node("synthesizer", _node("_synthesizer_node"))
+    workflow.add_node("fallback", _node("_fallback_node"))
+
+    workflow.set_entry_point("router")
+
+    # Router routing logic
+    # NOTE: explanation_agent not implemented yet, so route to manual_agent as fallback
+    workflow.add_conditional_edges(
+        "router",
+        _edge("_route_after_router"),
+        {
+            "manual_agent": "manual_agent",
+            "pricing_agent": "pricing_agent", 
+            "explanation": "manual_agent",  # Fallback: use manual for explanation until explainer is built
+            "hybrid": "hybrid_agent",  # NEW: Route to hybrid node that calls BOTH agents
+            "casual": END,  # CASUAL: Router already set final_answer
+        }
+    )
+
+    # specialist agents → quality check (self-checked manual answers skip it)
+    workflow.add_conditional_edges(
+        "manual_agent",
+        _edge("_route_after_manual"),
+        {
+            "quality_check": "quality_check",
+            "synthesizer": "synthesizer",
+            "fallback": "fallback",
+        }
+    )
+    workflow.add_edge("pricing_agent", "quality_check")
+    workflow.add_edge("hybrid_agent", "quality_check")  
+
+    # Quality check routing
+    workflow.add_conditional_edges(
+        "quality_check",
+        _edge("_route_after_quality_check"),
+        {
+            "synthesizer": "synthesizer",
+            "fallback": "fallback",
+        }
+    )
+
+    # End nodes
+    workflow.add_edge("synthesizer", END)
+    workflow.add_edge("fallback", END)
+    
+    return workflow.compile()
+
+
+_COMPILED_GRAPH: CompiledStateGraph = _build_graph()
+
+
 # CONVENIENCE FUNCTIONS
+# I/O-sized default executor per event loop. The loop shuts it down when it
+# closes, and the entry disappears along with the loop.
+_IO_EXECUTORS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ThreadPoolExecutor]" = weakref.WeakKeyDictionary()
+
+
+def _install_io_executor() -> None:
+    """
+    Make the running loop's default executor I/O-sized, once per loop.
+    
+    Sync SDK calls (Pinecone, VoyageAI) run in the default executor, so it
+    is sized for I/O-bound work rather than the CPU-based default. Repeat
+    factory calls reuse it instead of leaking a new pool each time.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _IO_EXECUTORS:
+        executor = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 5)
+        loop.set_default_executor(executor)
+        _IO_EXECUTORS[loop] = executor
+
+
 async def create_pedalbot_graph(
     voyageai_api_key: str,
     groq_api_key: str,
@@ -445,6 +808,16 @@ async def create_pedalbot_graph(
     from backend.services.pinecone_client import PineconeClient
     from backend.services.embeddings import EmbeddingService
 
+    _install_io_executor()
+
+    # One pooled HTTP/2 client shared by every agent, so TLS connections to
+    # Groq and Reverb are reused across requests
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+
     # Initialize services
     pinecone_client = PineconeClient(
         api_key=pinecone_api_key,
@@ -459,23 +832,28 @@ async def create_pedalbot_graph(
     # Initialize agents
     router = RouterAgent(
         api_key=groq_api_key,
-        model="llama-3.1-8b-instant"
+        model="llama-3.1-8b-instant",
+        embeddings_service=embeddings_service,
+        http_client=http_client
     )
     
     manual_agent = ManualAgent(
         groq_api_key=groq_api_key,
         pinecone_client=pinecone_client,
         embeddings_service=embeddings_service,
-        model="llama-3.3-70b-versatile"
+        model="llama-3.3-70b-versatile",
+        http_client=http_client
     )
 
     pricing_agent = PricingAgent(
-        reverb_api_key=reverb_api_key
+        reverb_api_key=reverb_api_key,
+        http_client=http_client
     )
 
     quality_check = QualityCheckAgent(
         api_key=groq_api_key,
-        model="llama-3.1-8b-instant"
+        model="llama-3.1-8b-instant",
+        http_client=http_client
     )
 
     # Create graph
@@ -483,14 +861,177 @@ async def create_pedalbot_graph(
         router_agent=router,
         manual_agent=manual_agent,
         pricing_agent=pricing_agent,
-        quality_check_agent=quality_check
+        quality_check_agent=quality_check,
+        http_client=http_client,
+        response_cache=ResponseCache(embeddings_service=embeddings_service)
     )
     
     return graph
 
 
+# RESPONSE CACHE
+# Final-state fields replayed on a cache hit
+_CACHED_FIELDS = (
+    "final_answer", "intent", "confidence_score", "agent_path",
+    "hallucination_flag", "retrieved_chunks", "pedal_name",
+)
+
+
+class ResponseCache:
+    """
+    In-process cache of completed workflow results, applied by PedalBotGraph.run.
+
+    Two tiers:
+    - Exact: LRU keyed on (normalized query, pedal_name)
+    - Semantic (optional): nearest-neighbour SemanticCache over query
+      embeddings, scoped by pedal_name, enabled when an EmbeddingService
+      is supplied
+
+    Entries expire after ttl_seconds; expired entries are dropped on access
+    and swept from the exact tier on insert at most every sweep_interval
+    seconds (the semantic tier checks age on hit and its ring buffer
+    overwrites old entries as it fills).
+    """
+
+    def __init__(self,
+                max_size: int = 512,
+                ttl_seconds: float = 3600.0,
+                embeddings_service=None,
+                similarity_threshold: float = 0.95,
+                sweep_interval: float = 60.0):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Max entries per tier
+            ttl_seconds: Seconds a cached response stays valid
+            embeddings_service: Enables the semantic tier when provided
+            similarity_threshold: Min cosine similarity for a semantic hit
+            sweep_interval: Min seconds between expired-entry sweeps on insert
+        """
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.embeddings = embeddings_service
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._semantic = None
+        if embeddings_service is not None:
+            self._semantic = SemanticCache(
+                dimension=embeddings_service.get_dimension(),
+                capacity=max_size,
+                threshold=similarity_threshold,
+            )
+
+    @staticmethod
+    def make_key(query: str, pedal_name: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Normalize (query, pedal_name) into a cache key."""
+        return (" ".join(query.strip().lower().split()), pedal_name)
+
+    async def get(self, query: str,
+                pedal_name: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            (response or None, query embedding to pass back to set() on a miss)
+        """
+        key = self.make_key(query, pedal_name)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            response, stored_at = entry
+            if now - stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                return response, None
+            del self._entries[key]
+
+        if self._semantic is None:
+            return None, None
+
+        vector = await self._embed(key[0])
+        if vector is None:
+            return None, None
+
+        hit = self._semantic.lookup(vector, scope=pedal_name)
+        if hit is not None and now - hit[1] < self.ttl:
+            logger.info("[RESPONSE_CACHE] Semantic hit")
+            return hit[0], vector
+        return None, vector
+
+    async def set(self, query: str, pedal_name: Optional[str], response: Dict[str, Any],
+                vector: Optional[List[float]] = None) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        key = self.make_key(query, pedal_name)
+        now = time.monotonic()
+
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+
+        self._entries[key] = (response, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        if self._semantic is not None:
+            if vector is None:
+                vector = await self._embed(key[0])
+            if vector is not None:
+                self._semantic.insert(vector, (response, now), scope=pedal_name)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+        if self._semantic is not None:
+            self._semantic.clear()
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries from the exact tier."""
+        expired = [k for k, (_, stored_at) in self._entries.items() if now - stored_at >= self.ttl]
+        for k in expired:
+            del self._entries[k]
+        self._last_sweep = now
+
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """Embed normalized query text; failures just disable the semantic tier."""
+        try:
+            result = await self.embeddings.embed_single(text)
+            return result.embeddings[0]
+        except Exception as e:
+            logger.warning("[RESPONSE_CACHE] Embedding failed, skipping semantic tier: %s", e)
+            return None
+
+
+# STATE POOL
+# Reuse AgentState instances across query_pedalbot calls instead of
+# allocating a fresh model + inner lists per request. pop/append on a
+# deque never yield to the event loop, so no lock is needed.
+_STATE_POOL_SIZE = 256
+_state_pool: "deque[AgentState]" = deque(maxlen=_STATE_POOL_SIZE)
+
+
+def _acquire_state(**fields: Any) -> AgentState:
+    """Take a reset AgentState from the pool (or build one) and fill in fields."""
+    try:
+        state = _state_pool.pop()
+    except IndexError:
+        return AgentState(**fields)
+    for name, value in fields.items():
+        setattr(state, name, value)
+    return state
+
+
+def _release_state(state: AgentState) -> None:
+    """Reset a state and return it to the pool."""
+    state._reset()
+    _state_pool.append(state)
+
+
 async def query_pedalbot(query: str, graph: PedalBotGraph,
-                        pedal_name: Optional[str] = None) -> Dict[str, Any]:
+                        pedal_name: Optional[str] = None,
+                        use_cache: bool = True) -> Dict[str, Any]:
     """
     Convenience function to query PedalBot.
     
@@ -498,6 +1039,7 @@ async def query_pedalbot(query: str, graph: PedalBotGraph,
         query: User query
         pedal_name: Pedal name
         graph: PedalBotGraph instance
+        use_cache: Set False to bypass the graph's response cache
     
     Returns:
         Dict with answer and metadata
@@ -505,8 +1047,8 @@ async def query_pedalbot(query: str, graph: PedalBotGraph,
 
     from datetime import datetime, UTC
 
-    # Create initial state
-    state = AgentState(
+    # Create initial state (pooled - the graph runs on its own copy)
+    state = _acquire_state(
         user_id="temp_user",
         conversation_id="temp_conv",
         query=query,
@@ -514,17 +1056,22 @@ async def query_pedalbot(query: str, graph: PedalBotGraph,
         created_at=datetime.now(UTC)
     )
     
-    # Run graph
-    final_state = await graph.run(state)
-    
-    return {
-        "answer": final_state.final_answer,
-        "intent": final_state.intent.value if final_state.intent else None,
-        "confidence": final_state.confidence_score,
-        "agent_path": final_state.agent_path,
-        "hallucination_flag": final_state.hallucination_flag,
-        "error": final_state.error,
-    }
+    try:
+        # Run graph
+        final_state = await graph.run(state, use_cache=use_cache)
+        
+        # Copy out before the state goes back to the pool (on error or a cache
+        # hit, run() returns the input state itself, which the release resets)
+        return {
+            "answer": final_state.final_answer,
+            "intent": final_state.intent.value if final_state.intent else None,
+            "confidence": final_state.confidence_score,
+            "agent_path": list(final_state.agent_path),
+            "hallucination_flag": final_state.hallucination_flag,
+            "error": final_state.error,
+        }
+    finally:
+        _release_state(state)
 
 
 # STREAMING SUPPORT
@@ -550,14 +1097,19 @@ async def stream_pedalbot_response(
         created_at=datetime.now(UTC)
     )
 
-    # Stream through graph
-    async for event in graph.graph.astream(state):
+    # Stream through graph ("custom" carries hybrid partial results)
+    async for mode, event in graph.graph.astream(state, TOKEN_STREAM_CONFIG,
+                                                stream_mode=["updates", "custom"]):
+        if mode == "custom":
+            yield event
+            continue
+
         # Yield intermediate results
         if isinstance(event, dict):
             for node_name, node_state in event.items():
                 yield {
                     "node": node_name,
                     "state": node_state,
-                    "answer_partial": node_state.raw_answer if hasattr(node_state, 'raw_answer')
+                    "answer_partial": node_state.get("raw_answer") if isinstance(node_state, dict)
                     else None
                 }
@@ -12,23 +12,44 @@ Architecture:
 - System prompt questions get a safe, professional response
 """
 
+import asyncio
+import functools
+import json
+import re
+import time
+from collections import OrderedDict
+from operator import itemgetter
+import httpx
+import numpy as np
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from typing import List, Dict, Any, Optional
+from langgraph.config import get_config, get_stream_writer
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
-from backend.state import AgentState
+from backend.state import AgentState, AgentIntent
 from backend.services.pinecone_client import PineconeClient, SearchResult
 from backend.services.embeddings import EmbeddingService
+from backend.services.pedal_registry import resolve_pedal, get_pedal_registry
 from backend.prompts.manual_prompts import (
     PEDALBOT_IDENTITY,
     CONTEXT_TEMPLATE,
     SYSTEM_PROMPT_RESPONSE,
+    SELF_CHECK_TEMPLATE,
     is_system_prompt_question,
 )
 
 logger = logging.getLogger(__name__)
 
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+# Start of the "answer" string value in a self-check reply
+_ANSWER_FIELD_RE = re.compile(r'"answer"\s*:\s*"')
+_HIGH_SURROGATES = ("d8", "d9", "da", "db")
+_role_and_content = itemgetter("role", "content")
+# Configurable key a streaming caller sets to receive "manual_agent.token"
+# events; other runs generate in one call (JSON mode when self-checking)
+TOKEN_STREAM_CONFIG_KEY = "stream_answer_tokens"
+
 class ManualAgent:
     """
     Answers questions using pedal manual content via RAG.
@@ -52,6 +73,12 @@ class ManualAgent:
         temperature: float = 0.1,
         top_k: int = 5,
         min_score: float = 0.5,  # Lowered from 0.7 - OCR text may not match as precisely
+        http_client: Optional[httpx.AsyncClient] = None,
+        self_check: bool = True,
+        self_check_threshold: float = 0.5,
+        embed_cache_size: int = 1024,
+        embed_cache_ttl: float = 3600.0,
+        namespace_cache_ttl: float = 300.0,
     ):
         
         """
@@ -65,13 +92,22 @@ class ManualAgent:
             temperature: Low temp for factual answers
             top_k: Number of chunks to retrieve
             min_score: Minimum similarity score to include chunk
+            http_client: Shared pooled HTTP client for Groq calls (optional)
+            self_check: Have the answer call also grade its own grounding, so
+                non-hybrid answers skip the separate quality-check LLM call
+            self_check_threshold: Self-confidence below which an ungrounded
+                answer is flagged as a hallucination
+            embed_cache_size: Max query embeddings kept in memory
+            embed_cache_ttl: Seconds a cached query embedding stays valid
+            namespace_cache_ttl: Seconds a resolved pedal namespace stays valid
         """
 
         self.llm = ChatGroq(
             api_key=groq_api_key,
             model=model,
             temperature=temperature,
-            max_tokens=500
+            max_tokens=500,
+            http_async_client=http_client
         )
         self.pinecone = pinecone_client
         self.embeddings = embeddings_service
@@ -79,6 +115,20 @@ class ManualAgent:
         self.temperature = temperature
         self.top_k = top_k
         self.min_score = min_score
+        self.self_check = self_check
+        self.self_check_threshold = self_check_threshold
+
+        # JSON mode for fused answer + self-check generation
+        self.json_llm = self.llm.bind(response_format={"type": "json_object"})
+
+        # Query embedding cache: normalized text → (float32 vector, stored_at)
+        self.embed_cache_size = embed_cache_size
+        self.embed_cache_ttl = embed_cache_ttl
+        self._embed_cache: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+
+        # Namespace cache: normalized pedal name → (namespace, resolved_at)
+        self.namespace_cache_ttl = namespace_cache_ttl
+        self._ns_cache: Dict[str, Tuple[str, float]] = {}
 
     
     async def answer(self, state: AgentState) -> AgentState:
@@ -92,7 +142,7 @@ class ManualAgent:
             Updated state with answer and retrieved chunks
         """
 
-        logger.info(f"Manual agent processing: {state.query[:100]}")
+        logger.info("Manual agent processing: %.100s", state.query)
 
         try:
             # Step 0: Check for system prompt meta-questions
@@ -104,8 +154,11 @@ class ManualAgent:
                 state.agent_path.append("manual_agent")
                 return state
 
-            # Step 1: Get Pinecone namespace for this pedal
-            namespace = await self._get_namespace(state.pedal_name)
+            # Step 1: Get Pinecone namespace for this pedal (reuse an upstream resolution)
+            if state.pedal_info is not None:
+                namespace = state.pedal_info.namespace
+            else:
+                namespace = await self._get_namespace(state.pedal_name)
             if not namespace:
                 state.error = f"No manual found for {state.pedal_name}"
                 state.raw_answer = f"I don't have a manual for '{state.pedal_name}' yet."
@@ -122,12 +175,21 @@ class ManualAgent:
             # Step 2: Embed query (use normalized query if available from preprocessing)
             query_for_embedding = state.normalized_query if state.normalized_query else state.query
             
-            logger.info(f"[MANUAL_AGENT] Embedding query: '{query_for_embedding[:100]}'")
+            logger.info("[MANUAL_AGENT] Embedding query: '%.100s'", query_for_embedding)
             if state.normalized_query and state.normalized_query != state.query:
-                logger.info(f"[MANUAL_AGENT] Using normalized query (original: '{state.query[:100]}')")
+                logger.info("[MANUAL_AGENT] Using normalized query (original: '%.100s')", state.query)
             
-            embedding_result = await self.embeddings.embed_single(query_for_embedding)
-            query_embedding = embedding_result.embeddings[0]
+            # Broader query used if nothing relevant comes back
+            fallback_query = f"{state.pedal_name} features specifications setup connections power"
+            
+            if state.query_embedding is not None:
+                # Already embedded upstream (router intent cache / hybrid node)
+                query_embedding = state.query_embedding
+            else:
+                # One embedding request covers the fallback query too (a no-op
+                # for it once cached)
+                query_embedding, _ = await self._embed_many_cached([query_for_embedding, fallback_query])
+                state.query_embedding = query_embedding
 
             # Step 3: Adaptive threshold based on query length
             # Short/vague queries need lower threshold since embeddings are less precise
@@ -139,52 +201,11 @@ class ManualAgent:
             else:
                 effective_min_score = self.min_score  # Use default for longer queries
             
-            logger.info(f"[MANUAL_AGENT] Query has {query_words} words, using min_score={effective_min_score}")
+            logger.info("[MANUAL_AGENT] Query has %d words, using min_score=%s", query_words, effective_min_score)
 
-            # Step 4: Search Pinecone
-            logger.info(f"[MANUAL_AGENT] Searching namespace '{namespace}'")
-            results = self.pinecone.search(
-                query_embedding=query_embedding,
-                namespace=namespace,
-                top_k=self.top_k,
-                include_metadata=True
+            results, filtered_results, filtered_scores = await self._search_with_fallback(
+                query_embedding, namespace, effective_min_score, fallback_query
             )
-
-            # Log raw results before filtering
-            if results:
-                scores = [r.score for r in results]
-                logger.info(f"[MANUAL_AGENT] Raw search returned {len(results)} results. Scores: {scores}")
-            else:
-                logger.warning(f"[MANUAL_AGENT] Pinecone search returned NO results for namespace '{namespace}'")
-
-            # Filter by adaptive score
-            filtered_results = [r for r in results if r.score >= effective_min_score]
-            
-            logger.info(f"[MANUAL_AGENT] After filtering (min_score={effective_min_score}): {len(filtered_results)} results")
-            
-            # FALLBACK: If no results, try a broader search with pedal context
-            if not filtered_results and results:
-                logger.info("[MANUAL_AGENT] Trying fallback query rewrite...")
-                
-                # Create a broader fallback query
-                fallback_query = f"{state.pedal_name} features specifications setup connections power"
-                fallback_embedding_result = await self.embeddings.embed_single(fallback_query)
-                fallback_embedding = fallback_embedding_result.embeddings[0]
-                
-                fallback_results = self.pinecone.search(
-                    query_embedding=fallback_embedding,
-                    namespace=namespace,
-                    top_k=self.top_k,
-                    include_metadata=True
-                )
-                
-                if fallback_results:
-                    fallback_scores = [r.score for r in fallback_results]
-                    logger.info(f"[MANUAL_AGENT] Fallback search returned {len(fallback_results)} results. Scores: {fallback_scores}")
-                    
-                    # Use even lower threshold for fallback
-                    filtered_results = [r for r in fallback_results if r.score >= 0.25]
-                    logger.info(f"[MANUAL_AGENT] Fallback filtering (min_score=0.25): {len(filtered_results)} results")
             
             if not filtered_results:
                 # Log what we would have had if threshold was lower
@@ -201,10 +222,8 @@ class ManualAgent:
                 state.confidence_score = 0.0
                 return state
             
-            # Step 4: Build context
-            context = self._build_context(filtered_results)
-            
-            # Store chunks WITH metadata for the frontend
+            # Step 4: Build context - the chunks stored WITH metadata for the
+            # frontend are the same excerpts the LLM sees, so format them once
             formatted_chunks = []
             for i, r in enumerate(filtered_results, 1):
                 page = r.metadata.get("page_number", "unknown")
@@ -213,24 +232,49 @@ class ManualAgent:
                     f"[Excerpt {i} - Page {page}, Section: {section}]\n{r.text}"
                 )
             
+            context = "\n\n".join(formatted_chunks)
             state.retrieved_chunks = formatted_chunks
-            state.retrieval_scores = [r.score for r in filtered_results]
+            state.retrieval_scores = filtered_scores.tolist()
             
             # Step 5: Generate answer
+            # Hybrid answers are cross-validated by QualityCheckAgent, so only
+            # single-source answers fold the grounding check into this call
+            self_check = self.self_check and state.intent != AgentIntent.HYBRID
             answer = await self._generate_answer(
                 state.query, 
                 context,
                 state.pedal_name,
-                state.conversation_history
+                state.conversation_history,
+                num_chunks=len(filtered_results) if self_check else 0
             )
             
+            state.confidence_score = self._calculate_confidence(filtered_results, filtered_scores)
+            
+            checked = self._parse_self_check(answer) if self_check else None
+            if checked:
+                answer, grounded_in, self_confidence = checked
+                state.hallucination_flag = not grounded_in and self_confidence < self.self_check_threshold
+                state.needs_human_review = self_confidence < self.self_check_threshold
+                if state.needs_human_review:
+                    state.confidence_score *= 0.5
+                state.skip_quality_check = True
+                state.context.append(
+                    f"Self-check: grounded in excerpts {grounded_in}, confidence {self_confidence:.2f}"
+                )
+            elif self_check and answer.lstrip().startswith(("{", "```")):
+                # Malformed or truncated JSON reply - never show the envelope.
+                # Salvage the answer field, or regenerate in plain mode; either
+                # way QualityCheckAgent validates it.
+                answer = _lenient_answer(answer) or await self._generate_answer(
+                    state.query, context, state.pedal_name, state.conversation_history
+                )
+            
             state.raw_answer = answer
-            state.confidence_score = self._calculate_confidence(filtered_results)
             state.agent_path.append("manual_agent")
             
             logger.info(
-                f"Generated answer (confidence: {state.confidence_score:.2f}, "
-                f"chunks: {len(filtered_results)})"
+                "Generated answer (confidence: %.2f, chunks: %d)",
+                state.confidence_score, len(filtered_results)
             )
             
             return state
@@ -242,6 +286,148 @@ class ManualAgent:
             return state
 
     
+    async def _search_with_fallback(
+        self,
+        query_embedding: List[float],
+        namespace: str,
+        min_score: float,
+        fallback_query: str,
+    ) -> Tuple[List[SearchResult], List[SearchResult], np.ndarray]:
+        """
+        Search Pinecone, retrying with a broader query if nothing passes min_score.
+        
+        Args:
+            query_embedding: Primary query vector
+            namespace: Pinecone namespace
+            min_score: Adaptive score threshold for primary results
+            fallback_query: Broader query to retry with
+        
+        Returns:
+            (raw primary results, filtered results to answer from, their
+            similarity scores as a float array in the same order)
+        """
+        # Step 4: Search Pinecone
+        logger.info("[MANUAL_AGENT] Searching namespace '%s'", namespace)
+        fallback_results = None
+        fallback_embedding = self._get_cached_embedding(fallback_query)
+        
+        if fallback_embedding is not None:
+            # Fallback vector is already known (cached per pedal): search with
+            # both in one batch so an empty primary result costs no extra round trip
+            results, fallback_results = await self.pinecone.asearch_batch(
+                query_embeddings=[query_embedding, fallback_embedding],
+                namespace=namespace,
+                top_k=self.top_k,
+                include_metadata=True
+            )
+        else:
+            # Speculatively embed the fallback query while the primary search
+            # runs; cancelled if the primary results are good enough
+            fallback_task = asyncio.create_task(self._embed_cached(fallback_query))
+            try:
+                results = await self.pinecone.asearch(
+                    query_embedding=query_embedding,
+                    namespace=namespace,
+                    top_k=self.top_k,
+                    include_metadata=True
+                )
+                if results and not (_scores(results) >= min_score).any():
+                    fallback_embedding = await fallback_task
+            finally:
+                _cancel_quietly(fallback_task)
+
+        # Log raw results before filtering
+        scores = _scores(results)
+        if results:
+            logger.info("[MANUAL_AGENT] Raw search returned %d results. Scores: %s", len(results), scores.tolist())
+        else:
+            logger.warning(f"[MANUAL_AGENT] Pinecone search returned NO results for namespace '{namespace}'")
+
+        # Filter by adaptive score
+        keep = np.flatnonzero(scores >= min_score)
+        filtered_results = [results[i] for i in keep]
+        filtered_scores = scores[keep]
+        
+        logger.info("[MANUAL_AGENT] After filtering (min_score=%s): %d results", min_score, len(filtered_results))
+        
+        # FALLBACK: If no results, try a broader search with pedal context
+        if not filtered_results and results:
+            logger.info("[MANUAL_AGENT] Trying fallback query rewrite...")
+            
+            if fallback_results is None:
+                fallback_results = await self.pinecone.asearch(
+                    query_embedding=fallback_embedding,
+                    namespace=namespace,
+                    top_k=self.top_k,
+                    include_metadata=True
+                )
+            
+            if fallback_results:
+                fallback_scores = _scores(fallback_results)
+                logger.info("[MANUAL_AGENT] Fallback search returned %d results. Scores: %s", len(fallback_results), fallback_scores.tolist())
+                
+                # Use even lower threshold for fallback
+                keep = np.flatnonzero(fallback_scores >= 0.25)
+                filtered_results = [fallback_results[i] for i in keep]
+                filtered_scores = fallback_scores[keep]
+                logger.info("[MANUAL_AGENT] Fallback filtering (min_score=0.25): %d results", len(filtered_results))
+
+        return results, filtered_results, filtered_scores
+
+    async def _embed_cached(self, text: str) -> List[float]:
+        """
+        Embed text, reusing the vector from an earlier identical query.
+        
+        Args:
+            text: Text to embed (matched case/whitespace-insensitively)
+        
+        Returns:
+            Embedding vector
+        """
+        return (await self._embed_many_cached([text]))[0]
+
+    async def _embed_many_cached(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts, sending only the cache misses in a single request.
+        
+        Args:
+            texts: Non-empty texts to embed
+        
+        Returns:
+            One embedding per text, in order
+        """
+        embeddings = [self._get_cached_embedding(text) for text in texts]
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not misses:
+            return embeddings
+
+        result = await self.embeddings.embed_texts([texts[i] for i in misses])
+
+        now = time.monotonic()
+        for i, embedding in zip(misses, result.embeddings):
+            embeddings[i] = embedding
+            self._embed_cache[_embed_key(texts[i])] = (np.asarray(embedding, dtype=np.float32), now)
+        while len(self._embed_cache) > self.embed_cache_size:
+            self._embed_cache.popitem(last=False)
+
+        return embeddings
+
+    def _get_cached_embedding(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for text, or None if missing/expired."""
+        key = _embed_key(text)
+        entry = self._embed_cache.get(key)
+        if entry is None:
+            return None
+
+        vector, stored_at = entry
+        if time.monotonic() - stored_at >= self.embed_cache_ttl:
+            del self._embed_cache[key]
+            return None
+
+        self._embed_cache.move_to_end(key)
+        logger.debug("[MANUAL_AGENT] Embedding cache hit")
+        return vector.tolist()
+
     async def _get_namespace(self, pedal_name: str) -> Optional[str]:
         """
         Get Pinecone namespace for a pedal using the PedalRegistry.
@@ -258,63 +444,44 @@ class ManualAgent:
         if not pedal_name:
             logger.warning("Empty pedal_name provided")
             return None
-        
+
+        key = pedal_name.strip().lower()
+        cached = self._ns_cache.get(key)
+        if cached and time.monotonic() - cached[1] < self.namespace_cache_ttl:
+            return cached[0]
+
         try:
             # Use the PedalRegistry for fuzzy matching
-            from backend.services.pedal_registry import resolve_pedal
-            
-            logger.debug(f"[NAMESPACE] Resolving pedal: '{pedal_name}'")
+            logger.debug("[NAMESPACE] Resolving pedal: '%s'", pedal_name)
             
             pedal_info = await resolve_pedal(pedal_name)
             
             if not pedal_info:
                 logger.warning(f"[NAMESPACE] No pedal found matching: '{pedal_name}'")
-                # Log available pedals for debugging
-                from backend.services.pedal_registry import get_pedal_registry
-                registry = await get_pedal_registry()
-                available = await registry.list_all()
-                available_names = [p.display_name for p in available]
-                logger.debug(f"[NAMESPACE] Available pedals: {available_names}")
+                # Log available pedals for debugging (a full registry listing,
+                # so only when DEBUG output will actually be emitted)
+                if logger.isEnabledFor(logging.DEBUG):
+                    registry = await get_pedal_registry()
+                    available = await registry.list_all()
+                    logger.debug("[NAMESPACE] Available pedals: %s", [p.display_name for p in available])
                 return None
             
             logger.info(
-                f"[NAMESPACE] Resolved '{pedal_name}' → "
-                f"namespace='{pedal_info.namespace}', "
-                f"type={pedal_info.pedal_type.value}"
+                "[NAMESPACE] Resolved '%s' → namespace='%s', type=%s",
+                pedal_name, pedal_info.namespace, pedal_info.pedal_type.value
             )
-            
+
+            # Only successful resolutions are cached - a miss may be a pedal still ingesting
+            self._ns_cache[key] = (pedal_info.namespace, time.monotonic())
             return pedal_info.namespace
             
         except Exception as e:
             logger.error(f"[NAMESPACE] Error resolving '{pedal_name}': {e}")
             return None
 
-    def _build_context(self, results:List[SearchResult]) -> str:
-        """
-        Build context string from search results.
-        
-        Args:
-            results: Search results from Pinecone
-        
-        Returns:
-            Formatted context string
-        """
-
-        context_parts = []
-
-        for i, result in enumerate(results, 1):
-            page = result.metadata.get("page_number", "unknown")
-            section = result.metadata.get("section", "general")
-
-            context_parts.append(
-                f"[Excerpt {i} - Page {page}, Section: {section}]\n"
-                f"{result.text}\n"
-            )
-
-        return "\n".join(context_parts)
-
     
-    async def _generate_answer(self, query: str, context: str, pedal_name: str, conversation_history: List[Dict[str, str]] = None) -> str:
+    async def _generate_answer(self, query: str, context: str, pedal_name: str, conversation_history: Optional[List[Dict[str, str]]] = None,
+                            num_chunks: int = 0) -> str:
         """
         Generate answer using llama-3.3-70b-versatile with retrieved context.
         
@@ -323,47 +490,96 @@ class ManualAgent:
             context: Retrieved manual excerpts
             pedal_name: Name of the pedal being queried
             conversation_history: Previous messages for context
+            num_chunks: Number of excerpts in context; when set, the model
+                answers in the SELF_CHECK_TEMPLATE JSON format
         
         Returns:
-            Generated answer
+            Generated answer (raw JSON when num_chunks is set). Inside a
+            LangGraph stream the answer text is also emitted token by token
+            as "manual_agent.token" custom events - in self-check mode only
+            the decoded "answer" field is, never the JSON around it.
         """
 
         # THREE-LAYER MESSAGE ARCHITECTURE:
         # Layer 1: Identity prompt (behavioral rules only)
-        identity_prompt = PEDALBOT_IDENTITY.format(pedal_name=pedal_name)
+        identity_prompt = _identity_for(pedal_name)
         
         # Layer 2: Context injection (hidden, not exposed as "system prompt")
         context_prompt = CONTEXT_TEMPLATE.format(pedal_name=pedal_name, context=context)
 
-        # Build message list with separated layers
-        messages = [
-            SystemMessage(content=identity_prompt),  # Layer 1: Identity
-            SystemMessage(content=context_prompt),   # Layer 2: Context (hidden)
-        ]
+        # Build message list with separated layers, sized up front:
+        # System → System → [Self-check] → Human → AI → Human → AI → Human
+        history = conversation_history[-6:] if conversation_history else ()  # Last 3 exchanges
+        offset = 3 if num_chunks else 2
+        messages = [None] * (offset + len(history) + 1)
+        messages[0] = SystemMessage(content=identity_prompt)  # Layer 1: Identity
+        messages[1] = SystemMessage(content=context_prompt)   # Layer 2: Context (hidden)
+        if num_chunks:
+            messages[2] = SystemMessage(content=SELF_CHECK_TEMPLATE.format(num_chunks=num_chunks))
         
         # Add conversation history if available (for follow-up questions)
-        if conversation_history:
-            for msg in conversation_history[-6:]:  # Last 3 exchanges
-                role = msg.get("role", "user")
-                content = msg.get("content", "")
-                if role == "user":
-                    messages.append(HumanMessage(content=content))
-                else:
-                    # Use AIMessage for natural conversation flow:
-                    # System → System → Human → AI → Human → AI → Human
-                    messages.append(AIMessage(content=content))
+        for i, msg in enumerate(history, offset):
+            try:
+                role, content = _role_and_content(msg)
+            except KeyError:
+                role, content = msg.get("role", "user"), msg.get("content", "")
+            # Use AIMessage for natural conversation flow
+            messages[i] = (HumanMessage if role == "user" else AIMessage)(content=content)
         
         # Layer 3: User query
-        messages.append(HumanMessage(content=query))
+        messages[-1] = HumanMessage(content=query)
         
-        response = await self.llm.ainvoke(messages)
-
-        content = response.content
+        write_token = _token_writer()
+        if write_token is None:
+            # Not streaming: JSON mode guarantees a parseable self-check reply
+            response = await (self.json_llm if num_chunks else self.llm).ainvoke(messages)
+            content = response.content
+        else:
+            # The caller streams answer tokens: forward them as they arrive.
+            # The self-check JSON has the answer field first, so its text
+            # streams as it is decoded while the grading fields arrive
+            # afterwards. Trade-off: Groq won't stream in JSON mode, so here
+            # the JSON relies on the template's instruction alone, and a
+            # malformed reply is salvaged (or regenerated) by answer().
+            decoder = _AnswerFieldDecoder() if num_chunks else None
+            parts = []
+            async for chunk in self.llm.astream(messages):
+                if not chunk.content:
+                    continue
+                parts.append(chunk.content)
+                token = decoder.feed(chunk.content) if decoder else chunk.content
+                if token:
+                    write_token({"node": "manual_agent.token", "token": token})
+            content = "".join(parts)
+
+        # strip() hands back the same object when there is nothing to trim, so
+        # already-trimmed responses are not copied
         return content.strip() if content else ""
 
 
+    def _parse_self_check(self, content: str) -> Optional[Tuple[str, List[int], float]]:
+        """
+        Parse the fused answer + self-check JSON.
+        
+        Returns:
+            (answer, grounded_in_chunks, self_confidence), or None if the
+            response isn't usable - the answer then goes through QualityCheckAgent
+        """
+        try:
+            result = json.loads(_JSON_FENCE_RE.sub("", content))
+            answer = str(result["answer"]).strip()
+            grounded_in = [int(i) for i in result.get("grounded_in_chunks") or []]
+            self_confidence = min(1.0, max(0.0, float(result.get("self_confidence", 0.0))))
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"[MANUAL_AGENT] Could not parse self-check response: {e}")
+            return None
+        
+        if not answer:
+            return None
+        return answer, grounded_in, self_confidence
+
     
-    def _calculate_confidence(self, results: List[SearchResult]) -> float:
+    def _calculate_confidence(self, results: List[SearchResult], scores: np.ndarray) -> float:
         """
         Calculate confidence score based on retrieval quality.
         
@@ -371,20 +587,28 @@ class ManualAgent:
         - Top result has high similarity (>0.85)
         - Multiple results with good similarity (>0.75)
         - Results are from same section (consistency)
+
+        Args:
+            results: Filtered search results
+            scores: Their similarity scores, in the same order
         """
         if not results:
             return 0.0
         
         # Base score from top result
-        top_score = results[0].score
+        top_score = float(scores[0])
+
+        # A single result is trivially "same section": skip the array and metadata scans
+        if len(results) == 1:
+            return min(1.0, top_score + (0.07 if top_score > 0.75 else 0.05))
 
         # Boost if multiple good results
-        good_results = [r for r in results if r.score > 0.75]
-        consistency_boost = min(0.1, len(good_results) * 0.02)
+        consistency_boost = min(0.1, int((scores > 0.75).sum()) * 0.02)
 
         # Boost if results from same section (indicates focus)
-        sections = [r.metadata.get('section') for r in results]
-        if len(set(sections)) == 1:
+        # (stops at the first differing section instead of building a set)
+        first_section = results[0].metadata.get('section')
+        if all(r.metadata.get('section') == first_section for r in results[1:]):
             consistency_boost += 0.05
 
         confidence = min(1.0, top_score + consistency_boost)
@@ -393,6 +617,103 @@ class ManualAgent:
 
 
 # HELPER FUNCTIONS
+@functools.lru_cache(maxsize=32)
+def _identity_for(pedal_name: str) -> str:
+    """Identity prompt for a pedal (formatted once per pedal, not per query)."""
+    return PEDALBOT_IDENTITY.format(pedal_name=pedal_name)
+
+
+class _AnswerFieldDecoder:
+    """
+    Incrementally decode the "answer" string of a self-check JSON reply.
+    
+    Text is fed as it arrives; feed() returns the newly decoded part of the
+    answer, holding back an escape sequence split across chunks. Decoding
+    stops at the closing quote, and a reply cut off mid-string still yields
+    everything before the cut.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos: Optional[int] = None  # Next undecoded index in the answer value
+        self.done = False
+
+    def feed(self, text: str) -> str:
+        """Add reply text and return the answer text decoded from it."""
+        self._buf += text
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = _ANSWER_FIELD_RE.search(self._buf)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        buf, i, end = self._buf, self._pos, len(self._buf)
+        while i < end:
+            c = buf[i]
+            if c == '"':
+                self.done = True
+                break
+            if c != "\\":
+                i += 1
+                continue
+            if buf[i + 1:i + 2] != "u":
+                step = 2
+            elif buf[i + 2:i + 4].lower() in _HIGH_SURROGATES:
+                step = 12  # Surrogate pair - decode both halves together
+            else:
+                step = 6
+            if i + step > end:
+                break  # Escape split across chunks - wait for the rest
+            i += step
+
+        raw, self._pos = buf[self._pos:i], i
+        if not raw:
+            return ""
+        try:
+            return json.loads(f'"{raw}"', strict=False)
+        except ValueError:
+            self.done = True  # Invalid escape - stop rather than emit garbage
+            return ""
+
+
+def _lenient_answer(content: str) -> Optional[str]:
+    """Pull the "answer" text out of a malformed or truncated self-check reply."""
+    return _AnswerFieldDecoder().feed(content).strip() or None
+
+
+def _token_writer():
+    """
+    Return LangGraph's custom stream writer if the graph run was started
+    with TOKEN_STREAM_CONFIG_KEY set, else None (including outside a run).
+    """
+    try:
+        if not get_config().get("configurable", {}).get(TOKEN_STREAM_CONFIG_KEY):
+            return None
+        return get_stream_writer()
+    except RuntimeError:
+        return None
+
+
+def _scores(results: List[SearchResult]) -> np.ndarray:
+    """Collect result similarity scores into an array for vectorized filtering."""
+    return np.fromiter((r.score for r in results), dtype=np.float64, count=len(results))
+
+
+def _embed_key(text: str) -> str:
+    """Normalize text into an embedding cache key."""
+    return " ".join(text.lower().split())
+
+
+def _cancel_quietly(task: asyncio.Task) -> None:
+    """Cancel a speculative task whose result is no longer needed."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()  # Mark any error as retrieved so it isn't logged
+
+
 async def query_manual(query: str, pedal_name: str, agent: ManualAgent,
                     ) -> Dict[str, Any]:
     
@@ -443,13 +764,15 @@ def format_answer_with_sources(state: AgentState) -> str:
     if not state.raw_answer:
         return "No answer generated."
     
-    formatted = state.raw_answer
+    parts = [state.raw_answer]
     
     # Add sources if available
-    if state.retrieved_chunks and len(state.retrieved_chunks) > 0:
-        formatted += "\n\n**Sources:**\n"
-        for i, score in enumerate(state.retrieval_scores[:3], 1):
-            formatted += f"- Excerpt {i} (relevance: {score:.0%})\n"
+    if state.retrieved_chunks:
+        parts.append("\n\n**Sources:**\n")
+        parts.extend(
+            f"- Excerpt {i} (relevance: {score:.0%})\n"
+            for i, score in enumerate(state.retrieval_scores[:3], 1)
+        )
     
     # Add confidence indicator
     if state.confidence_score > 0:
@@ -458,7 +781,7 @@ def format_answer_with_sources(state: AgentState) -> str:
             else "Medium" if state.confidence_score > 0.6
             else "Low"
         )
-        formatted += f"\n*Confidence: {confidence_label}*"
+        parts.append(f"\n*Confidence: {confidence_label}*")
     
-    return formatted
+    return "".join(parts)
     
@@ -3,16 +3,78 @@ Pricing Agent: Fetches and analyzes pedal market prices.
 
 Integrates with Reverb API for real-time pricing data.
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+import asyncio
+import functools
 import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, UTC
-import statistics
 import httpx
+import numpy as np
+import orjson
+from pymongo import UpdateOne
 
+from backend.db.mongodb import MongoDB
 from backend.state import AgentState
+from backend.services.pedal_registry import PedalInfo, resolve_pedal
 
 logger = logging.getLogger(__name__)
 
+# Listings kept per pedal (all priced listings still count toward the stats)
+MAX_LISTINGS = 10
+
+
+@dataclass(slots=True)
+class ParsedListing:
+    """One Reverb listing while parsing (converted to a plain dict before it leaves the agent)."""
+    listing_id: Optional[int]
+    price_usd: float
+    condition: str
+    url: str
+    seller_name: str
+    shipping_usd: float
+    listed_at: datetime
+
+# Common filename artifacts stripped from pedal names (case-insensitive)
+_CLEANUP_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\s+eng\d*',              # eng, eng03, etc
+        r'\s+[a-z]{2}\d+$',        # language codes like fr01, de02
+        r'\s+w$',                   # trailing W
+        r'\s+\d+\.\d+',            # version numbers like 3.80
+        r"\s*owner'?s?\s*manual",  # owner's manual
+        r'\s*user\s*manual',       # user manual
+        r'\s*manual$',             # trailing manual
+        r'\s*english$',            # trailing english
+        r'\s*\(\d+\)$',            # duplicate markers like (1)
+        r'_+',                      # underscores → spaces
+    )
+]
+
+# "GT 1" → "GT-1", "DS 1" → "DS-1"
+_MODEL_NUMBER_RE = re.compile(r'\b([A-Za-z]+)\s+(\d+)\b')
+
+_PRODUCT_SEPARATORS_RE = re.compile(r'[\s\-_]+')
+
+
+def _product_key(name: str) -> str:
+    """Separator-insensitive product key: "GT-1", "gt1" and "gt 1" → "gt1"."""
+    return _PRODUCT_SEPARATORS_RE.sub('', name.lower())
+
+
+_PRICING_ANSWER_TEMPLATE = (
+    "Based on {total_listings} active listings on Reverb, the **{pedal_name}** "
+    "currently sells for an average of **${avg_price:.2f}**. "
+    "Prices range from ${min_price:.2f} to ${max_price:.2f}, depending on condition."
+)
+
+# Cached price fields returned on a cache hit. price_info never carries the
+# listings (fresh or cached) - they are persisted to `pricing_listings` only.
+_SUMMARY_PROJECTION = {"_id": 0, "listings": 0}
+
 class PricingAgent:
     """
     Fetches current market prices for pedals from Reverb.
@@ -26,45 +88,78 @@ class PricingAgent:
 
     def __init__(self,
                 reverb_api_key: Optional[str] = None,
-                cache_ttl_hours: int = 24,):
+                cache_ttl_hours: int = 24,
+                http_client: Optional[httpx.AsyncClient] = None,
+                market_name_ttl: float = 300.0,
+                market_name_cache_size: int = 2048,):
         """
         Initialize pricing agent.
         
         Args:
             reverb_api_key: Reverb API key (optional)
             cache_ttl_hours: Cache duration in hours
+            http_client: Shared pooled HTTP client (optional). Without one,
+                the agent opens its own pooled client - release it with aclose().
+            market_name_ttl: Seconds a resolved market name stays valid
+            market_name_cache_size: Max resolved market names kept (LRU eviction)
+
+        Runs on any asyncio loop; uvloop is recommended (the API and pricing
+        worker both use it) since a lookup awaits resolve, cache and HTTP calls.
         """
 
         self.api_key = reverb_api_key
         self.cache_ttl = cache_ttl_hours
         self.base_url= "https://api.reverb.com/api"
 
+        # Keep-alive pool so repeated Reverb calls skip the TCP/TLS handshake
+        self._owns_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/hal+json",
+            "Accept-Version": "3.0"
+        }
+
+        # Market name cache: raw pedal name → (market name, resolved_at).
+        # Keyed by user input, so bounded like the other in-process caches.
+        self.market_name_ttl = market_name_ttl
+        self.market_name_cache_size = market_name_cache_size
+        self._market_names: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def aclose(self) -> None:
+        """Close the HTTP client if this agent created it (shared clients are left open)."""
+        if self._owns_client:
+            await self.http_client.aclose()
+
     # Known products for fallback resolution when registry fails
+    # One entry per product - spacing/hyphen variants ("gt-1", "gt1", "gt 1")
+    # all normalize to the same key (see _product_key)
     KNOWN_PRODUCTS_MARKET = {
         'gt-1': 'Boss GT-1',
-        'gt1': 'Boss GT-1',
-        'gt 1': 'Boss GT-1',
         'gt-10': 'Boss GT-10',
         'gt-100': 'Boss GT-100',
         'gt-1000': 'Boss GT-1000',
         'ds-1': 'Boss DS-1',
-        'ds1': 'Boss DS-1',
-        'ds 1': 'Boss DS-1',
         'me-80': 'Boss ME-80',
         'mg-30': 'NUX MG-30',
-        'mg30': 'NUX MG-30',
-        'mg 30': 'NUX MG-30',
         'helix': 'Line 6 Helix',
         'hx stomp': 'Line 6 HX Stomp',
         'pod go': 'Line 6 POD Go',
         'ts9': 'Ibanez TS9',
-        'ts-9': 'Ibanez TS9',
         'tube screamer': 'Ibanez Tube Screamer',
         'timeline': 'Strymon Timeline',
         'bigsky': 'Strymon BigSky',
     }
+    _KNOWN_PRODUCTS_BY_KEY = {_product_key(k): v for k, v in KNOWN_PRODUCTS_MARKET.items()}
+    _CANONICAL_VALUES = frozenset(KNOWN_PRODUCTS_MARKET.values())
 
-    async def _resolve_market_name(self, pedal_name: str) -> str:
+    async def _resolve_market_name(self, pedal_name: str,
+                                pedal_info: Optional[PedalInfo] = None) -> str:
         """
         Resolve pedal_name to canonical market-safe name.
         
@@ -73,72 +168,45 @@ class PricingAgent:
         
         Args:
             pedal_name: Original pedal name from state
+            pedal_info: Registry resolution already done upstream (optional)
             
         Returns:
             Canonical market name for API queries
         """
-        import re
-        
+        # Upstream resolution wins and is already free
+        if pedal_info is not None and pedal_info.canonical_name:
+            return pedal_info.canonical_name
+
+        # Recently resolved names skip the registry lookup entirely
+        cached = self._market_names.get(pedal_name)
+        if cached is not None:
+            if time.monotonic() - cached[1] < self.market_name_ttl:
+                self._market_names.move_to_end(pedal_name)
+                return cached[0]
+            del self._market_names[pedal_name]
+
         # First: try to resolve via pedal registry (has canonical_name from DB)
         try:
-            from backend.services.pedal_registry import resolve_pedal
-            
-            pedal_info = await resolve_pedal(pedal_name)
+            if pedal_info is None:
+                pedal_info = await resolve_pedal(pedal_name)
             
             if pedal_info and pedal_info.canonical_name:
                 logger.info(f"Registry resolved: '{pedal_name}' → '{pedal_info.canonical_name}'")
-                return pedal_info.canonical_name
+                market_name = pedal_info.canonical_name
+            else:
+                # Second: clean up the name ourselves (pure, so memoized per raw name)
+                market_name = _clean_market_name(pedal_name)
             
         except Exception as e:
+            # Registry unavailable - don't cache, it may be back next time
             logger.warning(f"Could not resolve pedal identity: {e}")
+            return _clean_market_name(pedal_name)
         
-        # Second: clean up the name ourselves
-        cleaned = pedal_name
-        
-        # Remove common filename artifacts (case-insensitive)
-        patterns_to_remove = [
-            r'\s+eng\d*',              # eng, eng03, etc
-            r'\s+[a-z]{2}\d+$',        # language codes like fr01, de02
-            r'\s+w$',                   # trailing W
-            r'\s+\d+\.\d+',            # version numbers like 3.80
-            r"\s*owner'?s?\s*manual",  # owner's manual
-            r'\s*user\s*manual',       # user manual  
-            r'\s*manual$',             # trailing manual
-            r'\s*english$',            # trailing english
-            r'\s*\(\d+\)$',            # duplicate markers like (1)
-            r'_+',                      # underscores → spaces
-        ]
-        
-        for pattern in patterns_to_remove:
-            cleaned = re.sub(pattern, ' ', cleaned, flags=re.IGNORECASE)
-        
-        # Normalize whitespace
-        cleaned = ' '.join(cleaned.split()).strip()
-        
-        # Fix model number formatting: "GT 1" → "GT-1", "DS 1" → "DS-1"
-        cleaned = re.sub(r'\b([A-Za-z]+)\s+(\d+)\b', r'\1-\2', cleaned)
-        
-        # Third: check against known products mapping
-        cleaned_lower = cleaned.lower()
-        
-        # Direct match
-        if cleaned_lower in self.KNOWN_PRODUCTS_MARKET:
-            canonical = self.KNOWN_PRODUCTS_MARKET[cleaned_lower]
-            logger.info(f"Known product matched: '{pedal_name}' → '{canonical}'")
-            return canonical
-        
-        # Check if any known product model is contained in the cleaned name
-        for model, canonical in self.KNOWN_PRODUCTS_MARKET.items():
-            # Match as word boundary
-            pattern = rf'\b{re.escape(model)}\b'
-            if re.search(pattern, cleaned_lower):
-                logger.info(f"Known product model found: '{pedal_name}' → '{canonical}'")
-                return canonical
-        
-        if cleaned != pedal_name:
-            logger.info(f"Cleaned market query: '{pedal_name}' → '{cleaned}'")
-        
-        return cleaned
+        self._market_names[pedal_name] = (market_name, time.monotonic())
+        self._market_names.move_to_end(pedal_name)
+        while len(self._market_names) > self.market_name_cache_size:
+            self._market_names.popitem(last=False)
+        return market_name
 
 
     async def get_pricing(self, state: AgentState) -> AgentState:
@@ -149,36 +217,18 @@ class PricingAgent:
             state: Agent state with pedal_name
         
         Returns:
-            Updated state with price_info
+            Updated state with price_info (price summary - same fields
+            whether fetched or cached; individual listings are not included)
         """
         logger.info(f"Pricing agent: fetching prices for {state.pedal_name}")
 
         try:
-            # Resolve pedal identity for market query
-            market_query_name = await self._resolve_market_name(state.pedal_name)
-            logger.info(f"Market query resolved: '{state.pedal_name}' → '{market_query_name}'")
-            
-            # Check cache first (from MongoDB) - use original pedal_name for cache key
-            cached_price = await self._get_cached_price(state.pedal_name)
-            if cached_price:
-                logger.info(f"Cache hit for {state.pedal_name}")
-                state.price_info = cached_price
+            price_data, from_cache = await self._price_one(state.pedal_name, state.pedal_info)
+            state.price_info = price_data
+            if from_cache:
                 state.agent_path.append("pricing_agent_cached")
                 return state
             
-            # Fetch from Reverb API using canonical market name
-            if self.api_key:
-                price_data = await self._fetch_from_reverb(market_query_name)
-            else:
-                # Fallback
-                logger.warning("No reverb Api key - using mock data")
-                price_data = self._get_mock_pricing(market_query_name)
-            
-            # Store original pedal_name in results for proper display
-            price_data["display_name"] = state.pedal_name
-            # Cache result
-            await self._cache_price(state.pedal_name, price_data)
-            state.price_info = price_data
             state.agent_path.append("pricing_agent")
             
             # Generate raw_answer for quality check
@@ -199,6 +249,132 @@ class PricingAgent:
                 "pedal_name": state.pedal_name
             }
             return state
+
+    async def get_pricing_batch(self, pedal_names: List[str],
+                                max_concurrency: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get pricing for several pedals concurrently.
+        
+        The cache is read and written in one MongoDB round trip each; Reverb
+        fetches for the misses overlap (bounded by max_concurrency) and share
+        the pooled client's keep-alive connections.
+        If the batched cache read fails, each pedal is priced on its own
+        through the single-pedal path instead.
+        
+        Args:
+            pedal_names: Pedal names to price
+            max_concurrency: Max pedals priced at once
+        
+        Returns:
+            Price summary per pedal, in input order (an error dict for failures)
+        """
+        # Duplicate names are priced once
+        unique_names = list(dict.fromkeys(pedal_names))
+        market_names = dict(zip(unique_names, await asyncio.gather(
+            *(self._resolve_market_name(n) for n in unique_names)
+        )))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        # One cache round trip for the whole batch
+        try:
+            by_market = await self._get_cached_prices(list(set(market_names.values())))
+        except Exception as e:
+            # Price each pedal on its own, like single get_pricing calls
+            logger.warning(f"Batched cache read failed, pricing pedals individually: {e}")
+
+            async def price(pedal_name: str) -> Dict[str, Any]:
+                async with semaphore:
+                    try:
+                        return (await self._price_one(pedal_name))[0]
+                    except Exception as e:
+                        logger.error(f"Pricing failed for {pedal_name}: {e}")
+                        return {"error": "Unable to fetch pricing data", "pedal_name": pedal_name}
+
+            priced = dict(zip(unique_names, await asyncio.gather(*(price(n) for n in unique_names))))
+            return [priced[pedal_name] for pedal_name in pedal_names]
+
+        misses = [m for m in dict.fromkeys(market_names.values()) if m not in by_market]
+        logger.info(f"Pricing batch: {len(unique_names)} pedals, {len(misses)} cache misses")
+
+        async def fetch(market_name: str) -> Dict[str, Any]:
+            async with semaphore:
+                if self.api_key:
+                    return await self._fetch_from_reverb(market_name)
+                return self._get_mock_pricing(market_name)
+
+        fetched = await asyncio.gather(*(fetch(m) for m in misses), return_exceptions=True)
+        fresh = {}
+        for market_name, result in zip(misses, fetched):
+            if isinstance(result, Exception):
+                logger.error(f"Pricing failed for {market_name}: {result}")
+            else:
+                fresh[market_name] = by_market[market_name] = result
+        if fresh:
+            # A failed cache write must not discard prices already fetched
+            try:
+                await self._cache_prices(fresh)
+            except Exception as e:
+                logger.warning(f"Batched cache write failed for {len(fresh)} pedals: {e}")
+            for market_name, price_data in fresh.items():
+                by_market[market_name] = _without_listings(price_data)
+
+        results = []
+        for pedal_name in pedal_names:
+            price_data = by_market.get(market_names[pedal_name])
+            if price_data is None:
+                results.append({"error": "Unable to fetch pricing data", "pedal_name": pedal_name})
+            else:
+                results.append({**price_data, "display_name": pedal_name})
+        return results
+
+    async def _price_one(self, pedal_name: str,
+                        pedal_info: Optional[PedalInfo] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Resolve, check the cache, and fetch pricing for one pedal.
+        
+        Args:
+            pedal_name: Pedal name
+            pedal_info: Registry resolution already done upstream (optional)
+        
+        Returns:
+            (price data, whether it came from the cache)
+        """
+        # Resolve pedal identity for market query
+        market_query_name = await self._resolve_market_name(pedal_name, pedal_info)
+        logger.info(f"Market query resolved: '{pedal_name}' → '{market_query_name}'")
+        
+        # Check cache first (from MongoDB) - keyed by the resolved market name,
+        # so "GT-1 eng03 W", "gt1" and "Boss GT-1" share one entry
+        try:
+            cached_price = await self._get_cached_price(market_query_name)
+        except Exception as e:
+            # An unreachable cache shouldn't cost the user live prices
+            logger.warning(f"Cache read failed for {market_query_name}, fetching live: {e}")
+            cached_price = None
+        if cached_price:
+            logger.info(f"Cache hit for {pedal_name}")
+            cached_price["display_name"] = pedal_name
+            return cached_price, True
+        
+        # Fetch from Reverb API using canonical market name
+        if self.api_key:
+            price_data = await self._fetch_from_reverb(market_query_name)
+        else:
+            # Fallback
+            logger.warning("No reverb Api key - using mock data")
+            price_data = self._get_mock_pricing(market_query_name)
+        
+        # Cache result (listings go to their own collection); a failed write
+        # must not discard the fetched price
+        try:
+            await self._cache_price(market_query_name, price_data)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {market_query_name}: {e}")
+        # Same shape as a cache hit, with the original pedal_name for display
+        price_data = _without_listings(price_data)
+        price_data["display_name"] = pedal_name
+        return price_data, False
             
     async def _fetch_from_reverb(self, pedal_name: str) -> Dict[str, Any]:
         """
@@ -208,37 +384,22 @@ class PricingAgent:
         Returns:
             Price statistics and listings
         """
-        import httpx
-        import asyncio
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/hal+json",
-            "Accept-Version": "3.0"
-        }
-        
-        def _sync_fetch():
-            """Sync fetch wrapper - works around Windows async DNS issues."""
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(
-                    f"{self.base_url}/listings",
-                    headers=headers,
-                    params={
-                        "query": pedal_name,
-                        "item_region": "US",
-                        "category": "effects-and-pedals",
-                        "per_page": 50,
-                        "state": "live"
-                    }
-                )
-                response.raise_for_status()
-                return response.json()
-        
         try:
             logger.info(f"Fetching Reverb listings for: {pedal_name}")
-            # Run sync client in thread pool to avoid blocking event loop
-            data = await asyncio.to_thread(_sync_fetch)
+            response = await self.http_client.get(
+                f"{self.base_url}/listings",
+                headers=self._headers,
+                params={
+                    "query": pedal_name,
+                    "item_region": "US",
+                    "category": "effects-and-pedals",
+                    "per_page": 50,
+                    "state": "live"
+                }
+            )
+            response.raise_for_status()
+            # Parse the raw bytes directly (50 nested listings per response)
+            data = orjson.loads(response.content)
             logger.info(f"Reverb API returned {len(data.get('listings', []))} listings")
         except httpx.ConnectError as e:
             logger.error(f"Reverb API connection error: {e}")
@@ -264,35 +425,41 @@ class PricingAgent:
             "updated_at": datetime.now(UTC)
             }
         
-        # Parse listings
+        # Parse listings (every price feeds the stats, only the top ones are kept)
+        now = datetime.now(UTC)
         parsed_listings = []
         prices = []
         for listing in listings:
             price = listing.get("price", {}).get("amount")
             if not price:
                 continue
-            prices.append(float(price))
-            parsed_listings.append({
-            "listing_id": listing.get("id"),
-            "price_usd": float(price),
-            "condition": listing.get("condition", {}).get("display_name", "unknown"),
-            "url": listing.get("_links", {}).get("web", {}).get("href", ""),
-            "seller_name": listing.get("seller", {}).get("username", ""),
-            "shipping_usd": float(listing.get("shipping", {}).get("local_amount", 0)),
-            "listed_at": datetime.now(UTC)
-        })
+            price = float(price)
+            prices.append(price)
+            if len(parsed_listings) < MAX_LISTINGS:
+                parsed_listings.append(ParsedListing(
+                    listing_id=listing.get("id"),
+                    price_usd=price,
+                    condition=listing.get("condition", {}).get("display_name", "unknown"),
+                    url=listing.get("_links", {}).get("web", {}).get("href", ""),
+                    seller_name=listing.get("seller", {}).get("username", ""),
+                    shipping_usd=float(listing.get("shipping", {}).get("local_amount", 0)),
+                    listed_at=now
+                ))
             
-        # Calculate statistics
+        # Calculate statistics (vectorized; median is a partition, not a full sort)
+        arr = np.fromiter(prices, dtype=np.float64, count=len(prices))
         return {
         "pedal_name": pedal_name,
-        "avg_price": statistics.mean(prices) if prices else 0.0,
-        "min_price": min(prices) if prices else 0.0,
-        "max_price": max(prices) if prices else 0.0,
-        "median_price": statistics.median(prices) if prices else 0.0,
-        "total_listings": len(parsed_listings),
-        "listings": parsed_listings[:10],  # Top 10
+        "avg_price": float(arr.mean()) if prices else 0.0,
+        "min_price": float(arr.min()) if prices else 0.0,
+        "max_price": float(arr.max()) if prices else 0.0,
+        "median_price": float(np.median(arr)) if prices else 0.0,
+        "total_listings": len(prices),
+        # Plain dicts: price_info is stored in MongoDB and returned as a
+        # JSON-serialized Celery result
+        "listings": [asdict(listing) for listing in parsed_listings],
         "source": "reverb",
-        "updated_at": datetime.now(UTC)
+        "updated_at": now
     }
     
     
@@ -331,56 +498,133 @@ class PricingAgent:
             "updated_at": datetime.now(UTC)
         }
     
-    async def _get_cached_price(self, pedal_name: str) -> Optional[Dict[str, Any]]:
+    async def invalidate_cache(self, pedal_name: str) -> None:
+        """
+        Drop the cached price for a pedal so the next lookup refetches.
+        
+        Args:
+            pedal_name: Pedal name (resolved the same way get_pricing does)
+        """
+        market_name = await self._resolve_market_name(pedal_name)
+        db = MongoDB.get_database()
+        await asyncio.gather(
+            db.pricing.delete_one({"pedal_name": market_name}),
+            db.pricing_listings.delete_one({"pedal_name": market_name}),
+        )
+
+    async def _get_cached_price(self, market_name: str) -> Optional[Dict[str, Any]]:
         """
         Get cached price from MongoDB.
         
         Args:
-            pedal_name: Pedal name
+            market_name: Resolved market name
         
         Returns:
             Cached price data or None
         """
 
-        from backend.db.mongodb import MongoDB
-
         db = MongoDB.get_database()
 
-        # Find cached price
-        cached = await db.pricing.find_one({"pedal_name": pedal_name})
-
-        if not cached:
-            return None 
-
-        # Check if cache is still valid (24h TTL)
-        updated_at = cached.get("updated_at")
-        if updated_at:
-            # Ensure updated_at is offset-aware (UTC)
-            if updated_at.tzinfo is None:
-                updated_at = updated_at.replace(tzinfo=UTC)
-                
-            if datetime.now(UTC) - updated_at < timedelta(hours=self.cache_ttl):
-                return cached
+        # Freshness is checked server-side: the TTL index on updated_at only
+        # sweeps about once a minute, so stale docs can still be present.
+        # Listings aren't needed for a summary hit, so skip decoding them.
+        return await db.pricing.find_one(
+            {"pedal_name": market_name, "updated_at": self._fresh_since()},
+            _SUMMARY_PROJECTION
+        )
+
+    async def _get_cached_prices(self, market_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get cached prices for several pedals in one MongoDB query.
+        
+        Args:
+            market_names: Resolved market names
         
-        return None
+        Returns:
+            Cached price data by market name (misses are absent)
+        """
+        db = MongoDB.get_database()
+        cursor = db.pricing.find(
+            {"pedal_name": {"$in": market_names}, "updated_at": self._fresh_since()},
+            _SUMMARY_PROJECTION
+        )
+        return {doc["pedal_name"]: doc async for doc in cursor}
+
+    def _fresh_since(self) -> Dict[str, datetime]:
+        """Query condition on updated_at for entries still within the cache TTL."""
+        return {"$gte": datetime.now(UTC) - timedelta(hours=self.cache_ttl)}
     
-    async def _cache_price(self, pedal_name: str, price_data: Dict[str, Any]) -> None:
+    async def _cache_price(self, market_name: str, price_data: Dict[str, Any]) -> None:
         """
         Cache price in MongoDB.
         
         Args:
-            pedal_name: Pedal name
+            market_name: Resolved market name
             price_data: Price data to cache
         """
 
-        from backend.db.mongodb import MongoDB
         db = MongoDB.get_database()
 
         # Upsert (update or insert)
-        await db.pricing.update_one(
-            {"pedal_name": pedal_name},
-            {"$set": price_data},
-            upsert=True
+        key, summary, listings = self._cache_updates(market_name, price_data, datetime.now(UTC))
+        await asyncio.gather(
+            db.pricing.update_one(key, summary, upsert=True),
+            db.pricing_listings.update_one(key, listings, upsert=True),
+        )
+
+    async def _cache_prices(self, prices: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Cache several prices in one MongoDB bulk write per collection.
+        
+        Args:
+            prices: Price data by market name
+        """
+        db = MongoDB.get_database()
+
+        now = datetime.now(UTC)
+        summaries, listings = [], []
+        for market_name, price_data in prices.items():
+            key, summary, listing_doc = self._cache_updates(market_name, price_data, now)
+            summaries.append(UpdateOne(key, summary, upsert=True))
+            listings.append(UpdateOne(key, listing_doc, upsert=True))
+
+        await asyncio.gather(
+            db.pricing.bulk_write(summaries, ordered=False),
+            db.pricing_listings.bulk_write(listings, ordered=False),
+        )
+
+    @staticmethod
+    def _cache_updates(market_name: str, price_data: Dict[str, Any],
+                    now: datetime) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Build the upserts for one cached price: the scalar summary goes to
+        `pricing` (read on every cache hit), the listings array to
+        `pricing_listings` (kept for detailed views, never read on the
+        pricing path).
+        
+        Args:
+            market_name: Resolved market name
+            price_data: Price data to cache
+            now: Fallback timestamp
+        
+        Returns:
+            (filter, summary update, listings update)
+        """
+        # updated_at must be a datetime for the TTL index to expire the doc
+        if not isinstance(price_data.get("updated_at"), datetime):
+            price_data["updated_at"] = now
+
+        # price_data["pedal_name"] is the market name too, so the filter and
+        # the stored key always agree
+        summary = _without_listings(price_data)
+        return (
+            {"pedal_name": market_name},
+            # Older docs embedded the listings - drop them on rewrite
+            {"$set": summary, "$unset": {"listings": ""}},
+            {"$set": {
+                "listings": price_data.get("listings", []),
+                "updated_at": price_data["updated_at"],
+            }},
         )
 
     def _format_pricing_answer(self, price_data: Dict[str, Any]) -> str:
@@ -388,20 +632,70 @@ class PricingAgent:
         if not price_data or price_data.get("error"):
             return "I couldn't fetch pricing data at this time."
         
-        pedal = price_data.get("pedal_name", "this pedal")
-        avg = price_data.get("avg_price", 0)
-        min_p = price_data.get("min_price", 0)
-        max_p = price_data.get("max_price", 0)
-        count = price_data.get("total_listings", 0)
-        
-        return (
-            f"Based on {count} active listings on Reverb, the **{pedal}** "
-            f"currently sells for an average of **${avg:.2f}**. "
-            f"Prices range from ${min_p:.2f} to ${max_p:.2f}, depending on condition."
-        )
+        # Reverb, mock and cached price data always carry these keys
+        return _PRICING_ANSWER_TEMPLATE.format_map(price_data)
 
 
 # HELPER FUNCTIONS
+def _without_listings(price_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Price summary: price_data minus its listings array."""
+    return {k: v for k, v in price_data.items() if k != "listings"}
+
+
+@functools.lru_cache(maxsize=2048)
+def _clean_market_name(pedal_name: str) -> str:
+    """
+    Strip filename artifacts from a pedal name and map it to a known product.
+    
+    Args:
+        pedal_name: Raw pedal name
+    
+    Returns:
+        Canonical known-product name, or the cleaned name
+    """
+    # Fast path: already canonical, or an exact known-product key
+    if pedal_name in PricingAgent._CANONICAL_VALUES:
+        return pedal_name
+    canonical = PricingAgent._KNOWN_PRODUCTS_BY_KEY.get(_product_key(pedal_name))
+    if canonical:
+        return canonical
+
+    cleaned = pedal_name
+    
+    # Remove common filename artifacts (case-insensitive)
+    for pattern in _CLEANUP_PATTERNS:
+        cleaned = pattern.sub(' ', cleaned)
+    
+    # Normalize whitespace
+    cleaned = ' '.join(cleaned.split()).strip()
+    
+    # Fix model number formatting: "GT 1" → "GT-1", "DS 1" → "DS-1"
+    cleaned = _MODEL_NUMBER_RE.sub(r'\1-\2', cleaned)
+    
+    # Third: check against known products mapping
+    known = PricingAgent._KNOWN_PRODUCTS_BY_KEY
+    
+    # Direct match
+    canonical = known.get(_product_key(cleaned))
+    if canonical:
+        logger.info(f"Known product matched: '{pedal_name}' → '{canonical}'")
+        return canonical
+    
+    # Check if any known product model is contained in the cleaned name:
+    # probe each word pair, then each word, left to right
+    words = cleaned.split()
+    for i in range(len(words)):
+        canonical = known.get(_product_key(''.join(words[i:i + 2]))) or known.get(_product_key(words[i]))
+        if canonical:
+            logger.info(f"Known product model found: '{pedal_name}' → '{canonical}'")
+            return canonical
+    
+    if cleaned != pedal_name:
+        logger.info(f"Cleaned market query: '{pedal_name}' → '{cleaned}'")
+    
+    return cleaned
+
+
 def format_price_summary(price_info: Dict[str, Any]) -> str:
     """
     Format price info into human-readable summary.
@@ -416,12 +710,14 @@ def format_price_summary(price_info: Dict[str, Any]) -> str:
     if not price_info or price_info.get("error"):
         return "Pricing data unavailable"
     
-    summary = f"**{price_info['pedal_name']} - Market Pricing**\n\n"
-    summary += f"• Average: ${price_info['avg_price']:.2f}\n"
-    summary += f"• Range: ${price_info['min_price']:.2f} - ${price_info['max_price']:.2f}\n"
-    summary += f"• Median: ${price_info['median_price']:.2f}\n"
-    summary += f"• Active listings: {price_info['total_listings']}\n"
-    summary += f"\n*Updated: {price_info['updated_at'].strftime('%Y-%m-%d %H:%M')}*"
+    summary = "\n".join((
+        f"**{price_info['pedal_name']} - Market Pricing**\n",
+        f"• Average: ${price_info['avg_price']:.2f}",
+        f"• Range: ${price_info['min_price']:.2f} - ${price_info['max_price']:.2f}",
+        f"• Median: ${price_info['median_price']:.2f}",
+        f"• Active listings: {price_info['total_listings']}\n",
+        f"*Updated: {price_info['updated_at'].strftime('%Y-%m-%d %H:%M')}*",
+    ))
     
     return summary
 
@@ -467,9 +763,6 @@ async def get_pricing_with_cache(pedal_name: str, agent: PricingAgent,) -> Dict[
         Price data
     """
 
-    from backend.state import AgentState
-    from datetime import date, UTC
-
     state = AgentState(
         user_id="temp_user",
         conversation_id="temp_conv",
@@ -5,11 +5,21 @@ Acts as a gate before returning answers to users.
 """
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from collections import OrderedDict
+from contextlib import aclosing
+import asyncio
+import functools
+import hashlib
+import json
 import logging 
 import re
+import time
+import httpx
+import orjson
 
-from backend.state import AgentState, FallbackReason
+from backend.state import AgentIntent, AgentState, FallbackReason
+from backend.services.llm_batcher import LLMBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +31,54 @@ AMBIGUOUS_PATTERNS = [
     r'^(the|a|an)\s+\w+$',  # Single concept queries like "the signal chain"
     r'^(put|get|turn|set)\s+(it|this)\s*(on|off)?$',
 ]
+# One alternation, so a query is matched in a single pass
+_AMBIGUOUS_RE = re.compile("|".join(f"(?:{p})" for p in AMBIGUOUS_PATTERNS), re.IGNORECASE)
+
+# Validation response parsing
+_JSON_FENCE_START = re.compile(r'^```json\s*')
+_JSON_FENCE_END = re.compile(r'\s*```$')
+# raw_decode stops at the end of the first JSON value, ignoring trailing prose
+_DECODER = json.JSONDecoder()
+
+# Multi-question coverage: (sub-question topic trigger, answer evidence for that topic)
+_TOPIC_RULES = [
+    (re.compile(r'price|buy|cost'), re.compile(r'price|cost|buy|reverb|listing')),
+    (re.compile(r'connect|cable|usb'), re.compile(r'connect|cable|usb|port|interface')),
+]
+_GENERIC_QUESTION_RE = re.compile(r'how|what')
+_WORD_RE = re.compile(r"[a-z$']+")
+
+# Source trimming: sentence boundaries and answer terms (numbers, 5+ letter words)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+_TERM_RE = re.compile(r'[a-z]{5,}|\d+(?:\.\d+)?')
+_CHARS_PER_TOKEN = 4  # Rough token estimate, good enough for a budget
+
+# Decision fields of a streamed verdict; the lookahead waits for the full value
+_DECISION_FIELD_RE = re.compile(
+    r'"(is_accurate|hallucination_detected|confidence)"\s*:\s*(true|false|\d+(?:\.\d+)?)(?=\s*[,}])'
+)
+
+# Numbers (with optional unit) that must be backed by the sources
+_NUMBER_RE = re.compile(r'\b(\d+(?:\.\d+)?)\s*(?:kΩ|MΩ|Hz|kHz|dB|V|mA)?\b')
 
 # Short/vague query patterns that need clarification
 SHORT_QUERY_WORDS = 4  # Queries with <= this many words are potentially ambiguous
 
+# Technical terms that make a short query unambiguous
+TECHNICAL_TERMS = ['impedance', 'bypass', 'voltage', 'power', 'presets', 'effects', 'amp model']
+_TECHNICAL_TERM_RE = re.compile("|".join(map(re.escape, TECHNICAL_TERMS)))
+
+# Common hallucination (hedging) phrases
+HALLUCINATION_PHRASES = [
+    "according to my knowledge",
+    "as far as i know",
+    "generally speaking",
+    "typically",
+    "usually",
+]
+# All phrases in one pass over the answer instead of one scan per phrase
+_HALLUCINATION_PHRASE_RE = re.compile("|".join(map(re.escape, HALLUCINATION_PHRASES)))
+
 class QualityCheckAgent:
     """
     Validates generated answers against source material.
@@ -48,36 +102,29 @@ Check for:
 4. COMPLETENESS: Did it miss MAJOR critical warnings? (Minor omissions are OK)
 5. MULTI-QUESTION COVERAGE: If the query had multiple questions, does the answer address ALL of them?
 
+Respond with a JSON object with these keys, in this order:
+{{"is_accurate": bool, "hallucination_detected": bool, "confidence": float 0-1, "issues": [str], "reasoning": str}}
+Each issue names one unsupported or contradicted claim, e.g. "Claims input impedance is 500kΩ but source says 1MΩ".
+
 Source Material:
-{sources}
+{sources}"""
 
-AI-Generated Answer:
+    # Answer goes in the user turn so the system prompt is a stable prefix
+    # for a given set of sources (provider-side prompt caching)
+    USER_PROMPT = """AI-Generated Answer:
 {answer}
 
-Respond with JSON in this format:
-{{
-  "is_accurate": true,
-  "hallucination_detected": false,
-  "confidence": 0.95,
-  "issues": [],
-  "reasoning": "Answer is fully grounded in sources. All specs match."
-}}
-
-If issues found:
-{{
-  "is_accurate": false,
-  "hallucination_detected": true,
-  "confidence": 0.3,
-  "issues": [
-    "Claims input impedance is 500kΩ but source says 1MΩ",
-    "Mentions true bypass but not found in sources"
-  ],
-  "reasoning": "Answer contains unsupported claims"
-}}"""
+Validate this answer."""
 
     def __init__(self, api_key: str, model: str= "llama-3.1-8b-instant",
                 temperature: float= 0.0,
                 hallucination_threshold: float = 0.3,
+                http_client: Optional[httpx.AsyncClient] = None,
+                max_concurrency: int = 8,
+                validation_cache_size: int = 4096,
+                validation_cache_ttl: float = 3600.0,
+                early_exit: bool = False,
+                max_source_tokens: int = 3500,
                 ):
         """
         Initialize quality check agent.
@@ -87,18 +134,47 @@ If issues found:
             model: Model for validation (llama-3.1-8b-instant for best accuracy)
             temperature: Zero temp for deterministic checking
             hallucination_threshold: Confidence threshold below which answer is flagged
+            http_client: Shared pooled HTTP client for Groq calls (optional)
+            max_concurrency: Max validation calls in flight to Groq at once
+            validation_cache_size: Max cached (answer, sources) validation results
+            validation_cache_ttl: Seconds a cached validation result stays valid
+            early_exit: Stream each validation on its own call and stop as soon
+                as a passing verdict is decoded. Off by default: production
+                validation goes through the batcher, which caps Groq
+                concurrency under load; early exit only pays off for
+                low-traffic, latency-sensitive deployments
+            max_source_tokens: Approximate token budget for sources in the prompt
         """
 
         self.llm = ChatGroq(
             api_key=api_key,
             model=model,
             temperature=temperature,
-            max_tokens=500
+            max_tokens=256,  # JSON mode keeps the verdict short
+            http_async_client=http_client
         )
+        # JSON mode: the response is always a single JSON object
+        self.json_llm = self.llm.bind(response_format={"type": "json_object"})
         self.model = model
         self.temperature = temperature
         self.hallucination_threshold = hallucination_threshold
 
+        # Coalesce concurrent validation calls into micro-batches, bounded
+        # so load bursts stay under Groq's rate limits
+        self.batcher = LLMBatcher(self.json_llm, max_concurrency=max_concurrency)
+        self.early_exit = early_exit
+        self._stream_slots = asyncio.Semaphore(max_concurrency)
+        self.max_source_tokens = max_source_tokens
+
+        # Validation cache: digest of (answer, sources) → (result, stored_at).
+        # Zero-temperature validation is deterministic, so retries and repeat
+        # answers skip the Groq round-trip.
+        self.validation_cache_size = validation_cache_size
+        self.validation_cache_ttl = validation_cache_ttl
+        self._validation_cache: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
     
     async def validate(self, state: AgentState) -> AgentState:
         """
@@ -110,7 +186,6 @@ If issues found:
         Returns:
             Updated state with quality flags
         """
-        from backend.state import AgentIntent
 
         logger.info("Quality check: Validating answer")
         
@@ -138,29 +213,37 @@ If issues found:
             has_pricing_content = bool(state.price_info and not state.price_info.get("error"))
             
             if has_manual_content or has_pricing_content:
-                # At least one source of truth - proceed with normal validation on manual content
-                if has_manual_content and state.retrieved_chunks:
+                # At least one source of truth - validate each part independently.
+                # The manual LLM check is in flight while pricing is sanity-checked.
+                manual_check = asyncio.ensure_future(self._check_quality(
+                    answer=state.manual_answer,
+                    sources=state.retrieved_chunks
+                )) if has_manual_content else None
+                pricing_ok = not has_pricing_content or self._validate_price_shape(state.price_info)
+                
+                state.hallucination_flag = False
+                state.needs_human_review = False
+                
+                if manual_check is not None:
                     # Validate manual answer against sources
                     try:
-                        result = await self._check_quality(
-                            answer=state.manual_answer,
-                            sources=state.retrieved_chunks
-                        )
+                        result = await manual_check
                         state.hallucination_flag = result["hallucination_detected"]
                         state.needs_human_review = not result["is_accurate"]
                         state.context.append(f"Quality check (manual part): {result['reasoning']}")
                     except Exception as e:
-                        logger.warning(f"[QUALITY_CHECK] Hybrid manual validation failed: {e}")
+                        logger.warning("[QUALITY_CHECK] Hybrid manual validation failed: %s", e)
                         # Don't fail the whole thing - pricing is still valid
-                        state.hallucination_flag = False
                         state.needs_human_review = True
-                else:
-                    # Only have pricing - that's OK, pricing doesn't need chunk validation
-                    state.hallucination_flag = False
-                    state.needs_human_review = False
+                
+                # Pricing doesn't need chunk validation, only a sanity check
+                if not pricing_ok:
+                    logger.warning("[QUALITY_CHECK] Hybrid pricing data failed sanity check")
+                    state.context.append("Quality check (pricing part): price data is incomplete or inconsistent")
+                    state.needs_human_review = True
                 
                 state.agent_path.append("quality_check")
-                logger.info(f"[QUALITY_CHECK] Hybrid passed: hallucination={state.hallucination_flag}")
+                logger.info("[QUALITY_CHECK] Hybrid passed: hallucination=%s", state.hallucination_flag)
                 return state
 
         # PRICING-ONLY QUERY SPECIAL HANDLING
@@ -170,9 +253,12 @@ If issues found:
         has_valid_pricing = bool(state.price_info and not state.price_info.get("error"))
         
         # Debug logging
-        logger.info(f"[QUALITY_CHECK] Intent check: intent={state.intent}, is_pricing={is_pricing}, has_valid_pricing={has_valid_pricing}")
+        logger.info(
+            "[QUALITY_CHECK] Intent check: intent=%s, is_pricing=%s, has_valid_pricing=%s",
+            state.intent, is_pricing, has_valid_pricing
+        )
         if state.price_info:
-            logger.info(f"[QUALITY_CHECK] price_info keys: {list(state.price_info.keys())}")
+            logger.info("[QUALITY_CHECK] price_info keys: %s", list(state.price_info))
         
         if is_pricing and has_valid_pricing:
             logger.info("[QUALITY_CHECK] Pricing query with valid price_info - passing through")
@@ -187,15 +273,16 @@ If issues found:
             # Log the specific reason for skipping
             if not state.raw_answer:
                 logger.warning(
-                    f"[QUALITY_CHECK] Skipped: No raw_answer generated. "
-                    f"Error: {state.error or 'None'}"
+                    "[QUALITY_CHECK] Skipped: No raw_answer generated. Error: %s",
+                    state.error or 'None'
                 )
             elif not state.retrieved_chunks:
                 logger.warning(
-                    f"[QUALITY_CHECK] Skipped: No retrieved_chunks. "
-                    f"Possible causes: (1) all search results filtered out due to low similarity scores, "
-                    f"(2) namespace has no vectors, (3) empty query embedding. "
-                    f"Pedal: '{state.pedal_name}', Namespace: '{state.pinecone_namespace}'"
+                    "[QUALITY_CHECK] Skipped: No retrieved_chunks. "
+                    "Possible causes: (1) all search results filtered out due to low similarity scores, "
+                    "(2) namespace has no vectors, (3) empty query embedding. "
+                    "Pedal: '%s', Namespace: '%s'",
+                    state.pedal_name, state.pinecone_namespace
                 )
             
             state.hallucination_flag = True
@@ -203,12 +290,28 @@ If issues found:
             state.agent_path.append("quality_check_skipped")
             return state
         
+        llm_task = None
         try:
-            # Run Validation
-            result = await self._check_quality(
+            # Run Validation: the LLM call starts while the heuristics run
+            llm_task = asyncio.create_task(self._check_quality(
                 answer= state.raw_answer,
                 sources= state.retrieved_chunks
-            )
+            ))
+            heuristic = await self.run_heuristic_check(state)
+
+            if heuristic["critical"]:
+                # Clear-cut hallucination - don't wait for (or pay for) the LLM
+                # (the finally below cancels it)
+                logger.warning("[QUALITY_CHECK] Heuristic rejection, skipping LLM validation")
+                state.hallucination_flag = True
+                state.needs_human_review = True
+                state.confidence_score *= 0.5
+                state.context.append("Quality check: hedged claims with numbers not found in sources")
+                state.context.extend([f"Issue: {issue}" for issue in heuristic["issues"]])
+                state.agent_path.append("quality_check")
+                return state
+
+            result = await llm_task
 
             # Update State
             state.hallucination_flag = result["hallucination_detected"]
@@ -229,14 +332,14 @@ If issues found:
             # Log results
             if state.hallucination_flag:
                 logger.warning(
-                    f"Hallucination detected! Confidence: {state.confidence_score:.2f}"
+                    "Hallucination detected! Confidence: %.2f", state.confidence_score
                 )
             else:
-                logger.info(f"Quality check passed")
+                logger.info("Quality check passed")
             
             return state
         except Exception as e:
-            logger.error(f"Quality check failed: {e}")
+            logger.error("Quality check failed: %s", e)
             
             # On error, flag for human review
             state.needs_human_review = True
@@ -244,8 +347,41 @@ If issues found:
             state.agent_path.append("quality_check_error")
             
             return state
+        finally:
+            # Never leave the LLM call running (or its error unretrieved)
+            # when the heuristics raise or validation ends early
+            if llm_task is not None:
+                if not llm_task.done():
+                    llm_task.cancel()
+                elif not llm_task.cancelled():
+                    llm_task.exception()
+
+    
+    @staticmethod
+    def _validate_price_shape(price_info: Dict[str, Any]) -> bool:
+        """Check price data has its summary fields and min <= avg <= max."""
+        try:
+            return (
+                price_info["total_listings"] > 0
+                and price_info["min_price"] <= price_info["avg_price"] <= price_info["max_price"]
+            )
+        except (KeyError, TypeError):
+            return False
+
+    async def validate_pair(self, answer: str, sources: List[str]) -> Dict[str, Any]:
+        """
+        Validate an answer against its sources without building an AgentState.
+        
+        Args:
+            answer: Generated answer
+            sources: Source chunks used
+        
+        Returns:
+            Quality check result (is_accurate, hallucination_detected,
+            confidence, issues, reasoning)
+        """
+        return await self._check_quality(answer, sources)
 
-    
     async def _check_quality(self, answer: str, 
                             sources: List[str]) -> Dict[str, Any]:
         """
@@ -258,70 +394,118 @@ If issues found:
         Returns:
             Quality check result
         """
+        key = _validation_key(answer, sources)
+        cached = self._get_cached_validation(key)
+        if cached is not None:
+            return cached
 
         # Build prompt
-        sources_text = "\n\n---\n\n".join([
-            f"Source {i+1}:\n{source}"
-            for i, source in enumerate(sources)
-        ])
-        
-        system_prompt = self.SYSTEM_PROMPT.format(
-            sources=sources_text,
-            answer=answer
-        )
+        sources = _select_sources(sources, answer, self.max_source_tokens * _CHARS_PER_TOKEN)
+        system_prompt = self.SYSTEM_PROMPT.format(sources=_format_sources(sources))
 
         # Call LLM (using LangChain for LangSmith tracing)
         messages = [
             SystemMessage(content=system_prompt),
-            HumanMessage(content="Validate this answer.")
+            HumanMessage(content=self.USER_PROMPT.format(answer=answer))
         ]
-        response = await self.llm.ainvoke(messages)
+        if self.early_exit:
+            result = await self._stream_validation(messages)
+        else:
+            response = await self.batcher.submit(messages)
 
-        # Parse response
-        content = response.content
+            # Parse response
+            content = response.content
 
-        if content is None:
-            raise ValueError("Quality check model returned no content")
+            if content is None:
+                raise ValueError("Quality check model returned no content")
 
-        result = self._parse_validation(content)
-        return result
+            result = self._parse_validation(content)
+
+        # Parse failures fall back to keyword guesses - worth retrying later
+        if not result.get("parse_error"):
+            self._validation_cache[key] = (result, time.monotonic())
+            while len(self._validation_cache) > self.validation_cache_size:
+                self._validation_cache.popitem(last=False)
+
+        return _copy_validation(result)
+
+    async def _stream_validation(self, messages: List[Any]) -> Dict[str, Any]:
+        """
+        Stream the validation, stopping once a passing verdict is decoded.
+        
+        The decision fields come first in the JSON, so a passing answer skips
+        generating issues/reasoning. Failing verdicts are read in full so
+        their issues stay available for debugging.
+        
+        Opt-in (early_exit): calls bypass the batcher and are bounded by
+        their own max_concurrency semaphore instead.
+        
+        Args:
+            messages: Validation prompt
+        
+        Returns:
+            Quality check result
+        """
+        content = ""
+        async with self._stream_slots:
+            # Groq won't stream in JSON mode, so the plain model is streamed
+            # and the prompt's JSON instruction keeps the reply parseable
+            async with aclosing(self.llm.astream(messages)) as stream:
+                async for chunk in stream:
+                    content += chunk.content
+                    fields = dict(_DECISION_FIELD_RE.findall(content))
+                    if len(fields) < 3:
+                        continue
+                    if fields["is_accurate"] == "true" and fields["hallucination_detected"] == "false":
+                        logger.info("[QUALITY_CHECK] Passing verdict streamed (confidence=%s), stopping early", fields["confidence"])
+                        return {
+                            "is_accurate": True,
+                            "hallucination_detected": False,
+                            "confidence": float(fields["confidence"]),
+                            "issues": [],
+                            "reasoning": "Passed (stopped after verdict)",
+                        }
+                    # Failing verdict: keep reading for issues and reasoning
+                    return self._parse_validation(content + "".join([c.content async for c in stream]))
+
+        if not content:
+            raise ValueError("Quality check model returned no content")
+        return self._parse_validation(content)
+
+    def _get_cached_validation(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached validation for key, or None if missing/expired."""
+        entry = self._validation_cache.get(key)
+        if entry is None or time.monotonic() - entry[1] >= self.validation_cache_ttl:
+            if entry is not None:
+                del self._validation_cache[key]
+            self._cache_misses += 1
+            return None
+
+        self._validation_cache.move_to_end(key)
+        self._cache_hits += 1
+        logger.debug("[QUALITY_CHECK] Validation cache hit")
+        return _copy_validation(entry[0])
+
+    def cache_info(self) -> Dict[str, int]:
+        """Validation cache statistics (like functools.lru_cache's cache_info)."""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "maxsize": self.validation_cache_size,
+            "currsize": len(self._validation_cache),
+        }
     
     def _parse_validation(self, content: str) -> Dict[str, Any]:
         """Parse LLM validation response."""
-        import json
-        
-        # Clean up response
+        # Clean up response (JSON mode responses are a bare object, so the
+        # fence regexes only run for the rare fenced reply)
         content = content.strip()
-        content = re.sub(r'^```json\s*', '', content)
-        content = re.sub(r'\s*```$', '', content)
-        
-        # Try to extract just the JSON object (LLM often adds extra text after)
-        json_match = re.search(r'\{[\s\S]*?\}(?=\s*(?:\n\n|\Z|[A-Z]))', content)
-        if json_match:
-            json_str = json_match.group(0)
-        else:
-            # Try finding JSON by matching balanced braces
-            brace_depth = 0
-            start_idx = None
-            end_idx = None
-            for i, char in enumerate(content):
-                if char == '{':
-                    if start_idx is None:
-                        start_idx = i
-                    brace_depth += 1
-                elif char == '}':
-                    brace_depth -= 1
-                    if brace_depth == 0 and start_idx is not None:
-                        end_idx = i + 1
-                        break
-            
-            if start_idx is not None and end_idx is not None:
-                json_str = content[start_idx:end_idx]
-            else:
-                json_str = content
+        if not content.startswith('{'):
+            content = _JSON_FENCE_START.sub('', content)
+            content = _JSON_FENCE_END.sub('', content)
         
         try:
-            result = json.loads(json_str)
+            result = _load_json_object(content)
             
             # Ensure required fields
             result.setdefault("is_accurate", True)
@@ -330,13 +514,16 @@ If issues found:
             result.setdefault("issues", [])
             result.setdefault("reasoning", "")
             
-            logger.info(f"[QUALITY_CHECK] Parsed validation: is_accurate={result['is_accurate']}, confidence={result['confidence']}")
+            logger.info(
+                "[QUALITY_CHECK] Parsed validation: is_accurate=%s, confidence=%s",
+                result['is_accurate'], result['confidence']
+            )
             
             return result
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse validation response: {e}")
-            logger.error(f"Raw content: {content[:500]}...")  # Truncate for log
+        except ValueError as e:
+            logger.error("Failed to parse validation response: %s", e)
+            logger.error("Raw content: %.500s...", content)  # Truncate for log
 
             # Fallback: Check for positive keywords (the answer was likely good!)
             positive_keywords = ["is_accurate\": true", "accurate", "grounded", "correct"]
@@ -353,7 +540,8 @@ If issues found:
                     "hallucination_detected": False,
                     "confidence": 0.85,
                     "issues": [],
-                    "reasoning": "Parse error but positive validation detected"
+                    "reasoning": "Parse error but positive validation detected",
+                    "parse_error": True,
                 }
             
             return {
@@ -361,7 +549,8 @@ If issues found:
                 "hallucination_detected": has_negative,
                 "confidence": 0.5,
                 "issues": ["Parse error - manual review recommended"],
-                "reasoning": "Failed to parse validation, defaulting to cautious"
+                "reasoning": "Failed to parse validation, defaulting to cautious",
+                "parse_error": True,
             }
         
     async def run_heuristic_check(self, state: AgentState) -> Dict[str, Any]:
@@ -374,34 +563,36 @@ If issues found:
             Dict with heuristic results
         """
         issues = []
+        unsupported_numbers: List[str] = []
+        hedging_phrases: List[str] = []
         
         # Check 0: Multi-question completeness
         if state.has_multi_questions and len(state.sub_questions) > 1:
             # Validate that answer addresses all sub-questions
             answer_lower = state.raw_answer.lower() if state.raw_answer else ""
+            answer_words = set(_WORD_RE.findall(answer_lower))
             
             # Count how many sub-questions appear to be addressed
             addressed_count = 0
             for sub_q in state.sub_questions:
-                # Extract key topic words from sub-question
                 sub_q_lower = sub_q.lower()
                 
-                # Check for key question words in answer
-                question_keywords = []
-                if "price" in sub_q_lower or "buy" in sub_q_lower or "cost" in sub_q_lower:
-                    question_keywords = ["price", "$", "cost", "buy", "reverb", "listing"]
-                elif "connect" in sub_q_lower or "cable" in sub_q_lower or "usb" in sub_q_lower:
-                    question_keywords = ["connect", "cable", "usb", "port", "interface"]
-                elif "how" in sub_q_lower or "what" in sub_q_lower:
-                    # Generic - check if ANY meaningful content related
-                    question_keywords = sub_q_lower.split()[:3]  # First 3 words
+                # Known topic: look for that topic's keywords in the answer
+                evidence = next((ev for trigger, ev in _TOPIC_RULES if trigger.search(sub_q_lower)), None)
+                if evidence is not None:
+                    addressed = evidence.search(answer_lower) is not None
+                elif _GENERIC_QUESTION_RE.search(sub_q_lower):
+                    # Generic - check if ANY meaningful content related (first 3 words)
+                    keywords = {kw for kw in _WORD_RE.findall(sub_q_lower)[:3] if len(kw) > 2}
+                    addressed = not keywords.isdisjoint(answer_words)
+                else:
+                    addressed = False
                 
-                # If any keyword found in answer, consider it addressed
-                if any(kw in answer_lower for kw in question_keywords if len(kw) > 2):
+                if addressed:
                     addressed_count += 1
-                    logger.debug(f"[QUALITY_HEURISTIC] Sub-question addressed: '{sub_q[:50]}...'")
+                    logger.debug("[QUALITY_HEURISTIC] Sub-question addressed: '%.50s...'", sub_q)
                 else:
-                    logger.warning(f"[QUALITY_HEURISTIC] Sub-question NOT addressed: '{sub_q[:50]}...'")
+                    logger.warning("[QUALITY_HEURISTIC] Sub-question NOT addressed: '%.50s...'", sub_q)
             
             # Flag if less than 50% of questions addressed
             coverage_ratio = addressed_count / len(state.sub_questions)
@@ -411,13 +602,13 @@ If issues found:
                     f"questions appear to be addressed in the answer"
                 )
                 logger.warning(
-                    f"[QUALITY_HEURISTIC] Poor multi-question coverage: {coverage_ratio:.0%} "
-                    f"({addressed_count}/{len(state.sub_questions)})"
+                    "[QUALITY_HEURISTIC] Poor multi-question coverage: %.0f%% (%d/%d)",
+                    coverage_ratio * 100, addressed_count, len(state.sub_questions)
                 )
             else:
                 logger.info(
-                    f"[QUALITY_HEURISTIC] Good multi-question coverage: {coverage_ratio:.0%} "
-                    f"({addressed_count}/{len(state.sub_questions)})"
+                    "[QUALITY_HEURISTIC] Good multi-question coverage: %.0f%% (%d/%d)",
+                    coverage_ratio * 100, addressed_count, len(state.sub_questions)
                 )
         
         # Check 1: Answer length vs source length
@@ -431,29 +622,28 @@ If issues found:
         
         # Check 2: Specific numbers in answer should be in sources
         if state.raw_answer:
-            # Extract numbers from answer
-            answer_numbers = set(re.findall(r'\b\d+(?:\.\d+)?\s*(?:kΩ|MΩ|Hz|kHz|dB|V|mA)?\b', state.raw_answer))
+            # Extract numbers from answer (normalized → as written)
+            answer_numbers = {
+                _number_key(match): match.group(0).strip()
+                for match in _NUMBER_RE.finditer(state.raw_answer)
+            }
+            
+            # Check if they appear in sources: one pass per chunk, then set lookups
+            source_numbers = set()
+            for chunk in state.retrieved_chunks or ():
+                for match in _NUMBER_RE.finditer(chunk):
+                    source_numbers.add(_number_key(match))
+                    source_numbers.add(match.group(1))  # Bare value: "9" is backed by "9V"
             
-            # Check if they appear in sources
-            source_text = " ".join(state.retrieved_chunks) if state.retrieved_chunks else ""
-            for number in answer_numbers:
-                if number not in source_text:
-                    issues.append(f"Number '{number}' not found in sources")
+            unsupported_numbers = [
+                number for key, number in answer_numbers.items() if key not in source_numbers
+            ]
+            issues.extend(f"Number '{number}' not found in sources" for number in unsupported_numbers)
         
         # Check 3: Common hallucination phrases
-        hallucination_phrases = [
-            "according to my knowledge",
-            "as far as i know",
-            "generally speaking",
-            "typically",
-            "usually",
-        ]
-
         if state.raw_answer:
-            answer_lower = state.raw_answer.lower()
-            for phrase in hallucination_phrases:
-                if phrase in answer_lower:
-                    issues.append(f"Hedging phrase detected: '{phrase}'")
+            hedging_phrases = list(dict.fromkeys(_HALLUCINATION_PHRASE_RE.findall(state.raw_answer.lower())))
+            issues.extend(f"Hedging phrase detected: '{phrase}'" for phrase in hedging_phrases)
         
         # Check 4: "I don't know" responses should have high confidence
         if state.raw_answer and "don't have that information" in state.raw_answer.lower():
@@ -463,11 +653,103 @@ If issues found:
         return {
             "passed": len(issues) == 0,
             "issues": issues,
+            # Hedging around numbers the sources don't back is a hallucination
+            # on its own, no LLM verdict needed
+            "critical": bool(unsupported_numbers and hedging_phrases),
             "check_type": "heuristic"
         }
     
 
 # HELPER FUNCTIONS
+def _select_sources(sources: List[str], answer: str, max_chars: int) -> Tuple[str, ...]:
+    """
+    Dedup source chunks and fit them into the prompt budget.
+    
+    Chunks differing only in case/whitespace are dropped. Over budget, each
+    chunk keeps only the sentences sharing a term with the answer (the ones
+    its claims can be checked against), cut off at max_chars overall.
+    
+    Args:
+        sources: Retrieved chunks
+        answer: Answer being validated
+        max_chars: Character budget for all sources
+    
+    Returns:
+        Sources to put in the prompt
+    """
+    unique: Dict[str, str] = {}
+    for chunk in sources:
+        unique.setdefault(" ".join(chunk.lower().split()), chunk)
+    chunks = tuple(unique.values())
+    if sum(map(len, chunks)) <= max_chars:
+        return chunks
+
+    answer_terms = set(_TERM_RE.findall(answer.lower()))
+    selected = []
+    for chunk in chunks:
+        relevant = " ".join(
+            sentence for sentence in _SENTENCE_SPLIT_RE.split(chunk)
+            if not answer_terms.isdisjoint(_TERM_RE.findall(sentence.lower()))
+        )
+        if relevant:
+            selected.append(relevant[:max_chars])
+            max_chars -= len(selected[-1])
+            if max_chars <= 0:
+                break
+    return tuple(selected) or (chunks[0][:max_chars],)
+
+
+@functools.lru_cache(maxsize=256)
+def _format_sources(sources: Tuple[str, ...]) -> str:
+    """Format source chunks for the validation prompt (memoized per chunk set)."""
+    # Pieces go straight into one join - no per-source intermediate strings
+    parts: List[str] = []
+    for i, source in enumerate(sources, 1):
+        parts += ("\n\n---\n\n", "Source ", str(i), ":\n", source)
+    return "".join(parts[1:])  # Drop the leading separator
+
+
+def _number_key(match: re.Match) -> str:
+    """Normalize a number match so "500kΩ" and "500 kΩ" compare equal."""
+    return "".join(match.group(0).split()).lower()
+
+
+def _validation_key(answer: str, sources: List[str]) -> bytes:
+    """Digest of an (answer, sources) pair; lengths keep boundaries unambiguous."""
+    digest = hashlib.blake2b(f"{answer}\0{len(sources)}\0".encode(), digest_size=16)
+    for source in sources:
+        digest.update(f"{len(source)}\0{source}".encode())
+    return digest.digest()
+
+
+def _copy_validation(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a validation result so callers can't mutate the cached one."""
+    return {**result, "issues": list(result["issues"])}
+
+
+def _load_json_object(content: str) -> Dict[str, Any]:
+    """
+    Load the JSON object from an LLM response.
+    
+    Bare JSON goes straight through orjson; otherwise the first object is
+    decoded from the first '{' (LLM often adds extra text around it).
+    
+    Raises:
+        ValueError: If no JSON object can be decoded
+    """
+    try:
+        result = orjson.loads(content)
+        if isinstance(result, dict):
+            return result
+    except orjson.JSONDecodeError:
+        pass
+    
+    start = content.find('{')
+    if start < 0:
+        raise ValueError("No JSON object in response")
+    result, _ = _DECODER.raw_decode(content, start)
+    return result
+
 async def validate_answer(
     answer: str,
     sources: List[str],
@@ -476,6 +758,9 @@ async def validate_answer(
     """
     Convenience function to validate an answer.
     
+    Goes straight to validate_pair - no AgentState round-trip - so it is
+    cheap enough for batch validation of offline QA pairs.
+    
     Args:
         answer: Generated answer
         sources: Source chunks
@@ -484,26 +769,31 @@ async def validate_answer(
     Returns:
         Validation result
     """
-    from backend.state import AgentState
-    from datetime import datetime, UTC
+    if not answer or not sources:
+        return {
+            "hallucination_detected": True,
+            "needs_review": True,
+            "confidence": 0.0,
+            "context": [],
+        }
 
-    state = AgentState(
-        user_id="temp_user",
-        conversation_id="temp_conv",
-        query="temp_query",
-        pedal_name="temp_pedal",
-        raw_answer=answer,
-        retrieved_chunks=sources,
-        created_at=datetime.now(UTC)
-    )
-    
-    state = await agent.validate(state)
+    try:
+        result = await agent.validate_pair(answer, sources)
+    except Exception as e:
+        logger.error("Quality check failed: %s", e)
+        return {
+            "hallucination_detected": False,
+            "needs_review": True,
+            "confidence": 0.0,
+            "context": [],
+        }
 
     return {
-        "hallucination_detected": state.hallucination_flag,
-        "needs_review": state.needs_human_review,
-        "confidence": state.confidence_score,
-        "context": state.context,
+        "hallucination_detected": result["hallucination_detected"],
+        "needs_review": not result["is_accurate"],
+        "confidence": result["confidence"],
+        "context": [f"Quality check: {result['reasoning']}"]
+                    + [f"Issue: {issue}" for issue in result["issues"]],
     }
 
 
@@ -520,8 +810,6 @@ def should_reject_answer(state: AgentState) -> bool:
     Returns:
         True if answer should be rejected
     """
-    from backend.state import AgentIntent
-    
     # Reset fallback reason
     state.fallback_reason = FallbackReason.NONE
     
@@ -552,17 +840,12 @@ def should_reject_answer(state: AgentState) -> bool:
     query_words = len(state.query.split())
     
     # Detect ambiguous patterns
-    is_ambiguous = False
-    for pattern in AMBIGUOUS_PATTERNS:
-        if re.match(pattern, query_lower, re.IGNORECASE):
-            is_ambiguous = True
-            break
+    is_ambiguous = bool(_AMBIGUOUS_RE.match(query_lower))
     
     # Short queries are also potentially ambiguous
     if query_words <= SHORT_QUERY_WORDS and not is_ambiguous:
         # Check if it's a technical term that's unambiguous
-        technical_terms = ['impedance', 'bypass', 'voltage', 'power', 'presets', 'effects', 'amp model']
-        if not any(term in query_lower for term in technical_terms):
+        if not _TECHNICAL_TERM_RE.search(query_lower):
             is_ambiguous = True
     
     # Reject if hallucination detected
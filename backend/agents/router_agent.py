@@ -3,17 +3,114 @@ Router Agent: Intent classification and routing logic.
 
 Determines which agent(s) to invoke based on user query.
 """
-from typing import Dict, Optional, Any
+from typing import Dict, Literal, Optional, Any, List, Tuple
+from collections import OrderedDict
+import asyncio
 import logging 
+import re
+import time
 from enum import Enum
+import httpx
+import orjson
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, field_validator
 
 
-from backend.state import AgentIntent, AgentState
+from backend.state import AgentIntent, AgentState, FallbackReason
+from backend.services.llm_batcher import LLMBatcher
+from backend.services.query_preprocessor import QueryPreprocessor
+from backend.services.semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
+# Groq client limits for routing calls. The graph sizes its router budget
+# from these, so a timed-out attempt can still be retried within it.
+ROUTER_LLM_TIMEOUT_S = 1.5
+ROUTER_LLM_MAX_RETRIES = 1
+
+# Greetings and casual chat, answered without preprocessing or an LLM call
+CASUAL_PATTERNS = [
+    'hi', 'hello', 'hey', 'howdy', 'sup', 'yo',
+    'how are you', 'how r u', 'how are you doing', 
+    'whats up', "what's up", 'how do you do',
+    'good morning', 'good afternoon', 'good evening',
+    'nice to meet you', 'pleasure to meet you'
+]
+# A pattern counts when it appears as whole words: single words are looked up
+# per token, phrases per word n-gram of the phrase lengths in use
+_CASUAL_SINGLE = frozenset(p for p in CASUAL_PATTERNS if ' ' not in p)
+_CASUAL_PHRASES = frozenset(p for p in CASUAL_PATTERNS if ' ' in p)
+_CASUAL_PHRASE_LENGTHS = sorted({p.count(' ') + 1 for p in _CASUAL_PHRASES})
+
+# Routing response parsing
+_JSON_FENCE_OPEN = re.compile(r'^```json\s*')
+_JSON_FENCE_CLOSE = re.compile(r'\s*```$')
+_INTENT_FALLBACK_RE = re.compile(r'"intent"\s*:\s*"(\w+)"')
+
+# Keyword heuristic used when the LLM routing call fails
+# Expanded pricing keywords to catch purchasing intent
+_PRICING_KEYWORDS = frozenset([
+    "price", "cost", "buy", "purchase", "sell", "worth", "value", 
+    "cheapest", "expensive", "want to buy", "looking to buy", 
+    "get one", "get 3", "i want"
+])
+# Usage/manual keywords
+_MANUAL_KEYWORDS = frozenset([
+    "how", "what", "setting", "manual", "use", "connect", 
+    "turn on", "put it on", "set up", "install", "does it"
+])
+# One pass per keyword set; anchored at word starts so "use" skips "because"
+# but "price" still matches "prices"
+_PRICING_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, _PRICING_KEYWORDS)) + ')')
+_MANUAL_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, _MANUAL_KEYWORDS)) + ')')
+
+# Unambiguous phrasings classified locally, skipping the LLM call. A rule only
+# fires when it is the sole match for a single-question query with a known pedal
+# and none of the _FAST_PATH_BLOCKERS cues is present.
+_FAST_PATH_RULES = [
+    (re.compile(r'\b(?:price[sd]?|pricing|costs?|how much (?:is|are) (?:it|they|one|a|an)|(?:go|sell)(?:es|s)? for)\b'),
+     AgentIntent.PRICING),
+    (re.compile(r'\b(?:specs|specifications|what effects|list (?:the |all )?(?:modes|settings|controls|knobs|effects|features))\b'),
+     AgentIntent.MANUAL_QUESTION),
+]
+# Usage, explanation, opinion or conjunction cues: a query containing any of
+# these may need another intent too, so it always goes to the LLM
+_FAST_PATH_BLOCKERS = re.compile(
+    r'\b(?:how(?! much)|why|what does|should|set|setting|dial|use|also|and|plus|'
+    r'worth|tone|sound\w*|compare\w*|vs|versus|better|best)\b|[&+]'
+)
+_FAST_PATH_CONFIDENCE = 0.85
+
+# Simple regex patterns for common pedals
+_PEDAL_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r'\b(boss\s+(?:ds-?1|ts-?9|bd-?2|od-?3|ce-?5))\b',
+    r'\b(ibanez\s+(?:ts-?9|ts-?808))\b',
+    r'\b(mxr\s+(?:phase\s*90|distortion\s*\+))\b',
+    r'\b(electro[\s-]?harmonix\s+(?:big\s+muff|soul\s+food))\b',
+    r'\b(strymon\s+(?:timeline|bigsky|flint))\b',
+]]
+
+class RouteDecision(BaseModel):
+    """Routing decision returned by the LLM (structured output schema)."""
+    intent: Literal["MANUAL_QUESTION", "PRICING", "EXPLANATION", "HYBRID"]
+    pedal_name: Optional[str] = None
+    requires_retrieval: bool = False
+    confidence: float = 0.0
+    reasoning: str = ""
+
+    @field_validator("intent", mode="before")
+    @classmethod
+    def upper_intent(cls, v: Any) -> Any:
+        """Accept intents in any case."""
+        return v.upper() if isinstance(v, str) else v
+
+
+class BatchRouteDecision(BaseModel):
+    """One RouteDecision per numbered sub-question, in order."""
+    routes: List[RouteDecision]
+
+
 class RouterAgent:
     """
     Routes queries to appropriate specialist agents.
@@ -27,83 +124,37 @@ class RouterAgent:
     - Complex queries → Multiple agents (HYBRID)
     """
 
+    # Kept short - it is sent on every routing call. JSON mode guarantees the
+    # reply is an object; the schema line pins the fields RouteDecision reads.
     SYSTEM_PROMPT = """
-You are a routing agent for PedalBot, a guitar pedal assistant.
-
-Your task is to classify the user's query and decide whether the pedal manual MUST be consulted.
-
-INTENTS (choose EXACTLY ONE):
-
-1. MANUAL_QUESTION  
-Questions that can ONLY be answered from the pedal manual, specs, or internal effects list.
-Examples:  
-- "What's the input impedance?"  
-- "Does it have true bypass?"
-- "List the drive pedals available"
-- "What effects does it include?"
-- "What amp models are built in?"
-- "How many presets can it store?"
-- "What are the power requirements?"
-- "List all the effects types"
-- "What distortion/overdrive options does it have?"
-
-2. PRICING  
-Questions about market price, value, or availability.
-Examples:  
-- "How much is this?"  
-- "What's a fair price?"  
-- "Where can I buy one?"
-- "I want to buy 3"
-- "Looking to purchase this pedal"
-
-3. EXPLANATION  
-Questions about tone, sound character, or usage advice that don't require manual lookup.
-Examples:  
-- "What does this pedal sound like?"  
-- "Where should it go in my chain?"
-- "How do I dial in a blues tone?"
-
-4. HYBRID  
-Queries that combine multiple intents (e.g., manual + pricing, manual + explanation).
-Examples:  
-- "Is this pedal worth $100?" (pricing + value judgment)
-- "Compare the specs and tone to a Boss DS-1" (manual + explanation)
-- "How do I turn it on and I want to buy 3" (manual + pricing)
-- "What effects does it have and what's the price?" (manual + pricing)
-- "Can it do metal tones and where can I buy one?" (explanation + pricing)
-
-CRITICAL CLASSIFICATION RULES:
-- If the user asks to "list", "show", "what are", or "how many" effects/features → MANUAL_QUESTION
-- If the user asks about built-in effects, amp models, or presets → MANUAL_QUESTION  
-- If the user uses musician slang like "drive pedals", "dirt", "modulation" → MANUAL_QUESTION
-- If the answer exists in the product manual or spec sheet → MANUAL_QUESTION
-- Only use EXPLANATION for subjective tone/feel questions that aren't documented
-- **If query contains BOTH a usage/feature question AND purchasing keywords (buy, purchase, price, cost) → HYBRID**
-- Purchasing keywords: "buy", "purchase", "want to buy", "looking to buy", "where to buy", "I want", "get one"
-
-OUTPUT RULES (MANDATORY):
-- Respond with ONLY a valid JSON object.
-- Do NOT include explanations outside JSON.
-- "intent" MUST be one of: MANUAL_QUESTION | PRICING | EXPLANATION | HYBRID
-- If pedal name is unclear, set "pedal_name" to null.
-- "requires_retrieval" MUST be true if the answer depends on the manual or internal effects list.
-- The "confidence" field MUST be between 0.0 and 1.0.
-- Choose the most appropriate intent. Do not hedge.
-
-OUTPUT FORMAT:
-{
-  "intent": "MANUAL_QUESTION",
-  "pedal_name": "Zoom G3Xn",
-  "requires_retrieval": true,
-  "confidence": 0.95,
-  "reasoning": "User is asking for a list of built-in drive effects, which are documented in the manual."
-}
+You are the router for PedalBot, a guitar pedal assistant. Classify the user's query into EXACTLY ONE intent:
+
+- MANUAL_QUESTION: answerable from the manual or spec sheet - specs, features, built-in effects, amp models, presets, power, setup/usage steps, or requests to list/show/count them (including slang like "drive pedals", "dirt", "modulation").
+- PRICING: market price, value, or where/how to buy.
+- EXPLANATION: subjective tone, sound, or usage advice not documented in the manual.
+- HYBRID: combines intents, e.g. a feature/usage question plus purchasing words (buy, purchase, price, cost, "I want", "get one"), or specs plus a tone comparison.
+
+Rules:
+- If the answer exists in the manual → MANUAL_QUESTION; use EXPLANATION only for undocumented tone/feel.
+- requires_retrieval is true when the answer depends on the manual.
+- pedal_name is null when unclear. Do not hedge.
+
+Respond with ONLY a JSON object:
+{"intent": "MANUAL_QUESTION|PRICING|EXPLANATION|HYBRID", "pedal_name": string|null, "requires_retrieval": bool, "confidence": 0.0-1.0, "reasoning": "one short sentence"}
 """
 
     def __init__(self,
                 api_key: str, 
                 model: str="llama-3.1-8b-instant",
                 temperature: float = 0.0,
+                embeddings_service=None,
+                cache_threshold: float = 0.93,
+                cache_capacity: int = 10_000,
+                cache_quantize: bool = False,
+                http_client: Optional[httpx.AsyncClient] = None,
+                max_concurrency: int = 20,
+                decision_cache_size: int = 10_000,
+                decision_cache_ttl: float = 3600.0,
                 ):
         """
         Initialize router agent.
@@ -112,17 +163,66 @@ OUTPUT FORMAT:
             api_key: OpenAI API key
             model: Model to use (llama-3.1-8b-instant is fast and cheap)
             temperature: Low temp for consistent routing
+            embeddings_service: Enables the semantic intent cache when provided
+            cache_threshold: Min cosine similarity to reuse a cached intent
+            cache_capacity: Max cached classifications (FIFO eviction)
+            cache_quantize: Store cached embeddings as int8 (4x less memory)
+            http_client: Shared pooled HTTP client for Groq calls (optional)
+            max_concurrency: Max routing calls in flight to Groq at once
+            decision_cache_size: Max exact-match routing decisions kept (LRU eviction)
+            decision_cache_ttl: Seconds a cached routing decision stays valid
         """
 
+        # A routing reply is ~40 tokens of JSON; the tight cap bounds tail
+        # latency if the model rambles. One short retry, then the keyword fallback.
         self.llm = ChatGroq(
             api_key=api_key,
             model=model,
             temperature=temperature,
-            max_tokens=200
+            max_tokens=80,
+            timeout=ROUTER_LLM_TIMEOUT_S,
+            max_retries=ROUTER_LLM_MAX_RETRIES,
+            http_async_client=http_client
         )
         self.model = model
         self.temperature = temperature
 
+        # Replies parse straight into RouteDecision (JSON mode); the raw
+        # message is kept so schema mismatches can fall back to text parsing
+        self.structured_llm = self.llm.with_structured_output(
+            RouteDecision, method="json_mode", include_raw=True
+        )
+
+        # One routing object per sub-question, so this reply needs more room
+        self.multi_llm = self.llm.model_copy(update={"max_tokens": 400}).with_structured_output(
+            BatchRouteDecision, method="json_mode", include_raw=True
+        )
+
+        # Coalesce concurrent routing calls into micro-batches, bounded
+        # so load bursts stay under Groq's rate limits
+        self.batcher = LLMBatcher(self.structured_llm, max_concurrency=max_concurrency)
+        self._multi_slots = asyncio.Semaphore(max_concurrency)
+
+        # Stateless after construction (compiles its patterns once), so shared
+        self.preprocessor = QueryPreprocessor()
+
+        # Exact-match decision cache: (normalized query, pedal) → (decision, stored_at).
+        # Checked before the semantic cache since it needs no embedding call.
+        self.decision_cache_size = decision_cache_size
+        self.decision_cache_ttl = decision_cache_ttl
+        self._decision_cache: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+        # Semantic cache of LLM classifications (embedding → intent)
+        self.embeddings = embeddings_service
+        self.intent_cache = None
+        if embeddings_service is not None:
+            self.intent_cache = SemanticCache(
+                dimension=embeddings_service.get_dimension(),
+                capacity=cache_capacity,
+                threshold=cache_threshold,
+                quantize=cache_quantize,
+            )
+
     async def route(self, state: AgentState) -> AgentState:
         """
         Classify query intent and update state.
@@ -137,11 +237,26 @@ OUTPUT FORMAT:
         logger.info(f"Routing query: {state.query[:100]}")
 
         try:
-            # PREPROCESSING: Normalize query before routing
-            from backend.services.query_preprocessor import QueryPreprocessor
+            # CASUAL CONVERSATION DETECTION
+            # Handle greetings and casual chat before preprocessing and routing
+            query_lower = state.query.lower().strip()
+            
+            if _is_casual(query_lower):
+                logger.info("[ROUTER] Detected casual conversation - responding warmly")
+                state.intent = AgentIntent.CASUAL
+                state.confidence_score = 1.0
+                state.agent_path.append("router")
+                state.raw_answer = (
+                    "I'm here to help with your guitar pedal questions! "
+                    "What would you like to know about the manual?"
+                )
+                state.final_answer = state.raw_answer
+                # Graph ends right after the router for casual chat
+                state.agent_path.append("synthesizer_skipped")
+                return state
             
-            preprocessor = QueryPreprocessor()
-            preprocess_result = preprocessor.preprocess(state.query)
+            # PREPROCESSING: Normalize query before routing
+            preprocess_result = self.preprocessor.preprocess(state.query)
             
             # Update state with preprocessing results
             state.original_query = preprocess_result.original_query
@@ -161,58 +276,61 @@ OUTPUT FORMAT:
                     f"[ROUTER] Detected multi-question query with {len(preprocess_result.sub_questions)} parts"
                 )
             
-            # CASUAL CONVERSATION DETECTION
-            # Handle greetings and casual chat before routing to specialist agents
-            query_lower = state.query.lower().strip()
-            casual_patterns = [
-                'hi', 'hello', 'hey', 'howdy', 'sup', 'yo',
-                'how are you', 'how r u', 'how are you doing', 
-                'whats up', "what's up", 'how do you do',
-                'good morning', 'good afternoon', 'good evening',
-                'nice to meet you', 'pleasure to meet you'
-            ]
-            
-            is_casual = any(
-                query_lower == pattern or 
-                query_lower.startswith(pattern + ' ') or
-                query_lower.endswith(' ' + pattern) or
-                ' ' + pattern + ' ' in query_lower
-                for pattern in casual_patterns
-            )
-            
-            if is_casual:
-                logger.info("[ROUTER] Detected casual conversation - responding warmly")
-                state.intent = AgentIntent.CASUAL
-                state.confidence_score = 1.0
-                state.agent_path.append("router")
-                state.raw_answer = (
-                    "I'm here to help with your guitar pedal questions! "
-                    "What would you like to know about the manual?"
-                )
-                state.final_answer = state.raw_answer
-                return state
-            
             # Use normalized query for routing
             query_for_routing = preprocess_result.normalized_query
-            
-            # Build Prompt
-            user_prompt = self._build_user_prompt(state, query_for_routing)
-
-            # Call LLM (using LangChain for LangSmith tracing)
-            messages = [
-                SystemMessage(content=self.SYSTEM_PROMPT),
-                HumanMessage(content=user_prompt)
-            ]
-            response = await self.llm.ainvoke(messages)
-
-            # Parse response
-            raw_content = response.content
 
-            if raw_content is None:
-                raise ValueError("LLM returned empty response content")
+            # FAST PATH: decisive phrasings need no LLM round trip
+            if len(preprocess_result.sub_questions) <= 1:
+                fast_intent = self._fast_path_intent(query_for_routing)
+                pedal_name = state.pedal_name or await self.extract_pedal_name(query_for_routing)
+                if fast_intent is not None and pedal_name:
+                    state.intent = fast_intent
+                    state.pedal_name = pedal_name
+                    state.confidence_score = _FAST_PATH_CONFIDENCE
+                    state.agent_path.append("router_fast_path")
+                    logger.info(f"[ROUTER] Fast path: {state.intent.value}")
+                    return state
             
-            result = self._parse_response(raw_content)
+            # DECISION CACHE: reuse the intent of an identical earlier query.
+            # Follow-ups are skipped since their intent depends on history.
+            decision_key = None
+            if not state.conversation_history:
+                decision_key = (query_for_routing.lower(), state.pedal_name or "")
+                cached = self._get_cached_decision(decision_key)
+                if cached:
+                    state.intent = cached["intent"]
+                    state.pedal_name = cached["pedal_name"]
+                    state.confidence_score = cached["confidence"]
+                    state.agent_path.append("router_cached")
+                    logger.info(f"[ROUTER] Decision cache hit: {state.intent.value}")
+                    return state
+
+            # SEMANTIC CACHE: reuse the intent of a near-identical earlier query.
+            query_embedding = None
+            cache_scope = state.pedal_name
+            if self.intent_cache is not None and not state.conversation_history:
+                query_embedding = await self._embed_for_cache(query_for_routing)
+                # Same text the manual agent embeds - let it reuse the vector
+                state.query_embedding = query_embedding
+                cached = (
+                    self.intent_cache.lookup(query_embedding, scope=cache_scope)
+                    if query_embedding is not None else None
+                )
+                if cached:
+                    state.intent = cached["intent"]
+                    state.pedal_name = cached["pedal_name"]
+                    state.confidence_score = cached["confidence"]
+                    state.agent_path.append("router_cached")
+                    logger.info(f"[ROUTER] Cache hit: {state.intent.value}")
+                    return state
+            
+            # Multi-question queries: classify every part in one batched prompt
+            result = None
+            if len(preprocess_result.sub_questions) > 1:
+                result = await self._classify_sub_questions(state, preprocess_result.sub_questions)
 
+            if result is None:
+                result = await self._classify(state, query_for_routing)
 
             # Update State
             state.intent = AgentIntent(result["intent"].lower())
@@ -225,6 +343,20 @@ OUTPUT FORMAT:
             
             state.agent_path.append("router")
 
+            decision = {
+                "intent": state.intent,
+                "pedal_name": state.pedal_name,
+                "confidence": state.confidence_score,
+            }
+            if decision_key is not None:
+                self._decision_cache[decision_key] = (decision, time.monotonic())
+                self._decision_cache.move_to_end(decision_key)
+                while len(self._decision_cache) > self.decision_cache_size:
+                    self._decision_cache.popitem(last=False)
+
+            if query_embedding is not None:
+                self.intent_cache.insert(query_embedding, decision, scope=cache_scope)
+
             logger.info(
                 f"Routed to {state.intent.value} "
                 f"(confidence: {state.confidence_score:.2f})"
@@ -235,47 +367,178 @@ OUTPUT FORMAT:
         except Exception as e:
             logger.error(f"Routing failed: {e}")
 
-            # Fallback: Default to manual question but check for obvious pricing keywords
-            from backend.state import FallbackReason
-            
-            # Enhanced keyword heuristic for fallback
-            query_lower = state.query.lower()
-            
-            # Expanded pricing keywords to catch purchasing intent
-            pricing_keywords = [
-                "price", "cost", "buy", "purchase", "sell", "worth", "value", 
-                "cheapest", "expensive", "want to buy", "looking to buy", 
-                "get one", "get 3", "i want"
-            ]
-            
-            # Usage/manual keywords
-            manual_keywords = [
-                "how", "what", "setting", "manual", "use", "connect", 
-                "turn on", "put it on", "set up", "install", "does it"
-            ]
-            
-            has_pricing = any(k in query_lower for k in pricing_keywords)
-            has_manual = any(k in query_lower for k in manual_keywords)
-            
-            if has_pricing and has_manual:
-                # Query has BOTH pricing and manual/usage questions → HYBRID
-                state.intent = AgentIntent.HYBRID
-                logger.info("[ROUTER FALLBACK] Detected HYBRID: pricing + manual keywords present")
-            elif has_pricing:
-                # Only pricing keywords
-                state.intent = AgentIntent.PRICING
-            else:
-                # Default to manual question
-                state.intent = AgentIntent.MANUAL_QUESTION
-                
-            state.confidence_score = 0.5
+            state = self.keyword_route(state)
             state.error = f"Routing error: {str(e)}"
             state.fallback_reason = FallbackReason.ROUTER_ERROR
-            state.agent_path.append("router_fallback")
             
             return state
         
+    def keyword_route(self, state: AgentState) -> AgentState:
+        """
+        Classify with the keyword heuristic alone (no LLM call).
+        
+        Used when LLM routing fails or runs out of time: defaults to a manual
+        question but checks for obvious pricing keywords.
+        
+        Args:
+            state: Current agent state
+        
+        Returns:
+            Updated state with intent and a 0.5 confidence
+        """
+        query_lower = state.query.lower()
+        
+        has_pricing = _PRICING_RE.search(query_lower) is not None
+        has_manual = _MANUAL_RE.search(query_lower) is not None
+        
+        if has_pricing and has_manual:
+            # Query has BOTH pricing and manual/usage questions → HYBRID
+            state.intent = AgentIntent.HYBRID
+            logger.info("[ROUTER FALLBACK] Detected HYBRID: pricing + manual keywords present")
+        elif has_pricing:
+            # Only pricing keywords
+            state.intent = AgentIntent.PRICING
+        else:
+            # Default to manual question
+            state.intent = AgentIntent.MANUAL_QUESTION
+            
+        state.confidence_score = 0.5
+        state.agent_path.append("router_fallback")
+        
+        return state
+
     
+    async def route_batch(self, states: List[AgentState]) -> List[AgentState]:
+        """
+        Route several independent requests concurrently.
+        
+        Groq calls overlap instead of running back to back; the batcher and
+        max_concurrency keep the number in flight bounded.
+        
+        Args:
+            states: Agent states to route
+        
+        Returns:
+            Routed states, in input order
+        """
+        return list(await asyncio.gather(*(self.route(state) for state in states)))
+
+    def _get_cached_decision(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached routing decision (refreshing its LRU position), or None."""
+        entry = self._decision_cache.get(key)
+        if entry is None or time.monotonic() - entry[1] >= self.decision_cache_ttl:
+            if entry is not None:
+                del self._decision_cache[key]
+            return None
+
+        self._decision_cache.move_to_end(key)
+        return entry[0]
+
+    @staticmethod
+    def _fast_path_intent(query: str) -> Optional[AgentIntent]:
+        """
+        Return the intent of the one fast-path rule matching query, if the
+        query is unambiguous: exactly one rule matches and no cue for another
+        intent (usage, explanation, opinion, conjunction) is present.
+        """
+        query_lower = query.lower()
+        if _FAST_PATH_BLOCKERS.search(query_lower):
+            return None
+        intents = {intent for pattern, intent in _FAST_PATH_RULES if pattern.search(query_lower)}
+        return intents.pop() if len(intents) == 1 else None
+
+    async def _classify(self, state: AgentState, query: str) -> Dict[str, Any]:
+        """
+        Classify a single query with the LLM.
+        
+        Args:
+            state: Current agent state (history and pedal context)
+            query: Query to classify
+        
+        Returns:
+            Dict with intent and, when given, pedal_name/confidence/reasoning
+        """
+        # Build Prompt
+        user_prompt = self._build_user_prompt(state, query)
+
+        # Call LLM (using LangChain for LangSmith tracing)
+        messages = [
+            SystemMessage(content=self.SYSTEM_PROMPT),
+            HumanMessage(content=user_prompt)
+        ]
+        response = await self.batcher.submit(messages)
+
+        decision: Optional[RouteDecision] = response["parsed"]
+        if decision is not None:
+            return decision.model_dump(exclude_unset=True)
+
+        # Schema mismatch - salvage what we can from the raw text
+        logger.warning(f"[ROUTER] Structured output failed: {response['parsing_error']}")
+        raw_content = response["raw"].content
+
+        if raw_content is None:
+            raise ValueError("LLM returned empty response content")
+        
+        return self._parse_response(raw_content)
+
+    async def _classify_sub_questions(self, state: AgentState,
+                                    sub_questions: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Classify each sub-question in one LLM call and combine the intents.
+        
+        Different intents across the parts make the whole query HYBRID.
+        
+        Args:
+            state: Current agent state (history and pedal context)
+            sub_questions: Parts of a multi-question query
+        
+        Returns:
+            Combined routing result, or None to fall back to single-query routing
+        """
+        numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(sub_questions, 1))
+        user_prompt = (
+            f"{self._build_user_prompt(state, numbered)}\n\n"
+            f"Classify each numbered query separately. Respond with a JSON object "
+            f'{{"routes": [...]}} holding one routing object per query, in order.'
+        )
+        messages = [
+            SystemMessage(content=self.SYSTEM_PROMPT),
+            HumanMessage(content=user_prompt)
+        ]
+
+        try:
+            async with self._multi_slots:
+                response = await self.multi_llm.ainvoke(messages)
+        except Exception as e:
+            logger.warning(f"[ROUTER] Batched sub-question routing failed: {e}")
+            return None
+
+        batch: Optional[BatchRouteDecision] = response["parsed"]
+        if batch is None or len(batch.routes) != len(sub_questions):
+            logger.warning("[ROUTER] Batched sub-question routing returned an unusable reply")
+            return None
+
+        intents = {route.intent for route in batch.routes}
+        result: Dict[str, Any] = {
+            "intent": "HYBRID" if len(intents) > 1 else intents.pop(),
+            "confidence": min(route.confidence for route in batch.routes),
+        }
+        pedal_name = next((route.pedal_name for route in batch.routes if route.pedal_name), None)
+        if pedal_name:
+            result["pedal_name"] = pedal_name
+
+        logger.info(f"[ROUTER] Sub-question intents: {[route.intent for route in batch.routes]}")
+        return result
+
+    async def _embed_for_cache(self, query: str) -> Optional[List[float]]:
+        """Embed a query for the intent cache; failures just skip the cache."""
+        try:
+            result = await self.embeddings.embed_single(query)
+            return result.embeddings[0]
+        except Exception as e:
+            logger.warning(f"[ROUTER] Cache embedding failed: {e}")
+            return None
+
     def _build_user_prompt(self, state: AgentState, query: Optional[str] = None) -> str:
         """Build user prompt with context and conversation history."""
         prompt_parts = []
@@ -307,23 +570,21 @@ OUTPUT FORMAT:
         """
         Parse LLM response into structured intent.
         
+        Fallback for replies that don't fit the RouteDecision schema.
+        
         Args:
             content: Raw LLM response
         
         Returns:
             Dict with intent, pedal_name, confidence, reasoning
         """
-
-        import json 
-        import re
-
         # Clean up response (remove markdown code blocks if present)
         content = content.strip()
-        content = re.sub(r'^```json\s*', '', content)
-        content = re.sub(r'\s*```$', '', content)
+        content = _JSON_FENCE_OPEN.sub('', content)
+        content = _JSON_FENCE_CLOSE.sub('', content)
 
         try:
-            result = json.loads(content)
+            result = orjson.loads(content)
 
             # Validate intent
             intent = result.get("intent", "MANUAL_QUESTION").upper()
@@ -335,12 +596,12 @@ OUTPUT FORMAT:
             
             return result
         
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse routing response: {e}")
             logger.error(f"Raw content: {content}")
 
             # Fallback: Try to extract intent with regex
-            intent_match = re.search(r'"intent"\s*:\s*"(\w+)"', content)
+            intent_match = _INTENT_FALLBACK_RE.search(content)
             if intent_match:
                 return {
                     "intent": intent_match.group(1),
@@ -368,20 +629,9 @@ OUTPUT FORMAT:
         Returns:
             Extracted pedal name or None
         """
-        import re
-
-        # Simple regex patterns for common pedals
-        patterns = [
-            r'\b(boss\s+(?:ds-?1|ts-?9|bd-?2|od-?3|ce-?5))\b',
-            r'\b(ibanez\s+(?:ts-?9|ts-?808))\b',
-            r'\b(mxr\s+(?:phase\s*90|distortion\s*\+))\b',
-            r'\b(electro[\s-]?harmonix\s+(?:big\s+muff|soul\s+food))\b',
-            r'\b(strymon\s+(?:timeline|bigsky|flint))\b',
-        ]
-        
         query_lower = query.lower()
-        for pattern in patterns:
-            match = re.search(pattern, query_lower, re.IGNORECASE)
+        for pattern in _PEDAL_PATTERNS:
+            match = pattern.search(query_lower)
             if match:
                 return match.group(1).title()
         
@@ -396,6 +646,10 @@ async def route_query(query: str,
     """
     Convenience function to route a query.
     
+    Pass one long-lived RouterAgent (the API shares the graph's instance)
+    so its pooled Groq connections and caches are reused. For many
+    concurrent queries use RouterAgent.route_batch instead.
+    
     Args:
         query: User query
         pedal_name: Known pedal name (or None)
@@ -422,6 +676,18 @@ async def route_query(query: str,
     return state
 
 
+def _is_casual(query_lower: str) -> bool:
+    """Check whether a lower-cased query contains a casual pattern as whole words."""
+    tokens = query_lower.split()
+    if not _CASUAL_SINGLE.isdisjoint(tokens):
+        return True
+    return any(
+        " ".join(tokens[i:i + n]) in _CASUAL_PHRASES
+        for n in _CASUAL_PHRASE_LENGTHS
+        for i in range(len(tokens) - n + 1)
+    )
+
+
 def get_next_agents(state: AgentState) -> list[str]:
     """
     Determine which agents to call based on intent.
@@ -1,39 +1,120 @@
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional
+
+import jwt
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
 from backend.auth.models import SignupRequest
 from backend.auth.hash_utils import hash_password, verify_password
-from backend.config.db import users_collection
+from backend.config.config import settings
+from backend.db.mongodb import get_database
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBasic()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+
+# Signing key encoded once, not per token
+_jwt_key = settings.JWT_SECRET_KEY.encode()
+
+# bcrypt is slow by design - hash off the event loop, on a small dedicated
+# pool so logins can't starve the default executor's I/O work
+_hash_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bcrypt")
+
+# Only what auth needs - served from the unique username index
+_AUTH_PROJECTION = {"_id": 0, "username": 1, "password": 1, "role": 1}
 
-def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)):
-    user = users_collection.find_one({"username": credentials.username})
-    role = user["role"] if user else None
-    if user and verify_password(credentials.password, user["password"]):
-        return user,role
+
+async def _check_credentials(db: AsyncIOMotorDatabase, username: str,
+                            password: str) -> Optional[Dict[str, Any]]:
+    """Return the user if the password matches (bcrypt runs off the event loop)."""
+    user = await db.users.find_one({"username": username}, _AUTH_PROJECTION)
+    if user and await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, verify_password, password, user["password"]
+    ):
+        return user
+    return None
+
+
+async def authenticate_user(credentials: HTTPBasicCredentials = Depends(security),
+                            db: AsyncIOMotorDatabase = Depends(get_database)):
+    user = await _check_credentials(db, credentials.username, credentials.password)
+    if user:
+        return user, user["role"]
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
 
-@router.post("/signup")
-async def signup(signup_request: SignupRequest):
-    existing_user = users_collection.find_one({"username": signup_request.username})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username already exists")
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """
+    Resolve the user from a bearer token.
+    
+    Only checks the JWT signature and expiry - no database or bcrypt work,
+    so protected routes should depend on this rather than authenticate_user.
+    """
+    try:
+        payload = jwt.decode(token, _jwt_key, algorithms=[settings.JWT_ALGORITHM])
+    except jwt.PyJWTError:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {"username": payload["sub"], "role": payload["role"]}
 
-    hashed_password = hash_password(signup_request.password)
+
+@router.post("/signup")
+async def signup(signup_request: SignupRequest,
+                db: AsyncIOMotorDatabase = Depends(get_database)):
+    hashed_password = await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, hash_password, signup_request.password
+    )
     user_data = {
+        "user_id": f"user_{uuid.uuid4().hex[:12]}",
         "username": signup_request.username,
         "password": hashed_password,
         "email": signup_request.email,
         "role": signup_request.role,
     }
-    users_collection.insert_one(user_data)
+    # The unique indexes reject duplicates in the same round-trip as the write
+    try:
+        await db.users.insert_one(user_data)
+    except DuplicateKeyError as e:
+        field = "Email" if "email" in (e.details or {}).get("keyPattern", {}) else "Username"
+        raise HTTPException(status_code=400, detail=f"{field} already exists")
     return {"message": "User created successfully"}
 
 
+@router.post("/token")
+async def issue_token(form: OAuth2PasswordRequestForm = Depends(),
+                    db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Exchange username/password for a signed access token (bcrypt runs once per session)."""
+    if not _jwt_key:
+        raise HTTPException(status_code=500, detail="Token signing is not configured")
+
+    user = await _check_credentials(db, form.username, form.password)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    expires = datetime.now(UTC) + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    token = jwt.encode(
+        {"sub": user["username"], "role": user["role"], "exp": expires},
+        _jwt_key,
+        algorithm=settings.JWT_ALGORITHM,
+    )
+    return {"access_token": token, "token_type": "bearer"}
+
+
+@router.get("/me")
+async def me(user: Dict[str, Any] = Depends(get_current_user)):
+    return user
+
+
 @router.get("/login")
 async def login(user_data: tuple = Depends(authenticate_user)):
     user, role = user_data
-    return {"message": "Login successful", "username": user["username"], "role": role}
\ No newline at end of file
+    return {"message": "Login successful", "username": user["username"], "role": role}
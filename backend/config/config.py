@@ -10,12 +10,15 @@ Usage:
     print(settings.OPENAI_API_KEY)
 """
 
+import logging
 import os
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
 from typing import Optional, Dict, Any
-from functools import lru_cache
+from functools import cached_property, lru_cache
+
+logger = logging.getLogger(__name__)
 
 # Load .env file explicitly if not already in production or if file exists
 # In production environments like Render/Railway, vars are usually injected directly
@@ -93,7 +96,7 @@ class Settings(BaseSettings):
     OCR_QUALITY_THRESHOLD: float = 0.3  # Auto-trigger OCR if quality < this
     OCR_DPI: int = 300  # DPI for rendering PDF pages to images
     
-    @property
+    @cached_property
     def google_vision_credentials_dict(self) -> Optional[Dict[str, Any]]:
         """
         Decode base64-encoded service account credentials to dict.
@@ -101,10 +104,10 @@ class Settings(BaseSettings):
         """
         if self.GOOGLE_VISION_CREDENTIALS:
             import base64
-            import json
+            import orjson
             try:
                 decoded = base64.b64decode(self.GOOGLE_VISION_CREDENTIALS)
-                return json.loads(decoded)
+                return orjson.loads(decoded)
             except Exception as e:
                 import logging
                 logging.getLogger(__name__).warning(f"Failed to decode GOOGLE_VISION_CREDENTIALS: {e}")
@@ -150,7 +153,7 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE_MB: int = 100  # Max PDF size
     UPLOADS_DIRECTORY: str = "./uploads_dir"  # Relative path for uploads
     
-    @property
+    @cached_property
     def uploads_path(self) -> str:
         """
         Get the correct uploads directory path based on environment.
@@ -172,7 +175,7 @@ class Settings(BaseSettings):
     RESEND_FROM_EMAIL: str = "onboarding@resend.dev"
     
 
-    @property
+    @cached_property
     def mongodb_url(self) -> str:
         """Get the MongoDB URI from environment or settings."""
         # Prioritize os.environ over pydantic field to ensure Platform (Render/Railway) vars win
@@ -207,12 +210,12 @@ class Settings(BaseSettings):
             # but we log it clearly. Actually, it's better to fail fast in production.
             raise ValueError(error_msg)
     
-    @property
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production environment."""
         return self.ENV.lower() == "production"
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development environment."""
         return self.ENV.lower() == "development"
@@ -273,12 +276,12 @@ class Settings(BaseSettings):
             
         return self.redis_url
     
-    @property
+    @cached_property
     def google_credentials_dict(self) -> Optional[Dict[str, Any]]:
         """Parse Google credentials JSON string to dict."""
         if self.GOOGLE_VISION_CREDENTIALS_JSON:
-            import json
-            return json.loads(self.GOOGLE_VISION_CREDENTIALS_JSON)
+            import orjson
+            return orjson.loads(self.GOOGLE_VISION_CREDENTIALS_JSON)
         return None
     
 @lru_cache()
@@ -294,11 +297,10 @@ def get_settings() -> Settings:
 
 
 
-# Debug: Check critical environment variables
-_env = os.environ.get("ENV", "development").lower()
-_debug_env = os.environ.get("DEBUG_ENV", "false").lower() == "true"
-
-if _env == "production" or _debug_env:
+# Debug: Check critical environment variables (opt-in, only when DEBUG logging
+# is on, stripped under python -O)
+if (__debug__ and (os.environ.get("CONFIG_DEBUG") or os.environ.get("DEBUG_ENV", "false").lower() == "true")
+        and logger.isEnabledFor(logging.DEBUG)):
     _mongo_env = os.environ.get("MONGODB_URI")
     if _mongo_env is None:
         _status = "MISSING (None)"
@@ -306,14 +308,11 @@ if _env == "production" or _debug_env:
         _status = "EMPTY STRING"
     else:
         _status = f"PRESENT (starts with '{_mongo_env[:5]}...')"
-    
-    print(f"[ENV DEBUG] ENV: {_env}")
-    print(f"[ENV DEBUG] MONGODB_URI status: {_status} (len={len(_mongo_env) if _mongo_env else 0})")
-    
-    _redis_url = os.environ.get("REDIS_URL")
-    _redis_uri = os.environ.get("REDIS_URI")
-    print(f"[ENV DEBUG] REDIS_URL: {'PRESENT' if _redis_url else 'MISSING'}")
-    print(f"[ENV DEBUG] REDIS_URI: {'PRESENT' if _redis_uri else 'MISSING'}")
+
+    logger.debug("[ENV DEBUG] ENV: %s", os.environ.get('ENV', 'development').lower())
+    logger.debug("[ENV DEBUG] MONGODB_URI status: %s (len=%d)", _status, len(_mongo_env) if _mongo_env else 0)
+    logger.debug("[ENV DEBUG] REDIS_URL: %s", 'PRESENT' if os.environ.get('REDIS_URL') else 'MISSING')
+    logger.debug("[ENV DEBUG] REDIS_URI: %s", 'PRESENT' if os.environ.get('REDIS_URI') else 'MISSING')
 
 # Singleton instance for convenience
 settings = get_settings()
@@ -322,7 +321,7 @@ settings = get_settings()
 if settings.is_production:
     try:
         settings.validate_production_settings()
-        print("[ENV DEBUG] Production settings validated successfully.")
+        logger.debug("[ENV DEBUG] Production settings validated successfully.")
     except ValueError as e:
         print(f"\n!!! CONFIGURATION ERROR !!!\n{e}\n")
         # In Docker/Render, exiting here forces a restart/fail which is visible
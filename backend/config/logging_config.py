@@ -0,0 +1,72 @@
+"""
+Logging setup: Non-blocking handlers for the async API.
+
+logging handlers write synchronously, so a slow stdout or log shipper
+stalls the event loop on every logger call. Instead, the root logger
+only gets a QueueHandler (an in-memory enqueue) and a QueueListener
+thread drains the queue into the real handlers.
+
+Usage:
+    listener = setup_logging(level="INFO", fmt="json")
+    ...
+    listener.stop()  # On shutdown, flushes queued records
+"""
+
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per log line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json",
+                handlers: Optional[List[logging.Handler]] = None) -> QueueListener:
+    """
+    Route all root logging through a queue drained by a background thread.
+
+    Args:
+        level: Root log level (DEBUG, INFO, WARNING, ERROR)
+        fmt: "json" or "text"
+        handlers: Handlers that do the actual I/O (default: stderr stream)
+
+    Returns:
+        Started QueueListener - call stop() on shutdown
+    """
+    if handlers is None:
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        handlers = [stream]
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    # Existing root handlers move behind the queue so they stop blocking too
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        if not isinstance(handler, QueueHandler):
+            handlers.append(handler)
+
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -115,6 +115,7 @@ class MongoDB:
         try:
             # Users collection
             await cls.db.users.create_index("user_id", unique=True)
+            await cls.db.users.create_index("username", unique=True)
             await cls.db.users.create_index("email", unique=True)
             
             # Conversations collection
@@ -135,6 +136,8 @@ class MongoDB:
             # Pricing collection (TTL index for 24h expiry)
             await cls.db.pricing.create_index("pedal_name", unique=True)
             await cls.db.pricing.create_index("updated_at", expireAfterSeconds=86400)  # 24 hours
+            await cls.db.pricing_listings.create_index("pedal_name", unique=True)
+            await cls.db.pricing_listings.create_index("updated_at", expireAfterSeconds=86400)
             
             # Ingestion jobs
             await cls.db.ingestion_jobs.create_index("job_id", unique=True)
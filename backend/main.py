@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from backend.config.config import settings
+from backend.config.logging_config import setup_logging
 from backend.db.mongodb import MongoDB
 from backend.routers import query, ingest
 
@@ -16,13 +17,16 @@ from backend.routers import query, ingest
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
     # Startup
+    log_listener = setup_logging(level=settings.LOG_LEVEL, fmt=settings.LOG_FORMAT)
     await MongoDB.connect(
         uri=settings.mongodb_url,
         db_name=settings.MONGODB_DB_NAME
     )
     yield
     # Shutdown
+    await query.close_graph()
     await MongoDB.close()
+    log_listener.stop()
 
 # Create FastAPI app
 app = FastAPI(
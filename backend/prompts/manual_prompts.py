@@ -6,8 +6,14 @@ Three-layer architecture:
 1. PEDALBOT_IDENTITY - Static system identity (behavioral rules only)
 2. CONTEXT_TEMPLATE - Template for injecting retrieved chunks (hidden layer)
 3. SYSTEM_PROMPT_RESPONSE - Safe response for meta-questions about prompts
+
+Optional:
+- SELF_CHECK_TEMPLATE - Asks for the answer plus a grounding self-check as JSON,
+  so the separate quality-check LLM call can be skipped
 """
 
+import re
+
 
 # Layer 1: Static Identity (NO context embedded)
 PEDALBOT_IDENTITY = """You are PedalBot, a professional guitarist's assistant for the {pedal_name} guitar pedal.
@@ -48,6 +54,18 @@ I'm designed to help you with:
 I use the official manual as my knowledge source. How can I help you with your {pedal_name} today?"""
 
 
+# Self-check output format (fuses answer generation with grounding validation)
+SELF_CHECK_TEMPLATE = """Respond with a single JSON object and nothing else:
+{{
+  "answer": "<your full answer to the user, formatted as you normally would>",
+  "grounded_in_chunks": [<numbers of the excerpts that support the answer>],
+  "self_confidence": <0.0-1.0, how fully the excerpts support every claim in the answer>
+}}
+
+Use an empty "grounded_in_chunks" list only if the answer says the detail isn't specified in the manual.
+The excerpts are numbered 1 to {num_chunks}."""
+
+
 # Patterns that indicate user is asking about system prompt (meta-questions)
 SYSTEM_PROMPT_PATTERNS = [
     "system prompt",
@@ -61,8 +79,10 @@ SYSTEM_PROMPT_PATTERNS = [
     "what is your system",
 ]
 
+# All patterns in one alternation: a single scan per query instead of one per pattern
+_SYSTEM_PROMPT_RE = re.compile("|".join(map(re.escape, SYSTEM_PROMPT_PATTERNS)))
+
 
 def is_system_prompt_question(query: str) -> bool:
     """Detect if user is asking about system prompt/instructions."""
-    query_lower = query.lower()
-    return any(pattern in query_lower for pattern in SYSTEM_PROMPT_PATTERNS)
+    return _SYSTEM_PROMPT_RE.search(query.lower()) is not None
@@ -22,7 +22,7 @@ from backend.db.models import(
     document_to_dict, dict_to_document
 )
 
-from backend.agents.graph import PedalBotGraph, create_pedalbot_graph
+from backend.agents.graph import PedalBotGraph, create_pedalbot_graph, TOKEN_STREAM_CONFIG
 from backend.state import AgentState
 from backend.config.config import settings
 
@@ -133,6 +133,15 @@ async def get_graph() -> PedalBotGraph:
     return _graph
 
 
+async def close_graph() -> None:
+    """Close the graph singleton's shared HTTP client (call on shutdown)."""
+    global _graph
+
+    if _graph is not None:
+        await _graph.aclose()
+        _graph = None
+
+
 # ENDPOINTS
 @router.get("/pedals", response_model=PedalsListResponse)
 async def list_available_pedals(
@@ -448,16 +457,22 @@ async def query_pedalbot_stream(
                 created_at=datetime.now(UTC)
             )
 
-            # Stream through graph
-            async for event in graph.graph.astream(state):
+            # Stream through graph ("custom" carries answer tokens as they're generated)
+            async for mode, event in graph.graph.astream(state, TOKEN_STREAM_CONFIG,
+                                                        stream_mode=["updates", "custom"]):
+                if mode == "custom":
+                    if event.get("node") == "manual_agent.token":
+                        yield f"data: {json.dumps({'type': 'token', 'text': event['token']})}\n\n"
+                    continue
+
                 if isinstance(event, dict):
                     for node_name, node_state in event.items():
                         # Send node update
                         yield f"data: {json.dumps({'type': 'node', 'node': node_name})}\n\n"
                         
                         # Send partial answer if available
-                        if hasattr(node_state, 'raw_answer') and node_state.raw_answer:
-                            yield f"data: {json.dumps({'type': 'answer', 'text': node_state.raw_answer})}\n\n"
+                        if isinstance(node_state, dict) and node_state.get("raw_answer"):
+                            yield f"data: {json.dumps({'type': 'answer', 'text': node_state['raw_answer']})}\n\n"
             
             # Send completion
             yield f"data: {json.dumps({'type': 'done'})}\n\n"
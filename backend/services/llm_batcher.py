@@ -0,0 +1,132 @@
+"""
+LLM Micro-Batcher: Coalesces concurrent chat calls into batched dispatches.
+
+Under concurrent load every request would otherwise issue its own LLM call.
+The batcher collects prompts arriving within a short window (max_wait_ms)
+or until max_batch is reached, then dispatches the batch as one ainvoke()
+task per prompt on one pooled client. Each caller's future resolves as soon
+as its own call completes, so no caller waits on a slower sibling.
+
+Trade-off: adds up to max_wait_ms of queueing delay per call in exchange
+for amortized connection overhead and higher throughput.
+
+With max_concurrency set, at most that many prompts are in flight across
+all batches; further prompts keep queueing (and fill the next batch) until
+a slot frees up, which keeps bursts under the provider's rate limits. A
+slot is released the moment its prompt's call finishes.
+
+Usage:
+    batcher = LLMBatcher(llm, max_batch=8, max_wait_ms=25, max_concurrency=8)
+    response = await batcher.submit([SystemMessage(...), HumanMessage(...)])
+"""
+
+import asyncio
+import logging
+from typing import Any, List, Optional, Set
+
+from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBatcher:
+    """
+    Micro-batches chat calls to a single LangChain chat model.
+
+    Each caller awaits its own Future, so results and exceptions are
+    delivered per prompt even though prompts are collected in batches.
+    """
+
+    def __init__(self, llm: Any, max_batch: int = 8, max_wait_ms: float = 25.0,
+                max_concurrency: Optional[int] = None):
+        """
+        Initialize batcher.
+
+        Args:
+            llm: LangChain chat model
+            max_batch: Max prompts per dispatch
+            max_wait_ms: Max time to wait for a batch to fill
+            max_concurrency: Max prompts in flight across batches (default: unbounded)
+        """
+        self.llm = llm
+        # A batch must fit in the concurrency budget or it could never dispatch
+        self.max_batch = min(max_batch, max_concurrency) if max_concurrency else max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrency = max_concurrency
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def submit(self, messages: List[BaseMessage]) -> Any:
+        """
+        Queue a prompt and wait for its response.
+
+        Args:
+            messages: Chat messages for one completion
+
+        Returns:
+            Model response (same as llm.ainvoke)
+        """
+        self._ensure_worker()
+
+        future = self._loop.create_future()
+        await self._queue.put((messages, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        """Start the drain task on the running loop (restart if the loop changed)."""
+        loop = asyncio.get_running_loop()
+
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+            self._worker = loop.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        """Collect prompts into batches and dispatch them."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            if len(batch) > 1:
+                logger.debug("[LLM_BATCHER] Dispatching batch of %d prompts", len(batch))
+
+            # Each prompt runs as soon as it gets a slot; arrivals meanwhile
+            # fill the next batch
+            slots = self._slots
+            for messages, future in batch:
+                if slots is not None:
+                    await slots.acquire()
+                task = self._loop.create_task(self._dispatch(messages, future, slots))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, messages: List[BaseMessage], future: asyncio.Future,
+                        slots: Optional[asyncio.Semaphore]) -> None:
+        """Run one prompt, resolve its caller's future and free its slot."""
+        try:
+            if future.done():
+                return  # Caller was cancelled while queued
+            response = await self.llm.ainvoke(messages)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(response)
+        finally:
+            if slots is not None:
+                slots.release()
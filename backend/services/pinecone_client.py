@@ -9,6 +9,7 @@ Handles:
 """
 from pinecone import Pinecone, ServerlessSpec
 from typing import List, Dict, Tuple, Optional, Any, cast
+import asyncio
 import logging
 from dataclasses import dataclass
 import time
@@ -69,6 +70,7 @@ class PineconeClient:
         self.metric= metric
         self.cloud= cloud
         self.region= region
+        self.host: Optional[str] = None
 
         # Initialize index (create if doesn't exist)
         self._init_index()
@@ -76,6 +78,9 @@ class PineconeClient:
         # Get index instance
         self.index = self.pc.Index(index_name)
 
+        # Native asyncio index for the query hot path (created on first use)
+        self._async_index: Any = None
+
         logger.info(f"✅ Pinecone client initialized: {index_name}")
 
     def _init_index(self) -> None:
@@ -107,6 +112,8 @@ class PineconeClient:
         else:
             logger.info(f"Index already exists: {self.index_name}")
 
+        self.host = getattr(desc, "host", None)
+
 
     def upsert_chunks(self, namespace: str, 
                     chunks: List[str], 
@@ -192,26 +199,104 @@ class PineconeClient:
                 filter=filter_dict,
                 include_metadata=include_metadata
             )
+            return self._parse_matches(response, namespace, include_metadata)
             
-            results = []
-            for match in response.matches:
-                results.append(SearchResult(
-                    chunk_id=match.id,
-                    text=match.metadata.get('text', '') if include_metadata else '',
-                    score=match.score,
-                    metadata=match.metadata if include_metadata else {}
-                ))
-            
-            if results:
-                logger.info(f"Search in {namespace}: {len(results)} results (top score: {results[0].score:.3f})")
-            else:
-                logger.info(f"Search in {namespace}: No results found")
-            return results
+        except Exception as e:
+            logger.error(f"Search failed in {namespace}: {e}")
+            raise
+
+    async def asearch(
+        self,
+        query_embedding: List[float],
+        namespace: str,
+        top_k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> List[SearchResult]:
+        """
+        Semantic search without blocking the event loop.
+        
+        Uses Pinecone's native asyncio index; falls back to running the
+        sync search in a worker thread if the SDK doesn't provide one.
+        
+        Args:
+            Same as search()
+        
+        Returns:
+            List of SearchResult objects
+        """
+        index = self._get_async_index()
+        if index is None:
+            return await asyncio.to_thread(
+                self.search, query_embedding, namespace, top_k, filter_dict, include_metadata
+            )
+
+        try:
+            response: Any = await index.query(
+                vector=query_embedding,
+                namespace=namespace,
+                top_k=top_k,
+                filter=filter_dict,
+                include_metadata=include_metadata
+            )
+            return self._parse_matches(response, namespace, include_metadata)
             
         except Exception as e:
             logger.error(f"Search failed in {namespace}: {e}")
             raise
 
+    async def asearch_batch(
+        self,
+        query_embeddings: List[List[float]],
+        namespace: str,
+        top_k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> List[List[SearchResult]]:
+        """
+        Run several searches in one namespace concurrently.
+        
+        The queries share the async client's connection pool, so they cost
+        one round trip of wall-clock time instead of one per vector.
+        
+        Returns:
+            One result list per query embedding, in order
+        """
+        return list(await asyncio.gather(*(
+            self.asearch(embedding, namespace, top_k, filter_dict, include_metadata)
+            for embedding in query_embeddings
+        )))
+
+    def _get_async_index(self) -> Any:
+        """Lazily create the asyncio index client (None if unsupported)."""
+        if self._async_index is None and self.host and hasattr(self.pc, "IndexAsyncio"):
+            self._async_index = self.pc.IndexAsyncio(host=self.host)
+        return self._async_index
+
+    def _parse_matches(self, response: Any, namespace: str,
+                    include_metadata: bool) -> List[SearchResult]:
+        """Convert a query response into SearchResults."""
+        results = []
+        for match in response.matches:
+            results.append(SearchResult(
+                chunk_id=match.id,
+                text=match.metadata.get('text', '') if include_metadata else '',
+                score=match.score,
+                metadata=match.metadata if include_metadata else {}
+            ))
+        
+        if results:
+            logger.info(f"Search in {namespace}: {len(results)} results (top score: {results[0].score:.3f})")
+        else:
+            logger.info(f"Search in {namespace}: No results found")
+        return results
+
+    async def aclose(self) -> None:
+        """Close the asyncio index client's connection pool (call on shutdown)."""
+        if self._async_index is not None:
+            await self._async_index.close()
+            self._async_index = None
+
     def delete_namespace(self, namespace: str) -> Dict[str, str]:
         """
         Delete all vectors in a namespace (useful for re-ingestion).
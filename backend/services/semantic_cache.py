@@ -0,0 +1,148 @@
+"""
+Semantic Cache: Nearest-neighbour lookup over recent query embeddings.
+
+Stores (embedding → value) pairs in a fixed-capacity ring buffer and
+returns the cached value whose embedding has the highest cosine similarity
+to the query, provided it clears a threshold. Vectors are normalized on
+insert so lookup is a single matrix-vector product (inner product search).
+
+With quantize=True rows are stored as int8 with a per-row scale (4x less
+memory than float32); similarities are then within ~1% of the exact value.
+
+Usage:
+    cache = SemanticCache(dimension=1024, capacity=10_000, threshold=0.93)
+
+    hit = cache.lookup(query_vector, scope="Boss DS-1")
+    if hit is None:
+        value = await expensive_call()
+        cache.insert(query_vector, value, scope="Boss DS-1")
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows dequantized per step, so a lookup never materializes the float32 matrix
+_QUANTIZED_BLOCK_ROWS = 1024
+
+
+class SemanticCache:
+    """
+    Flat inner-product index with FIFO eviction.
+
+    Entries are partitioned by an optional scope (e.g. pedal name) so a hit
+    for one pedal is never returned for another.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 10_000, threshold: float = 0.93,
+                quantize: bool = False):
+        """
+        Initialize cache.
+
+        Args:
+            dimension: Embedding dimension
+            capacity: Max entries before the oldest is overwritten
+            threshold: Min cosine similarity for a hit
+            quantize: Store rows as int8 instead of float32
+        """
+        self.dimension = dimension
+        self.capacity = capacity
+        self.threshold = threshold
+        self.quantize = quantize
+
+        self._matrix = np.zeros((capacity, dimension), dtype=np.int8 if quantize else np.float32)
+        self._row_scales = np.zeros(capacity, dtype=np.float32) if quantize else None
+        self._values: List[Any] = [None] * capacity
+        # Scopes are stored as small int ids so the lookup mask is a vectorized compare
+        self._scope_ids = np.full(capacity, -1, dtype=np.int32)
+        self._scope_index: Dict[Optional[str], int] = {}
+        self._size = 0
+        self._next = 0  # Ring buffer write position
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, vector: Sequence[float], scope: Optional[str] = None) -> Optional[Any]:
+        """
+        Return the cached value nearest to vector, or None on miss.
+
+        Args:
+            vector: Query embedding
+            scope: Only match entries inserted with the same scope
+        """
+        scope_id = self._scope_index.get(scope)
+        if self._size == 0 or scope_id is None:
+            return None
+
+        q = self._normalize(vector)
+        if q is None:
+            return None
+
+        sims = self._similarities(q)
+        sims[self._scope_ids[:self._size] != scope_id] = -1.0
+
+        idx = int(sims.argmax())
+        if sims[idx] >= self.threshold:
+            logger.debug("[SEMANTIC_CACHE] Hit (similarity: %.3f)", sims[idx])
+            return self._values[idx]
+        return None
+
+    def insert(self, vector: Sequence[float], value: Any, scope: Optional[str] = None) -> None:
+        """
+        Insert an entry, overwriting the oldest when full.
+
+        Args:
+            vector: Embedding to index
+            value: Value returned on a hit
+            scope: Partition key for the entry
+        """
+        q = self._normalize(vector)
+        if q is None:
+            return
+
+        if self.quantize:
+            scale = float(np.abs(q).max()) / 127
+            self._matrix[self._next] = np.round(q / scale).astype(np.int8)
+            self._row_scales[self._next] = scale
+        else:
+            self._matrix[self._next] = q
+        self._values[self._next] = value
+        self._scope_ids[self._next] = self._scope_index.setdefault(scope, len(self._scope_index))
+
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._values = [None] * self.capacity
+        self._scope_ids[:] = -1
+        self._scope_index.clear()
+        self._size = 0
+        self._next = 0
+
+    def _similarities(self, q: np.ndarray) -> np.ndarray:
+        """Cosine similarity of q against every stored row."""
+        if not self.quantize:
+            return self._matrix[:self._size] @ q
+
+        sims = np.empty(self._size, dtype=np.float32)
+        for start in range(0, self._size, _QUANTIZED_BLOCK_ROWS):
+            stop = min(start + _QUANTIZED_BLOCK_ROWS, self._size)
+            sims[start:stop] = self._matrix[start:stop].astype(np.float32) @ q
+        sims *= self._row_scales[:self._size]
+        return sims
+
+    def _normalize(self, vector: Sequence[float]) -> Optional[np.ndarray]:
+        """Convert to a unit-length float32 vector (None for zero/mismatched vectors)."""
+        v = np.asarray(vector, dtype=np.float32)
+        if v.shape != (self.dimension,):
+            logger.warning(f"[SEMANTIC_CACHE] Expected dimension {self.dimension}, got {v.shape}")
+            return None
+
+        norm = np.linalg.norm(v)
+        if norm == 0:
+            return None
+        return v / norm
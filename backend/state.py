@@ -1,8 +1,11 @@
+import operator
 from pydantic import BaseModel, Field
-from typing import Literal, Optional, Dict, Any, List
+from typing import Annotated, Literal, Optional, Dict, Any, List
 from enum import Enum
 from datetime import datetime
 
+from backend.services.pedal_registry import PedalInfo
+
 
 class AgentIntent(str, Enum):
     MANUAL_QUESTION = "manual_question"
@@ -46,6 +49,14 @@ class AgentState(BaseModel):
     typos_corrected: List[Dict[str, Any]] = Field(default_factory=list)  # Typo corrections made (position is int)
     has_multi_questions: bool = False  # True if query contains multiple questions
 
+    # Shared precomputation: computed once per request by whichever node gets
+    # there first, and reused by downstream agents instead of redoing it.
+    # query_embedding is the embedding of (normalized_query or query);
+    # pedal_info is the PedalRegistry resolution of pedal_name. Agents must
+    # fall back to computing these themselves when they are None.
+    query_embedding: Optional[List[float]] = None
+    pedal_info: Optional[PedalInfo] = None
+
     # Manual Retrieval (from Pinecone, not stored long-term) 
     pinecone_namespace: Optional[str] = None  
     retrieved_chunks: List[str] = Field(default_factory=list)
@@ -78,10 +89,43 @@ class AgentState(BaseModel):
     max_retries: int = 3
 
     # Metadata
-    context: List[str] = Field(default_factory=list)
-    agent_path: List[str] = Field(default_factory=list)  # Track routing
+    # Append-only: graph nodes return just their new entries and LangGraph
+    # concatenates them onto the channel (operator.add reducer)
+    context: Annotated[List[str], operator.add] = Field(default_factory=list)
+    agent_path: Annotated[List[str], operator.add] = Field(default_factory=list)  # Track routing
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
         arbitrary_types_allowed = True
 
+    def _fast_snapshot(self) -> "AgentState":
+        """
+        Copy for concurrent fan-out (e.g. hybrid agents).
+
+        Shallow-copies the model without re-validating, then gives the copy
+        its own instances of the lists agents mutate in place. Much cheaper
+        than model_copy(deep=True), which walks and copies every field.
+        """
+        new = self.__copy__()
+        new.retrieved_chunks = list(self.retrieved_chunks)
+        new.retrieval_scores = list(self.retrieval_scores)
+        new.context = list(self.context)
+        new.agent_path = list(self.agent_path)
+        return new
+
+    def _reset(self) -> None:
+        """
+        Return optional fields to their defaults so the instance can be pooled.
+
+        Lists are cleared in place to reuse their storage; required fields
+        are left for the next user to overwrite.
+        """
+        for name, field in type(self).model_fields.items():
+            if field.is_required():
+                continue
+            value = self.__dict__.get(name)
+            if isinstance(value, list):
+                value.clear()
+            else:
+                self.__dict__[name] = field.get_default(call_default_factory=True)
+
@@ -8,6 +8,12 @@ import logging
 import asyncio
 from backend.workers.celery_app import BaseTask, app
 
+try:
+    import uvloop
+    _run = uvloop.run
+except ImportError:  # Windows dev boxes
+    _run = asyncio.run
+
 logger = logging.getLogger(__name__)
 
 # REFRESH PRICING TASK
@@ -45,7 +51,7 @@ def refresh_pricing_task(pedal_name: str) -> dict:
             await MongoDB.close()
 
     try:
-        return asyncio.run(runner())
+        return _run(runner())
     except Exception as e:
         # Log error and re-raise for Celery to handle
         logger.error(f"Pricing task failed: {e}", exc_info=True)
@@ -64,7 +70,6 @@ async def _refresh_pricing_async(pedal_name: str) -> dict:
     Returns:
         Updated pricing data
     """
-    from backend.db.mongodb import MongoDB
     from backend.agents.pricing_agent import PricingAgent
     from backend.state import AgentState
     from backend.config.config import settings
@@ -86,10 +91,11 @@ async def _refresh_pricing_async(pedal_name: str) -> dict:
     )
 
     # Get pricing (bypasses cache by clearing it first)
-    db = MongoDB.get_database()
-    await db.pricing.delete_one({"pedal_name": pedal_name})
-
-    state = await pricing_agent.get_pricing(state)
+    try:
+        await pricing_agent.invalidate_cache(pedal_name)
+        state = await pricing_agent.get_pricing(state)
+    finally:
+        await pricing_agent.aclose()
 
     if not state.price_info:
         raise RuntimeError(f"No pricing data returned for {pedal_name}")
@@ -115,7 +121,7 @@ def refresh_all_pricing_task() -> dict:
     """
     logger.info("Starting bulk pricing refresh")
 
-    result = asyncio.run(_refresh_all_pricing_async())
+    result = _run(_refresh_all_pricing_async())
 
     logger.info(
         f"Bulk refresh complete: {result['refreshed']}/{result['total']} pedals"
@@ -0,0 +1,58 @@
+"""Hybrid node: one agent coming back empty must not cancel the other."""
+
+import asyncio
+
+from backend.agents.graph import PedalBotGraph
+from backend.state import AgentState
+
+
+class FakeManualAgent:
+    def __init__(self, answer: str):
+        self.answer_text = answer
+
+    async def answer(self, state: AgentState) -> AgentState:
+        state.raw_answer = self.answer_text
+        return state
+
+
+class SlowPricingAgent:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def get_pricing(self, state: AgentState) -> AgentState:
+        await asyncio.sleep(self.delay)
+        state.price_info = {"avg_price": 55.0, "min_price": 40.0, "max_price": 70.0, "total_listings": 12}
+        state.raw_answer = "The Boss DS-1 typically sells for $55.00."
+        return state
+
+
+def _run_hybrid(manual_answer: str, pricing_delay: float, straggler_timeout: float):
+    graph = PedalBotGraph(
+        router_agent=None,
+        manual_agent=FakeManualAgent(manual_answer),
+        pricing_agent=SlowPricingAgent(pricing_delay),
+        quality_check_agent=None,
+        hybrid_straggler_timeout=straggler_timeout,
+    )
+    state = AgentState(user_id="u", conversation_id="c",
+                       query="What does the DS-1 do and how much is it?", pedal_name="Boss DS-1")
+    return asyncio.run(graph._run_hybrid_agents(state._fast_snapshot(), state._fast_snapshot()))
+
+
+def test_manual_miss_does_not_cancel_slow_pricing():
+    manual, pricing = _run_hybrid(
+        "I don't have the manual for the Boss DS-1 yet.", pricing_delay=0.2, straggler_timeout=0.05
+    )
+
+    assert isinstance(manual, AgentState)
+    assert isinstance(pricing, AgentState)
+    assert pricing.price_info["avg_price"] == 55.0
+
+
+def test_useful_manual_answer_bounds_slow_pricing():
+    manual, pricing = _run_hybrid(
+        "The DS-1 is a hard-clipping distortion.", pricing_delay=1.0, straggler_timeout=0.05
+    )
+
+    assert manual.raw_answer == "The DS-1 is a hard-clipping distortion."
+    assert isinstance(pricing, asyncio.TimeoutError)
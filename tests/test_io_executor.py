@@ -0,0 +1,29 @@
+"""Graph factory executor: one I/O-sized default executor per event loop."""
+
+import asyncio
+
+from backend.agents.graph import _install_io_executor
+
+
+def test_repeat_installs_reuse_the_loops_executor():
+    async def main():
+        _install_io_executor()
+        first = asyncio.get_running_loop()._default_executor
+        _install_io_executor()
+        second = asyncio.get_running_loop()._default_executor
+        await asyncio.to_thread(lambda: None)  # Executor still accepts work
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first is second
+
+
+def test_each_loop_gets_a_working_executor():
+    async def main():
+        _install_io_executor()
+        return await asyncio.to_thread(lambda: "ran")
+
+    # The first loop's executor is shut down when asyncio.run closes it
+    assert asyncio.run(main()) == "ran"
+    assert asyncio.run(main()) == "ran"
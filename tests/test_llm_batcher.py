@@ -0,0 +1,82 @@
+"""LLMBatcher: per-prompt results, bounded concurrency, no head-of-line blocking."""
+
+import asyncio
+
+import pytest
+
+from backend.services.llm_batcher import LLMBatcher
+
+
+class FakeLLM:
+    """Replies with the prompt after the delay named in it ("0.2" sleeps 0.2s)."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def ainvoke(self, messages):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if messages == "boom":
+                raise ValueError("boom")
+            await asyncio.sleep(float(messages))
+            return messages
+        finally:
+            self.in_flight -= 1
+
+
+def test_fast_prompt_does_not_wait_for_slow_sibling():
+    batcher = LLMBatcher(FakeLLM(), max_batch=8, max_wait_ms=10)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        slow = asyncio.create_task(batcher.submit("0.5"))
+        fast = await batcher.submit("0.0")
+        fast_elapsed = loop.time() - start
+        await slow
+        return fast, fast_elapsed
+
+    fast, fast_elapsed = asyncio.run(main())
+
+    assert fast == "0.0"
+    assert fast_elapsed < 0.25
+
+
+def test_concurrency_is_bounded_and_slots_are_reused():
+    llm = FakeLLM()
+    batcher = LLMBatcher(llm, max_batch=8, max_wait_ms=5, max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("0.02") for _ in range(6)))
+
+    results = asyncio.run(main())
+
+    assert results == ["0.02"] * 6
+    assert llm.peak == 2
+
+
+def test_errors_are_delivered_to_their_own_caller():
+    batcher = LLMBatcher(FakeLLM(), max_batch=8, max_wait_ms=10)
+
+    async def main():
+        return await asyncio.gather(
+            batcher.submit("boom"), batcher.submit("0.0"), return_exceptions=True
+        )
+
+    failed, ok = asyncio.run(main())
+
+    assert isinstance(failed, ValueError)
+    assert ok == "0.0"
+
+
+def test_slot_is_freed_when_a_call_fails():
+    batcher = LLMBatcher(FakeLLM(), max_batch=1, max_wait_ms=1, max_concurrency=1)
+
+    async def main():
+        with pytest.raises(ValueError):
+            await batcher.submit("boom")
+        return await asyncio.wait_for(batcher.submit("0.0"), timeout=1.0)
+
+    assert asyncio.run(main()) == "0.0"
@@ -0,0 +1,113 @@
+"""Fused self-check: JSON mode unless streaming, and malformed replies never leak."""
+
+import asyncio
+from typing import TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_groq import ChatGroq
+from langgraph.graph import END, StateGraph
+
+from backend.agents.manual_agent import (ManualAgent, TOKEN_STREAM_CONFIG_KEY,
+                                        _AnswerFieldDecoder, _lenient_answer)
+
+REPLY = '{"answer": "The DS-1 has a \\"Tone\\" knob \\u2014 turn it up.", "grounded_in_chunks": [1], "self_confidence": 0.9}'
+ANSWER = 'The DS-1 has a "Tone" knob — turn it up.'
+
+
+@pytest.fixture
+def agent():
+    return ManualAgent(groq_api_key="test-key", pinecone_client=None, embeddings_service=None)
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    """Record which Groq call was made and with what response_format."""
+    calls = []
+
+    async def agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        calls.append(("invoke", kwargs.get("response_format")))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=REPLY))])
+
+    async def astream(self, messages, stop=None, run_manager=None, **kwargs):
+        calls.append(("stream", kwargs.get("response_format")))
+        for i in range(0, len(REPLY), 3):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=REPLY[i:i + 3]))
+
+    monkeypatch.setattr(ChatGroq, "_agenerate", agenerate)
+    monkeypatch.setattr(ChatGroq, "_astream", astream)
+    return calls
+
+
+class _S(TypedDict):
+    answer: str
+
+
+def _generate_in_graph(agent: ManualAgent, stream_tokens: bool):
+    async def node(state: _S) -> _S:
+        return {"answer": await agent._generate_answer("q", "ctx", "Boss DS-1", None, num_chunks=3)}
+
+    builder = StateGraph(_S)
+    builder.add_node("manual", node)
+    builder.set_entry_point("manual")
+    builder.add_edge("manual", END)
+    graph = builder.compile()
+
+    async def main():
+        tokens, answer = [], None
+        config = {"configurable": {TOKEN_STREAM_CONFIG_KEY: True}} if stream_tokens else None
+        async for mode, event in graph.astream({"answer": ""}, config, stream_mode=["custom", "values"]):
+            if mode == "custom":
+                tokens.append(event["token"])
+            else:
+                answer = event["answer"]
+        return answer, tokens
+
+    return asyncio.run(main())
+
+
+def test_graph_run_without_token_streaming_uses_json_mode(agent, fake_groq):
+    answer, tokens = _generate_in_graph(agent, stream_tokens=False)
+
+    assert fake_groq == [("invoke", {"type": "json_object"})]
+    assert tokens == []
+    assert agent._parse_self_check(answer) == (ANSWER, [1], 0.9)
+
+
+def test_token_streaming_emits_only_the_answer_field(agent, fake_groq):
+    answer, tokens = _generate_in_graph(agent, stream_tokens=True)
+
+    assert fake_groq == [("stream", None)]
+    assert "".join(tokens) == ANSWER
+    assert agent._parse_self_check(answer) == (ANSWER, [1], 0.9)
+
+
+def test_decoder_holds_back_escapes_split_across_chunks():
+    decoder = _AnswerFieldDecoder()
+
+    text = "".join(decoder.feed(REPLY[i:i + 1]) for i in range(len(REPLY)))
+
+    assert text == ANSWER
+    assert decoder.done
+
+
+@pytest.mark.parametrize("content", [
+    '{"answer": "The DS-1 has a Tone knob.", "grounded_in_chunks": [1], "self_conf',
+    '```json\n{"answer": "The DS-1 has a Tone knob.", "grounded_in_chunks": [1',
+    '{"answer": "The DS-1 has a Tone knob.',
+])
+def test_malformed_reply_is_salvaged_without_the_json_envelope(agent, content):
+    assert agent._parse_self_check(content) is None
+    assert _lenient_answer(content) == "The DS-1 has a Tone knob."
+
+
+def test_reply_without_answer_field_is_not_salvaged(agent):
+    content = '{"grounded_in_chunks": [1], "self_confidence": 0.9}'
+
+    assert agent._parse_self_check(content) is None
+    assert _lenient_answer(content) is None
+
+
+def test_fenced_reply_parses(agent):
+    assert agent._parse_self_check(f"```json\n{REPLY}\n```") == (ANSWER, [1], 0.9)
@@ -0,0 +1,143 @@
+"""Pricing cache: fresh fetches and cache hits return the same summary shape."""
+
+import asyncio
+
+import httpx
+
+from backend.agents.pricing_agent import PricingAgent
+from backend.state import AgentState
+
+REVERB_PAYLOAD = {
+    "listings": [
+        {
+            "id": i,
+            "title": f"Boss DS-1 #{i}",
+            "price": {"amount": str(50 + i)},
+            "condition": {"display_name": "Used"},
+            "_links": {"web": {"href": f"https://reverb.com/item/{i}"}},
+        }
+        for i in range(12)
+    ]
+}
+
+
+class InMemoryPricingAgent(PricingAgent):
+    """PricingAgent whose MongoDB cache is a dict of stored summaries."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.summaries = {}
+        self.listings = {}
+
+    async def _resolve_market_name(self, pedal_name, pedal_info=None):
+        return pedal_name
+
+    async def _get_cached_price(self, market_name):
+        summary = self.summaries.get(market_name)
+        return dict(summary) if summary else None
+
+    async def _get_cached_prices(self, market_names):
+        return {m: dict(self.summaries[m]) for m in market_names if m in self.summaries}
+
+    async def _cache_price(self, market_name, price_data):
+        await self._cache_prices({market_name: price_data})
+
+    async def _cache_prices(self, prices):
+        for market_name, price_data in prices.items():
+            _, summary, listings = self._cache_updates(market_name, price_data, None)
+            self.summaries[market_name] = summary["$set"]
+            self.listings[market_name] = listings["$set"]["listings"]
+
+
+def _agent() -> InMemoryPricingAgent:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json=REVERB_PAYLOAD)
+    ))
+    return InMemoryPricingAgent(reverb_api_key="test-key", http_client=client)
+
+
+def _price(agent: PricingAgent) -> AgentState:
+    state = AgentState(user_id="u", conversation_id="c", query="price?", pedal_name="Boss DS-1")
+    return asyncio.run(agent.get_pricing(state))
+
+
+def test_fresh_and_cached_pricing_have_the_same_shape():
+    agent = _agent()
+
+    fresh = _price(agent)
+    cached = _price(agent)
+
+    assert fresh.agent_path == ["pricing_agent"]
+    assert cached.agent_path == ["pricing_agent_cached"]
+    assert fresh.price_info == cached.price_info
+    assert "listings" not in fresh.price_info
+
+
+def test_listings_are_stored_apart_from_the_summary():
+    agent = _agent()
+
+    _price(agent)
+
+    assert agent.listings["Boss DS-1"]
+    assert "listings" not in agent.summaries["Boss DS-1"]
+
+
+def test_batch_returns_the_same_shape_as_single_lookups():
+    agent = _agent()
+
+    single = _price(agent).price_info
+    fresh_batch = asyncio.run(agent.get_pricing_batch(["Ibanez TS9"]))[0]
+    cached_batch = asyncio.run(agent.get_pricing_batch(["Boss DS-1"]))[0]
+
+    assert set(fresh_batch) == set(single) == set(cached_batch)
+
+
+class FailingBatchReadAgent(InMemoryPricingAgent):
+    async def _get_cached_prices(self, market_names):
+        raise RuntimeError("mongo unavailable")
+
+
+def test_batch_cache_read_failure_falls_back_to_single_lookups():
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json=REVERB_PAYLOAD)
+    ))
+    agent = FailingBatchReadAgent(reverb_api_key="test-key", http_client=client)
+    agent.summaries["Boss DS-1"] = {"pedal_name": "Boss DS-1", "avg_price": 42.0}
+
+    results = asyncio.run(agent.get_pricing_batch(["Boss DS-1", "Ibanez TS9", "Boss DS-1"]))
+
+    assert [r["display_name"] for r in results] == ["Boss DS-1", "Ibanez TS9", "Boss DS-1"]
+    assert results[0]["avg_price"] == 42.0
+    assert "error" not in results[1] and "Ibanez TS9" in agent.summaries
+
+
+def test_single_lookup_survives_cache_read_failure():
+    class FailingReadAgent(InMemoryPricingAgent):
+        async def _get_cached_price(self, market_name):
+            raise RuntimeError("mongo unavailable")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json=REVERB_PAYLOAD)
+    ))
+    state = _price(FailingReadAgent(reverb_api_key="test-key", http_client=client))
+
+    assert state.error is None
+    assert state.agent_path == ["pricing_agent"]
+
+
+class FailingWriteAgent(InMemoryPricingAgent):
+    async def _cache_prices(self, prices):
+        raise RuntimeError("bulk_write failed")
+
+
+def test_cache_write_failure_keeps_fetched_prices():
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json=REVERB_PAYLOAD)
+    ))
+    agent = FailingWriteAgent(reverb_api_key="test-key", http_client=client)
+
+    batch = asyncio.run(agent.get_pricing_batch(["Boss DS-1", "Ibanez TS9"]))
+    single = _price(agent)
+
+    assert all("error" not in result and result["avg_price"] > 0 for result in batch)
+    assert single.error is None and single.price_info["avg_price"] > 0
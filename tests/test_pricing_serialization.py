@@ -0,0 +1,75 @@
+"""Pricing results must survive Celery's JSON result serializer."""
+
+import asyncio
+import json
+
+import httpx
+from kombu.utils.json import dumps
+
+from backend.agents.pricing_agent import PricingAgent
+from backend.state import AgentState
+
+REVERB_PAYLOAD = {
+    "listings": [
+        {
+            "id": i,
+            "title": f"Boss DS-1 #{i}",
+            "price": {"amount": str(50 + i)},
+            "condition": {"display_name": "Used"},
+            "_links": {"web": {"href": f"https://reverb.com/item/{i}"}},
+            "shop": {"name": "Shop"},
+        }
+        for i in range(12)
+    ]
+}
+
+
+def _agent() -> PricingAgent:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json=REVERB_PAYLOAD)
+    ))
+    agent = PricingAgent(reverb_api_key="test-key", http_client=client)
+
+    # No MongoDB here: every lookup misses and writes are dropped
+    async def miss(*args, **kwargs):
+        return None
+
+    async def miss_many(market_names):
+        return {}
+
+    async def market_name(pedal_name, pedal_info=None):
+        return pedal_name
+
+    agent._get_cached_price = miss
+    agent._get_cached_prices = miss_many
+    agent._cache_price = miss
+    agent._cache_prices = miss
+    agent._resolve_market_name = market_name
+    return agent
+
+
+def _roundtrip(value):
+    return json.loads(dumps(value))
+
+
+def test_fetched_listings_are_plain_dicts():
+    price_data = asyncio.run(_agent()._fetch_from_reverb("Boss DS-1"))
+
+    assert price_data["listings"]
+    assert all(isinstance(listing, dict) for listing in price_data["listings"])
+    assert _roundtrip(price_data)["total_listings"] == price_data["total_listings"]
+
+
+def test_get_pricing_result_is_json_serializable():
+    state = AgentState(user_id="system", conversation_id="pricing_refresh",
+                       query="refresh_pricing", pedal_name="Boss DS-1")
+    state = asyncio.run(_agent().get_pricing(state))
+
+    assert state.error is None
+    assert _roundtrip(state.price_info)["avg_price"] == state.price_info["avg_price"]
+
+
+def test_get_pricing_batch_result_is_json_serializable():
+    results = asyncio.run(_agent().get_pricing_batch(["Boss DS-1", "Ibanez TS9"]))
+
+    assert len(_roundtrip(results)) == 2
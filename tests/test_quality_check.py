@@ -0,0 +1,125 @@
+"""QualityCheckAgent: validation cache and LLM-task cleanup."""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.agents.quality_check import QualityCheckAgent
+from backend.state import AgentIntent, AgentState
+
+PASSING = json.dumps({"is_accurate": True, "hallucination_detected": False,
+                      "confidence": 0.9, "issues": [], "reasoning": "grounded"})
+SOURCES = ["The Level knob sets the output volume."]
+
+
+class Reply:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeBatcher:
+    """Stands in for LLMBatcher; replies with content after an optional delay."""
+
+    def __init__(self, content: str = PASSING, delay: float = 0.0):
+        self.content = content
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = False
+
+    async def submit(self, messages):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return Reply(self.content)
+
+
+@pytest.fixture
+def agent():
+    agent = QualityCheckAgent(api_key="test-key")
+    agent.batcher = FakeBatcher()
+    return agent
+
+
+def test_repeat_validation_is_served_from_cache(agent):
+    async def main():
+        first = await agent.validate_pair("The Level knob sets volume.", SOURCES)
+        second = await agent.validate_pair("The Level knob sets volume.", SOURCES)
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert agent.batcher.calls == 1
+    assert first == second
+    assert agent.cache_info()["hits"] == 1
+
+
+def test_cached_result_is_a_copy(agent):
+    async def main():
+        first = await agent.validate_pair("The Level knob sets volume.", SOURCES)
+        first["issues"].append("mutated by caller")
+        return await agent.validate_pair("The Level knob sets volume.", SOURCES)
+
+    assert asyncio.run(main())["issues"] == []
+
+
+def test_different_sources_miss_the_cache(agent):
+    async def main():
+        await agent.validate_pair("The Level knob sets volume.", SOURCES)
+        await agent.validate_pair("The Level knob sets volume.", SOURCES + ["Tone knob."])
+
+    asyncio.run(main())
+
+    assert agent.batcher.calls == 2
+
+
+def test_unparseable_validation_is_not_cached(agent):
+    agent.batcher = FakeBatcher(content="not json")
+
+    async def main():
+        await agent.validate_pair("The Level knob sets volume.", SOURCES)
+        await agent.validate_pair("The Level knob sets volume.", SOURCES)
+
+    asyncio.run(main())
+
+    assert agent.batcher.calls == 2
+    assert agent.cache_info()["currsize"] == 0
+
+
+def test_expired_validation_is_refetched(agent):
+    agent.validation_cache_ttl = 0.0
+
+    async def main():
+        await agent.validate_pair("The Level knob sets volume.", SOURCES)
+        await agent.validate_pair("The Level knob sets volume.", SOURCES)
+
+    asyncio.run(main())
+
+    assert agent.batcher.calls == 2
+
+
+def test_heuristic_failure_cancels_the_llm_call(agent):
+    agent.batcher = FakeBatcher(delay=10.0)
+
+    async def broken_heuristic(state):
+        await asyncio.sleep(0)  # Let the LLM call start
+        raise RuntimeError("heuristic bug")
+
+    agent.run_heuristic_check = broken_heuristic
+    state = AgentState(user_id="u", conversation_id="c", query="What does the level knob do?",
+                       pedal_name="Boss DS-1", intent=AgentIntent.MANUAL_QUESTION,
+                       raw_answer="It sets the output volume.", retrieved_chunks=list(SOURCES))
+
+    async def main():
+        result = await agent.validate(state)
+        await asyncio.sleep(0)  # Deliver the cancellation
+        # Checked before asyncio.run cancels leftover tasks on shutdown
+        return result, agent.batcher.cancelled
+
+    result, cancelled = asyncio.run(main())
+
+    assert result.agent_path[-1] == "quality_check_error"
+    assert cancelled
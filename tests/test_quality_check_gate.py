@@ -0,0 +1,79 @@
+"""Quality-check gate: retrieval alone decides clear-cut manual answers."""
+
+import asyncio
+
+from backend.agents.graph import PedalBotGraph
+from backend.state import AgentIntent, AgentState
+
+
+class FakeRouter:
+    async def route(self, state: AgentState) -> AgentState:
+        state.intent = AgentIntent.MANUAL_QUESTION
+        return state
+
+
+class FakeManualAgent:
+    def __init__(self, answer: str, scores: list):
+        self.answer_text = answer
+        self.scores = scores
+
+    async def answer(self, state: AgentState) -> AgentState:
+        state.raw_answer = self.answer_text
+        state.retrieval_scores = list(self.scores)
+        state.retrieved_chunks = [f"chunk {i}" for i in range(len(self.scores))]
+        state.confidence_score = 0.5
+        return state
+
+
+class FakeQualityCheck:
+    def __init__(self):
+        self.calls = 0
+
+    async def validate(self, state: AgentState) -> AgentState:
+        self.calls += 1
+        state.confidence_score = 0.6
+        return state
+
+
+def _run(answer: str, scores: list):
+    quality_check = FakeQualityCheck()
+    graph = PedalBotGraph(
+        router_agent=FakeRouter(),
+        manual_agent=FakeManualAgent(answer, scores),
+        pricing_agent=None,
+        quality_check_agent=quality_check,
+    )
+    state = AgentState(user_id="u", conversation_id="c",
+                       query="What does the level knob control on the DS-1?", pedal_name="Boss DS-1")
+    return asyncio.run(graph.run(state, use_cache=False)), quality_check.calls
+
+
+def test_strong_grounding_fast_passes_with_retrieval_confidence():
+    state, llm_calls = _run("The level knob sets the output volume.", [0.91, 0.85, 0.82])
+
+    assert llm_calls == 0
+    assert "quality_check_fast_pass" in state.agent_path
+    assert state.confidence_score == 0.91
+    assert state.final_answer == "The level knob sets the output volume."
+
+
+def test_no_retrieval_fast_rejects_without_llm():
+    state, llm_calls = _run("The level knob sets the output volume.", [])
+
+    assert llm_calls == 0
+    assert "quality_check_fast_reject" in state.agent_path
+    assert state.confidence_score == 0.0
+    assert state.agent_path[-1] == "fallback"
+
+
+def test_ambiguous_grounding_goes_to_llm_validator():
+    state, llm_calls = _run("The level knob sets the output volume.", [0.62, 0.55])
+
+    assert llm_calls == 1
+    assert not any(step.startswith("quality_check_fast") for step in state.agent_path)
+
+
+def test_unsure_answer_is_not_fast_passed():
+    _, llm_calls = _run("I'm not sure, the manual doesn't say.", [0.91, 0.85, 0.82])
+
+    assert llm_calls == 1
@@ -0,0 +1,137 @@
+"""Response cache: successful answers are replayed, errors and fallbacks never are."""
+
+import asyncio
+
+from backend.agents.graph import PedalBotGraph, ResponseCache
+from backend.state import AgentIntent, AgentState
+
+
+class FakeRouter:
+    async def route(self, state: AgentState) -> AgentState:
+        state.intent = AgentIntent.MANUAL_QUESTION
+        state.agent_path.append("router")
+        return state
+
+
+class FakeManualAgent:
+    def __init__(self, error: str = None):
+        self.error = error
+        self.calls = 0
+
+    async def answer(self, state: AgentState) -> AgentState:
+        self.calls += 1
+        state.raw_answer = "The DS-1 has Tone, Level and Distortion knobs."
+        state.retrieved_chunks = ["Controls: Tone, Level, Distortion"]
+        state.confidence_score = 0.9
+        state.skip_quality_check = True
+        state.error = self.error
+        state.agent_path.append("manual_agent")
+        return state
+
+
+def _graph(manual_agent: FakeManualAgent) -> PedalBotGraph:
+    return PedalBotGraph(
+        router_agent=FakeRouter(),
+        manual_agent=manual_agent,
+        pricing_agent=None,
+        quality_check_agent=None,
+        response_cache=ResponseCache(),
+    )
+
+
+def _state(**fields) -> AgentState:
+    return AgentState(
+        user_id="u", conversation_id="c",
+        query="What knobs does the DS-1 have?", pedal_name="Boss DS-1",
+        **fields,
+    )
+
+
+def test_successful_answer_is_served_from_cache():
+    manual = FakeManualAgent()
+    graph = _graph(manual)
+
+    async def main():
+        first = await graph.run(_state())
+        second = await graph.run(_state())
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert manual.calls == 1
+    assert second.final_answer == first.final_answer
+    assert second.agent_path[-1] == "response_cache"
+
+
+def test_error_answer_is_not_cached():
+    manual = FakeManualAgent(error="retrieval_failed")
+    graph = _graph(manual)
+
+    async def main():
+        first = await graph.run(_state())
+        await graph.run(_state())
+        return first
+
+    first = asyncio.run(main())
+
+    assert "fallback" in first.agent_path
+    assert manual.calls == 2
+    assert not graph.response_cache._entries
+
+
+def test_follow_ups_bypass_cache():
+    manual = FakeManualAgent()
+    graph = _graph(manual)
+    history = [{"role": "user", "content": "Tell me about the DS-1"}]
+
+    async def main():
+        await graph.run(_state(conversation_history=history))
+        await graph.run(_state(conversation_history=history))
+
+    asyncio.run(main())
+
+    assert manual.calls == 2
+    assert not graph.response_cache._entries
+
+
+class FakeEmbeddings:
+    def get_dimension(self) -> int:
+        return 2
+
+    async def embed_single(self, text: str):
+        class Result:
+            embeddings = [[1.0, 0.1] if "knob" in text else [0.0, 1.0]]
+        return Result()
+
+
+def test_semantic_tier_matches_rephrased_query_per_pedal():
+    cache = ResponseCache(embeddings_service=FakeEmbeddings())
+
+    async def main():
+        await cache.set("What knobs does it have?", "Boss DS-1", {"final_answer": "Tone, Level, Distortion"})
+        hit, _ = await cache.get("Which knobs are on it?", "Boss DS-1")
+        other_pedal, _ = await cache.get("Which knobs are on it?", "Ibanez TS9")
+        unrelated, _ = await cache.get("What is the input impedance?", "Boss DS-1")
+        return hit, other_pedal, unrelated
+
+    hit, other_pedal, unrelated = asyncio.run(main())
+
+    assert hit == {"final_answer": "Tone, Level, Distortion"}
+    assert other_pedal is None
+    assert unrelated is None
+
+
+def test_insert_sweeps_expired_entries():
+    cache = ResponseCache(ttl_seconds=60.0, sweep_interval=0.0)
+
+    async def main():
+        await cache.set("What knobs does it have?", "Boss DS-1", {"final_answer": "old"})
+        # Age the entry past its TTL without waiting
+        key = cache.make_key("What knobs does it have?", "Boss DS-1")
+        response, stored_at = cache._entries[key]
+        cache._entries[key] = (response, stored_at - 120.0)
+        await cache.set("What does it cost?", "Boss DS-1", {"final_answer": "new"})
+
+    asyncio.run(main())
+
+    assert list(cache._entries) == [cache.make_key("What does it cost?", "Boss DS-1")]
@@ -0,0 +1,62 @@
+"""Router fast path: only unambiguous single-intent phrasings skip the LLM."""
+
+import asyncio
+
+import pytest
+
+from backend.agents.router_agent import RouterAgent
+from backend.state import AgentIntent, AgentState
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("What's the price of the Boss DS-1?", AgentIntent.PRICING),
+    ("How much is it on Reverb", AgentIntent.PRICING),
+    ("What do used ones sell for", AgentIntent.PRICING),
+    ("DS-1 specs", AgentIntent.MANUAL_QUESTION),
+    ("List the controls", AgentIntent.MANUAL_QUESTION),
+])
+def test_decisive_phrasings_take_fast_path(query, intent):
+    assert RouterAgent._fast_path_intent(query) == intent
+
+
+@pytest.mark.parametrize("query", [
+    "How do I set the tone knob?",              # usage
+    "Why is the DS-1 priced so high?",          # explanation
+    "What does the price knob do",              # explanation
+    "What's the price and the specs?",          # conjunction
+    "Specs and price please",                   # both rules match
+    "What's the price, also list the controls", # conjunction
+    "Is it worth the price?",                   # opinion
+    "What's the best setting for metal?",       # no rule, opinion
+])
+def test_ambiguous_phrasings_go_to_llm(query):
+    assert RouterAgent._fast_path_intent(query) is None
+
+
+def _route(query: str):
+    router = RouterAgent(api_key="test-key")
+    calls = []
+
+    async def classify(state, query):
+        calls.append(query)
+        return {"intent": "HYBRID", "confidence": 0.9}
+
+    router._classify = classify
+    state = AgentState(user_id="u", conversation_id="c", query=query, pedal_name="Boss DS-1")
+    return asyncio.run(router.route(state)), calls
+
+
+def test_route_skips_llm_on_fast_path():
+    state, calls = _route("What's the price of the Boss DS-1?")
+
+    assert not calls
+    assert state.intent == AgentIntent.PRICING
+    assert "router_fast_path" in state.agent_path
+
+
+def test_route_sends_usage_question_to_llm():
+    state, calls = _route("How do I set the DS-1 for a lead tone and what's the price?")
+
+    assert calls
+    assert state.intent == AgentIntent.HYBRID
+    assert "router_fast_path" not in state.agent_path
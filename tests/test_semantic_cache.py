@@ -0,0 +1,91 @@
+"""SemanticCache: nearest-neighbour hits above threshold, scoped, FIFO-evicted."""
+
+import numpy as np
+
+from backend.services.semantic_cache import SemanticCache
+
+
+def _unit(*values):
+    v = np.asarray(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_near_duplicate_hits_and_distant_query_misses():
+    cache = SemanticCache(dimension=3, capacity=8, threshold=0.95)
+    cache.insert([1.0, 0.0, 0.0], "pricing")
+    cache.insert([0.0, 1.0, 0.0], "manual")
+
+    assert cache.lookup([0.99, 0.05, 0.0]) == "pricing"
+    assert cache.lookup([0.7, 0.7, 0.0]) is None
+
+
+def test_lookup_is_scale_invariant():
+    cache = SemanticCache(dimension=3, capacity=8, threshold=0.95)
+    cache.insert([2.0, 0.0, 0.0], "pricing")
+
+    assert cache.lookup([10.0, 0.1, 0.0]) == "pricing"
+
+
+def test_full_cache_overwrites_oldest_entry():
+    cache = SemanticCache(dimension=3, capacity=2, threshold=0.95)
+    cache.insert([1.0, 0.0, 0.0], "first")
+    cache.insert([0.0, 1.0, 0.0], "second")
+    cache.insert([0.0, 0.0, 1.0], "third")
+
+    assert len(cache) == 2
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup([0.0, 0.0, 1.0]) == "third"
+
+
+def test_bad_vectors_are_ignored():
+    cache = SemanticCache(dimension=3, capacity=8)
+    cache.insert([0.0, 0.0, 0.0], "zero")
+    cache.insert([1.0, 0.0], "short")
+
+    assert len(cache) == 0
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_clear_drops_everything():
+    cache = SemanticCache(dimension=3, capacity=8)
+    cache.insert([1.0, 0.0, 0.0], "pricing", scope="Boss DS-1")
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.lookup([1.0, 0.0, 0.0], scope="Boss DS-1") is None
+
+
+def test_scopes_never_match_each_other():
+    cache = SemanticCache(dimension=3, capacity=8, threshold=0.95)
+    cache.insert([1.0, 0.0, 0.0], "ds1", scope="Boss DS-1")
+    cache.insert([1.0, 0.0, 0.0], "ts9", scope="Ibanez TS9")
+
+    assert cache.lookup([1.0, 0.0, 0.0], scope="Boss DS-1") == "ds1"
+    assert cache.lookup([1.0, 0.0, 0.0], scope="Ibanez TS9") == "ts9"
+    assert cache.lookup([1.0, 0.0, 0.0], scope="MXR Phase 90") is None
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+
+
+def test_quantized_similarities_track_float32():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(64, 32)).astype(np.float32)
+    exact = SemanticCache(dimension=32, capacity=64, threshold=-1.0)
+    quantized = SemanticCache(dimension=32, capacity=64, threshold=-1.0, quantize=True)
+    for i, v in enumerate(vectors):
+        exact.insert(v, i)
+        quantized.insert(v, i)
+
+    query = _unit(*rng.normal(size=32))
+    diff = np.abs(exact._similarities(query) - quantized._similarities(query))
+
+    assert quantized._matrix.dtype == np.int8
+    assert diff.max() < 0.02
+
+
+def test_quantized_cache_returns_the_same_hit():
+    cache = SemanticCache(dimension=3, capacity=8, threshold=0.95, quantize=True)
+    cache.insert([1.0, 0.0, 0.0], "pricing")
+    cache.insert([0.0, 1.0, 0.0], "manual")
+
+    assert cache.lookup([0.99, 0.05, 0.0]) == "pricing"
+    assert cache.lookup([0.05, 0.99, 0.0]) == "manual"